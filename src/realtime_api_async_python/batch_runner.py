@@ -0,0 +1,214 @@
+import asyncio
+import json
+import time
+from typing import Any, Optional
+
+import aiofiles
+from pydantic import BaseModel, Field
+
+from .main import OpenAIRealtimeAPI
+from .modules import openai_realtime
+from .modules.async_microphone import QueueMicrophone
+from .modules.llm_scheduler import Priority, llm_priority
+from .modules.logging import logger, log_info, log_error
+from .modules.send_queue import OutgoingEventQueue
+from .modules.utils import TOOL_GROUPS
+
+TURN_TIMEOUT_S = 300
+
+
+class ToolCallRecord(BaseModel):
+    name: str
+    args: dict[str, Any]
+    result: Any = None
+    error: Optional[str] = None
+    duration_s: float = 0.0
+
+
+class TurnRecord(BaseModel):
+    prompt: str
+    transcript: str = ""
+    tool_calls: list[ToolCallRecord] = Field(default_factory=list)
+    responses: int = Field(default=0, description="response.done events needed to finish the turn")
+    time_to_first_delta_s: Optional[float] = None
+    time_to_first_token_s: Optional[float] = Field(
+        default=None, description="Time to the first text or function call argument delta"
+    )
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+
+class ScriptReport(BaseModel):
+    script_id: str
+    prompts: list[str]
+    turns: list[TurnRecord] = Field(default_factory=list)
+    duration_s: float = 0.0
+    error: Optional[str] = None
+
+
+class PromptScript(BaseModel):
+    script_id: str
+    prompts: list[str]
+
+
+def load_prompt_scripts(path: str) -> list[PromptScript]:
+    """
+    Load prompt scripts, one per line. A line is either a JSON object with
+    ``prompts`` (and optionally ``id``) or plain text prompts separated by ``|``,
+    the same format as ``--prompts``. Blank lines and ``#`` comments are skipped.
+    """
+    scripts = []
+    with open(path, "r") as f:
+        for line_no, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            if line.startswith("{"):
+                data = json.loads(line)
+                scripts.append(
+                    PromptScript(script_id=str(data.get("id", line_no)), prompts=data["prompts"])
+                )
+            else:
+                scripts.append(
+                    PromptScript(
+                        script_id=str(line_no),
+                        prompts=[p.strip() for p in line.split("|") if p.strip()],
+                    )
+                )
+    return scripts
+
+
+class HeadlessSession(OpenAIRealtimeAPI):
+    """
+    Text-only realtime session without any audio device. Prompts are sent one
+    turn at a time and transcripts, tool calls and timings are recorded.
+    """
+
+    def __init__(self, tool_groups=TOOL_GROUPS):
+        super().__init__(mic=QueueMicrophone(), tool_groups=tool_groups, wake_word=False, idle_timeout_s=0)
+        self.turn: Optional[TurnRecord] = None
+        self.turn_started = 0.0
+        self.turn_done = asyncio.Event()
+
+    async def call_tool(self, function_name, args):
+        record = ToolCallRecord(name=function_name, args=args)
+        if self.turn is not None:
+            self.turn.tool_calls.append(record)
+        start = time.perf_counter()
+        # Scripted sessions are background work; live tool calls go first
+        priority = llm_priority.set(Priority.background)
+        try:
+            record.result = await super().call_tool(function_name, args)
+            return record.result
+        except Exception as e:
+            record.error = str(e)
+            raise
+        finally:
+            llm_priority.reset(priority)
+            record.duration_s = time.perf_counter() - start
+
+    async def handle_event(self, event, websocket):
+        if self.turn is not None:
+            if (
+                event.get("type") in ("response.text.delta", "response.function_call_arguments.delta")
+                and self.turn.time_to_first_token_s is None
+            ):
+                self.turn.time_to_first_token_s = time.perf_counter() - self.turn_started
+            match event.get("type"):
+                case "response.text.delta":
+                    if self.turn.time_to_first_delta_s is None:
+                        self.turn.time_to_first_delta_s = time.perf_counter() - self.turn_started
+                    self.turn.transcript += event.get("delta", "")
+                case "response.done":
+                    self.turn.responses += 1
+                    response = event.get("response", {})
+                    output = response.get("output", [])
+                    if response.get("status") in ("failed", "cancelled", "incomplete"):
+                        self.turn.error = json.dumps(response.get("status_details"))
+                        self.turn_done.set()
+                    elif not any(item.get("type") == "function_call" for item in output):
+                        # A function call response is followed by another response
+                        # once the tool output is sent, so only a plain reply ends the turn
+                        self.turn_done.set()
+                case "error":
+                    self.turn.error = event.get("error", {}).get("message", "")
+        await super().handle_event(event, websocket)
+
+    async def run_turn(self, prompt: str) -> TurnRecord:
+        self.turn = TurnRecord(prompt=prompt)
+        self.turn_done.clear()
+        self.turn_started = time.perf_counter()
+        # send_user_text also requests the response
+        self.send_user_text([prompt])
+        try:
+            await asyncio.wait_for(self.turn_done.wait(), TURN_TIMEOUT_S)
+        except asyncio.TimeoutError:
+            self.turn.error = f"Turn timed out after {TURN_TIMEOUT_S}s"
+        self.turn.duration_s = time.perf_counter() - self.turn_started
+        turn, self.turn = self.turn, None
+        return turn
+
+    async def run_script(self, script: PromptScript) -> ScriptReport:
+        report = ScriptReport(script_id=script.script_id, prompts=script.prompts)
+        start = time.perf_counter()
+        try:
+            async with self.connect() as websocket:
+                self.send_queue = OutgoingEventQueue()
+                writer_task = asyncio.create_task(self.send_queue.run(websocket))
+                tool_session = self.start_tool_session()
+                await openai_realtime.initialize_session(
+                    self.send_queue, modalities=["text"], tool_groups=tool_session.groups
+                )
+                ws_task = asyncio.create_task(self.process_ws_messages(websocket))
+                try:
+                    for prompt in script.prompts:
+                        turn = await self.run_turn(prompt)
+                        report.turns.append(turn)
+                        if turn.error:
+                            break
+                finally:
+                    self.send_queue.close()
+                    await writer_task
+                    await websocket.close()
+                    await ws_task
+        except Exception as e:
+            log_error(f"Script {script.script_id} failed: {e}")
+            report.error = str(e)
+        report.duration_s = time.perf_counter() - start
+        return report
+
+
+async def run_batch(scripts_path: str, report_path: str, concurrency: int = 4) -> list[ScriptReport]:
+    """
+    Run every prompt script in ``scripts_path`` as a headless text session, at
+    most ``concurrency`` at a time, appending one JSON line per script to
+    ``report_path`` as each finishes.
+    """
+    scripts = load_prompt_scripts(scripts_path)
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    write_lock = asyncio.Lock()
+    log_info(f"Running {len(scripts)} prompt scripts with concurrency {concurrency}", style="bold green")
+
+    async with aiofiles.open(report_path, "w") as report_file:
+
+        async def run_one(script: PromptScript) -> ScriptReport:
+            async with semaphore:
+                report = await HeadlessSession().run_script(script)
+            async with write_lock:
+                await report_file.write(report.model_dump_json() + "\n")
+                await report_file.flush()
+            return report
+
+        start = time.perf_counter()
+        reports = await asyncio.gather(*[run_one(script) for script in scripts])
+        elapsed = time.perf_counter() - start
+
+    turns = [turn for report in reports for turn in report.turns]
+    failed = sum(1 for report in reports if report.error or any(t.error for t in report.turns))
+    avg_turn = sum(t.duration_s for t in turns) / len(turns) if turns else 0.0
+    logger.info(
+        f"Batch finished: {len(reports)} scripts ({failed} with errors), {len(turns)} turns "
+        f"in {elapsed:.2f}s, {len(turns) / elapsed if elapsed else 0:.2f} turns/s, "
+        f"avg turn {avg_turn:.2f}s. Report: {report_path}"
+    )
+    return reports
@@ -0,0 +1,74 @@
+"""
+TLS handshakes and tail latency of back-to-back API calls with a client per
+call against the shared, pre-warmed pool (modules/http_client.py).
+
+    uv run python -m realtime_api_async_python.benchmarks.http_pool --requests 20
+
+Each request is an authenticated ``GET /models``: the same connection setup
+as a tool's model call without spending tokens. ``per-call`` builds and closes
+a client for every request, as an agent with its own client pays on a cold
+pool; ``shared`` warms the pool once, as at startup, and reuses it.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from ..modules.http_client import OPENAI_BASE_URL, HttpClientMetrics, SharedHttpClient, http2_available
+
+
+async def timed_get(client: SharedHttpClient) -> float:
+    api_key = os.getenv("OPENAI_API_KEY")
+    headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+    start = time.perf_counter()
+    await client.client.get(f"{OPENAI_BASE_URL}/models", headers=headers)
+    return (time.perf_counter() - start) * 1000
+
+
+async def run_per_call(requests: int, http2: bool) -> tuple[list[float], HttpClientMetrics]:
+    latencies, metrics = [], HttpClientMetrics()
+    for _ in range(requests):
+        client = SharedHttpClient(http2=http2)
+        latencies.append(await timed_get(client))
+        await client.aclose()
+        for field in HttpClientMetrics.model_fields:
+            setattr(metrics, field, getattr(metrics, field) + getattr(client.metrics, field))
+    return latencies, metrics
+
+
+async def run_shared(requests: int, http2: bool) -> tuple[list[float], HttpClientMetrics]:
+    client = SharedHttpClient(http2=http2)
+    await client.warm()
+    client.metrics = HttpClientMetrics()
+    latencies = [await timed_get(client) for _ in range(requests)]
+    await client.aclose()
+    return latencies, client.metrics
+
+
+def report(name: str, latencies: list[float], metrics: HttpClientMetrics) -> None:
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    print(
+        f"{name:<10} {statistics.median(ordered):>8.0f} {p95:>8.0f} {ordered[-1]:>8.0f} "
+        f"{metrics.connections:>6} {metrics.tls_handshakes:>5} {metrics.tls_handshake_ms_total:>8.0f}"
+    )
+
+
+async def run(requests: int, http2: bool) -> None:
+    print(f"{requests} requests to {OPENAI_BASE_URL}, http2={http2}")
+    print(f"{'client':<10} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'conns':>6} {'TLS':>5} {'TLS ms':>8}")
+    report("per-call", *await run_per_call(requests, http2))
+    report("shared", *await run_shared(requests, http2))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Back-to-back requests per client mode")
+    parser.add_argument("--http1", action="store_true", help="Force HTTP/1.1 even when h2 is installed")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, http2_available() and not args.http1))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Non-LLM overhead of every tool in function_map, run end to end against the
+scripted LLM backend (modules/scripted_llm.py) in a throwaway scratchpad.
+
+    uv run python -m realtime_api_async_python.benchmarks.tool_pipeline --repeat 5
+    uv run python -m realtime_api_async_python.benchmarks.tool_pipeline --tools create_file,run_sql_file --latency-ms 300
+
+Each run starts from freshly seeded files (notes, a Python script, a CSV, an
+SQL file, a SQLite database and a memory file), so tools that create or
+delete files behave the same every time. Time is split into exclusive
+stages: ``llm`` (our LLM layer plus the scripted latency), ``memory``
+(memory_manager), ``listing`` (os.listdir), ``file_io`` (files opened by the
+tools), ``database``, ``subprocess`` (scripts run with uv) and ``other``
+(everything else in the tool). Tools that exit the process or need a
+browser, the clipboard, Google or mermaid.ink are skipped.
+"""
+import argparse
+import asyncio
+import functools
+import inspect
+import json
+import os
+import re
+import shutil
+import sqlite3
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+STAGES = ("llm", "memory", "listing", "file_io", "database", "subprocess", "other")
+
+SKIPPED = {
+    "shutdown": "exits the process",
+    "open_browser": "opens a browser",
+    "clipboard_to_memory": "reads the clipboard",
+    "clipboard_to_file": "reads the clipboard",
+    "scrap_to_file_from_clipboard": "reads the clipboard and the web",
+    "send_email_to_recipient": "calls the Gmail API",
+    "find_contact_information": "calls the People API",
+    "generate_diagram": "renders through mermaid.ink",
+}
+
+PROMPT = "benchmark request"
+
+
+def chart_code(prompt: str) -> str:
+    """Chart script for the CSV path create_python_chart puts in its prompt."""
+    csv = re.search(r"<csv-path>\n(.+)\n</csv-path>", prompt).group(1)
+    png = os.path.splitext(csv)[0] + ".png"
+    return (
+        "import pandas as pd\nimport matplotlib\nmatplotlib.use('Agg')\nimport matplotlib.pyplot as plt\n\n"
+        f"pd.read_csv({csv!r}).plot.bar(x='region', y='amount')\nplt.savefig({png!r})\nprint({png!r})\n"
+    )
+
+
+# Tool arguments and the canned LLM answers each tool needs to take its main path
+CASES: dict[str, tuple[dict[str, Any], dict[str, Any]]] = {
+    "ingest_file": ({"prompt": PROMPT}, {"FileReadResponse": {"file": "notes.txt"}}),
+    "add_to_memory": ({"key": "bench_added", "value": "a value"}, {}),
+    "reset_active_memory": ({"force_delete": True}, {}),
+    "create_file": (
+        {"file_name": "generated.py", "prompt": PROMPT},
+        {"CreateFileResponse": {"file_name": "generated.py", "file_content": "```python\n" + "print('hi')\n" * 200 + "```"}},
+    ),
+    "update_file": (
+        {"prompt": PROMPT},
+        {"FileSelectionResponse": {"file": "example.py"}, "text": "print('updated')\n" * 200},
+    ),
+    "generate_sql_save_to_file": (
+        {"prompt": PROMPT},
+        {"GenerateSQLResponse": {"file_name": "top.sql", "sql_query": "SELECT * FROM sales", "output_format": ".csv"}},
+    ),
+    "generate_sql_and_execute": (
+        {"prompt": PROMPT},
+        {"GenerateSQLResponse": {"file_name": "top.csv", "sql_query": "SELECT * FROM sales", "output_format": ".csv"}},
+    ),
+    "run_sql_file": (
+        {"prompt": PROMPT},
+        {"FileReadResponse": {"file": "query.sql"}, "OutputFormatResponse": {"file_name": "query_out", "output_format": ".csv"}},
+    ),
+    "delete_file": ({"prompt": PROMPT, "force_delete": True}, {"FileDeleteResponse": {"file": "notes.txt", "force_delete": True}}),
+    "discuss_file": ({"prompt": PROMPT}, {"FileReadResponse": {"file": "notes.txt"}}),
+    "remove_variable_from_memory": ({"prompt": PROMPT}, {"MemoryKeyResponse": {"key": "bench_key"}}),
+    "read_file_into_memory": ({"prompt": PROMPT}, {"FileReadResponse": {"file": "notes.txt"}}),
+    "runnable_code_check": (
+        {"prompt": PROMPT},
+        {"FileReadResponse": {"file": "example.py"}, "IsRunnable": {"code_is_runnable": True}},
+    ),
+    "run_python": ({"prompt": PROMPT}, {"FileReadResponse": {"file": "example.py"}}),
+    "create_python_chart": (
+        {"prompt": PROMPT, "chart_type": "bar"},
+        {"FileReadResponse": {"file": "sales.csv"}, "text": chart_code},
+    ),
+}
+
+
+class ToolTiming(BaseModel):
+    tool: str
+    runs: int = 0
+    errors: list[str] = Field(default_factory=list)
+    total_ms: float = 0.0
+    stage_ms: dict[str, float] = Field(default_factory=lambda: {stage: 0.0 for stage in STAGES})
+
+    @property
+    def overhead_ms(self) -> float:
+        """Mean time per run outside the LLM layer."""
+        return (self.total_ms - self.stage_ms["llm"]) / self.runs if self.runs else 0.0
+
+
+class StageTimer:
+    """Exclusive wall time per stage: time in a nested stage is not counted for the outer one."""
+
+    def __init__(self):
+        self.totals = {stage: 0.0 for stage in STAGES}
+        self._stack: list[list] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        now = time.perf_counter()
+        if self._stack:
+            outer = self._stack[-1]
+            self.totals[outer[0]] += now - outer[1]
+        self._stack.append([name, now])
+        try:
+            yield
+        finally:
+            now = time.perf_counter()
+            name, started = self._stack.pop()
+            self.totals[name] += now - started
+            if self._stack:
+                self._stack[-1][1] = now
+
+    def wrap(self, name: str, func):
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def gen_wrapper(*args, **kwargs):
+                stream = func(*args, **kwargs)
+                while True:
+                    with self.stage(name):
+                        try:
+                            item = await stream.__anext__()
+                        except StopAsyncIteration:
+                            return
+                    yield item
+
+            return gen_wrapper
+        if inspect.iscoroutinefunction(func):
+
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with self.stage(name):
+                    return await func(*args, **kwargs)
+
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.stage(name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+
+class TimedFile:
+    """File object whose reads and writes count as ``file_io``."""
+
+    def __init__(self, timer: StageTimer, file):
+        self._timer = timer
+        self._file = file
+
+    def __getattr__(self, name):
+        attr = getattr(self._file, name)
+        if name in ("read", "readline", "readlines", "write", "writelines", "flush", "close"):
+            return self._timer.wrap("file_io", attr)
+        return attr
+
+    def __iter__(self):
+        return iter(self._file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        with self._timer.stage("file_io"):
+            return self._file.__exit__(*exc)
+
+
+class TimedDatabase:
+    def __init__(self, timer: StageTimer, database):
+        self._timer = timer
+        self._database = database
+
+    def __getattr__(self, name):
+        attr = getattr(self._database, name)
+        return self._timer.wrap("database", attr) if callable(attr) else attr
+
+
+def seed(directory: str) -> dict[str, str]:
+    """Fresh scratchpad, SQLite database and memory file; returns their paths."""
+    scratchpad = os.path.join(directory, "scratchpad")
+    shutil.rmtree(scratchpad, ignore_errors=True)
+    os.makedirs(scratchpad)
+    with open(os.path.join(scratchpad, "notes.txt"), "w") as f:
+        f.write("Meeting notes\n" + "- item\n" * 200)
+    with open(os.path.join(scratchpad, "example.py"), "w") as f:
+        f.write("print('hello from the benchmark')\n")
+    with open(os.path.join(scratchpad, "sales.csv"), "w") as f:
+        f.write("region,amount\n" + "".join(f"r{i},{i * 10}\n" for i in range(50)))
+    with open(os.path.join(scratchpad, "query.sql"), "w") as f:
+        f.write("SELECT region, amount FROM sales ORDER BY amount DESC LIMIT 10;\n")
+
+    database = os.path.join(directory, "bench.sqlite")
+    if os.path.exists(database):
+        os.remove(database)
+    with sqlite3.connect(database) as connection:
+        connection.execute("CREATE TABLE sales (region TEXT, amount INTEGER)")
+        connection.executemany("INSERT INTO sales VALUES (?, ?)", [(f"r{i}", i * 10) for i in range(50)])
+
+    memory = os.path.join(directory, "memory.json")
+    with open(memory, "w") as f:
+        json.dump({"bench_key": "bench value", "project": "benchmark"}, f)
+    return {"scratchpad": scratchpad, "database": database, "memory": memory}
+
+
+def default_args(func) -> Optional[dict[str, Any]]:
+    """No-argument call for tools without a case, or None when a required argument is missing."""
+    for parameter in inspect.signature(func).parameters.values():
+        if parameter.default is inspect.Parameter.empty:
+            return None
+    return {}
+
+
+async def run(tool_names: Optional[list[str]], repeat: int, latency_ms: float, directory: str) -> list[ToolTiming]:
+    paths = seed(directory)
+    # Set before the tools are imported: they read these at import or call time
+    os.environ["LLM_BACKEND"] = "scripted"
+    os.environ["LLM_CACHE_ENABLED"] = "false"
+    os.environ["SCRATCH_PAD_DIR"] = paths["scratchpad"]
+    os.environ["ACTIVE_MEMORY_FILE"] = paths["memory"]
+    os.environ["SQLITE_URL"] = paths["database"]
+
+    from ..modules import mermaid, tools
+    from ..modules.memory_management import memory_manager
+    from ..modules.scripted_llm import scripted_llm
+    from ..modules.utils import personalization
+
+    personalization["sql_dialect"] = "sqlite"
+    personalization.pop("focus_file", None)
+    scripted_llm.latency_ms = latency_ms
+
+    timer = StageTimer()
+    # Route everything each stage covers through the timer, in the namespaces the tools use
+    for module in (tools, mermaid):
+        for name in ("structured_output_prompt", "chat_prompt", "stream_chat_prompt", "stream_structured_output_prompt"):
+            if hasattr(module, name):
+                setattr(module, name, timer.wrap("llm", getattr(module, name)))
+    for name in ("get_xml_for_prompt", "load_memory", "save_memory", "create", "read", "update", "upsert", "delete", "list_keys", "reset"):
+        setattr(memory_manager, name, timer.wrap("memory", getattr(memory_manager, name)))
+    original_get_database_instance = tools.get_database_instance
+    tools.get_database_instance = lambda dialect: TimedDatabase(timer, original_get_database_instance(dialect))
+    tools.run_uv_script = timer.wrap("subprocess", tools.run_uv_script)
+    timed_open = timer.wrap("file_io", open)
+    tools.open = lambda *args, **kwargs: TimedFile(timer, timed_open(*args, **kwargs))
+    listdir, subprocess_run = os.listdir, subprocess.run
+    os.listdir = timer.wrap("listing", listdir)
+    subprocess.run = timer.wrap("subprocess", subprocess_run)
+
+    timings = []
+    try:
+        for name, func in tools.function_map.items():
+            if tool_names and name not in tool_names:
+                continue
+            if name in SKIPPED:
+                print(f"skipping {name}: {SKIPPED[name]}")
+                continue
+            args, responses = CASES.get(name, (default_args(func), {}))
+            if args is None:
+                print(f"skipping {name}: no benchmark case for its arguments")
+                continue
+            timing = ToolTiming(tool=name)
+            for _ in range(repeat):
+                seed(directory)
+                memory_manager.load_memory()
+                scripted_llm.responses = dict(responses)
+                timer.totals = {stage: 0.0 for stage in STAGES}
+                start = time.perf_counter()
+                with timer.stage("other"):
+                    try:
+                        await func(**args)
+                    except Exception as e:
+                        timing.errors.append(f"{type(e).__name__}: {e}")
+                timing.total_ms += (time.perf_counter() - start) * 1000
+                timing.runs += 1
+                for stage, seconds in timer.totals.items():
+                    timing.stage_ms[stage] += seconds * 1000
+            timings.append(timing)
+    finally:
+        os.listdir, subprocess.run = listdir, subprocess_run
+        del tools.open
+    return timings
+
+
+def report(timings: list[ToolTiming], latency_ms: float) -> None:
+    header = f"{'tool':<28} {'total':>8} " + " ".join(f"{stage:>10}" for stage in STAGES) + f" {'non-LLM':>8}"
+    print(f"mean ms per run, scripted LLM latency {latency_ms:.0f}ms per call")
+    print(header)
+    for t in sorted(timings, key=lambda t: t.overhead_ms, reverse=True):
+        stages = " ".join(f"{t.stage_ms[stage] / t.runs:>10.1f}" for stage in STAGES)
+        print(f"{t.tool:<28} {t.total_ms / t.runs:>8.1f} {stages} {t.overhead_ms:>8.1f}")
+    for t in timings:
+        if t.errors:
+            print(f"{t.tool}: {len(t.errors)}/{t.runs} runs failed, last error: {t.errors[-1]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tools", help="Comma-separated tool names (default: every tool in function_map)")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per tool")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Scripted latency per LLM call")
+    parser.add_argument("--json", help="Also write the timings to this JSON lines file")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="tool-pipeline-") as directory:
+        tool_names = args.tools.split(",") if args.tools else None
+        timings = asyncio.run(run(tool_names, max(1, args.repeat), args.latency_ms, directory))
+    report(timings, args.latency_ms)
+    if args.json:
+        with open(args.json, "w") as f:
+            f.writelines(t.model_dump_json() + "\n" for t in timings)
+
+
+if __name__ == "__main__":
+    main()
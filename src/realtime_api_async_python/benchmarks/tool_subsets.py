@@ -0,0 +1,73 @@
+"""
+Compare time-to-first-token of realtime responses with the full tool set and
+with reduced tool groups.
+
+    uv run python -m realtime_api_async_python.benchmarks.tool_subsets --runs 5 --groups all core,sql core
+
+Needs OPENAI_API_KEY; every run is a real text-only realtime session.
+"""
+import argparse
+import asyncio
+import statistics
+
+from ..batch_runner import HeadlessSession, PromptScript
+from ..modules.tools import registry
+from ..modules.tool_registry import resolve_groups
+from ..modules.utils import estimate_tokens
+
+DEFAULT_PROMPTS = [
+    "What time is it?",
+    "Select all users from the users table and save them to a csv file",
+    "Give me a random number",
+]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def bench_groups(groups: list[str], prompts: list[str], runs: int) -> dict:
+    ttft = []
+    for run in range(runs):
+        report = await HeadlessSession(tool_groups=groups).run_script(
+            PromptScript(script_id=f"{','.join(groups)}-{run}", prompts=prompts)
+        )
+        ttft += [t.time_to_first_token_s for t in report.turns if t.time_to_first_token_s is not None]
+    tools, tools_json = registry.payload(groups)
+    return {
+        "groups": ",".join(sorted(g.value for g in resolve_groups(groups))),
+        "tools": len(tools),
+        "tool_tokens": estimate_tokens(tools_json),
+        "turns": len(ttft),
+        "ttft_p50_s": statistics.median(ttft) if ttft else None,
+        "ttft_p90_s": percentile(ttft, 90) if ttft else None,
+    }
+
+
+async def main_async(group_sets: list[list[str]], prompts: list[str], runs: int) -> list[dict]:
+    # Sequential on purpose: concurrent sessions would share rate limits and skew the numbers
+    return [await bench_groups(groups, prompts, runs) for groups in group_sets]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="Sessions per tool group set")
+    parser.add_argument(
+        "--groups", nargs="+", default=["all", "core"], help="Comma separated tool group sets to compare"
+    )
+    parser.add_argument("--prompts", type=str, default=None, help="Prompts separated by |")
+    args = parser.parse_args()
+
+    prompts = args.prompts.split("|") if args.prompts else DEFAULT_PROMPTS
+    results = asyncio.run(main_async([g.split(",") for g in args.groups], prompts, args.runs))
+
+    print(f"{'groups':<40} {'tools':>5} {'~tokens':>8} {'turns':>5} {'ttft p50':>9} {'ttft p90':>9}")
+    for r in results:
+        p50 = f"{r['ttft_p50_s']:.3f}s" if r["ttft_p50_s"] is not None else "-"
+        p90 = f"{r['ttft_p90_s']:.3f}s" if r["ttft_p90_s"] is not None else "-"
+        print(f"{r['groups']:<40} {r['tools']:>5} {r['tool_tokens']:>8} {r['turns']:>5} {p50:>9} {p90:>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Whisper time and word error rate with and without cutting silence out of the
+audio first (modules/vad.py).
+
+    uv run python -m realtime_api_async_python.benchmarks.vad_trim --samples samples/ --model base.en
+
+``--samples`` is laid out as for whisper_cpu_rtf: 16-bit mono WAV files with a
+``.txt`` reference transcript next to each. Recordings with long pauses or
+leading and trailing silence gain the most.
+"""
+import argparse
+import asyncio
+import time
+
+from ..modules.whisper_speechtotext import WhisperModelRegistry, pcm16_to_float
+from .whisper_cpu_rtf import load_samples, word_error_rate
+
+
+async def run(model_name: str, samples) -> list[dict]:
+    registry = WhisperModelRegistry()
+    await registry.get_model(model_name)
+    rows = []
+    for name, audio_data, sample_rate, reference in samples:
+        audio = pcm16_to_float(audio_data, sample_rate)
+        start = time.perf_counter()
+        full = await registry.transcribe(audio, model_name, language="en")
+        full_s = time.perf_counter() - start
+        start = time.perf_counter()
+        trimmed = await registry.transcribe_speech(audio, model_name, language="en")
+        trimmed_s = time.perf_counter() - start
+        rows.append(
+            {
+                "name": name,
+                "audio_s": trimmed["audio_s"],
+                "speech_s": trimmed["speech_s"],
+                "full_s": full_s,
+                "trimmed_s": trimmed_s,
+                "full_wer": word_error_rate(reference, full.get("text", "")),
+                "trimmed_wer": word_error_rate(reference, trimmed["text"]),
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", required=True, help="Directory of WAV files with .txt references")
+    parser.add_argument("--model", default=None, help="Whisper checkpoint (default: the host profile's)")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No WAV files with .txt references in {args.samples}")
+    rows = asyncio.run(run(args.model, samples))
+
+    print(f"{'file':<24} {'audio':>7} {'speech':>7} {'full':>7} {'trimmed':>8} {'WER full':>9} {'WER trim':>9}")
+    for r in rows:
+        print(
+            f"{r['name']:<24} {r['audio_s']:>6.1f}s {r['speech_s']:>6.1f}s {r['full_s']:>6.2f}s "
+            f"{r['trimmed_s']:>7.2f}s {r['full_wer']:>9.1%} {r['trimmed_wer']:>9.1%}"
+        )
+    full_s, trimmed_s = sum(r["full_s"] for r in rows), sum(r["trimmed_s"] for r in rows)
+    print(f"total {full_s:.2f}s -> {trimmed_s:.2f}s ({1 - trimmed_s / full_s if full_s else 0:.0%} less inference time)")
+
+
+if __name__ == "__main__":
+    main()
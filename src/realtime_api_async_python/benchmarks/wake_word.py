@@ -0,0 +1,86 @@
+"""
+Detection rate, false accepts and detection latency of the local wake phrase
+gate (modules/wake_word.py).
+
+    uv run python -m realtime_api_async_python.benchmarks.wake_word --samples samples/ --phrase Ada
+
+``--samples`` is laid out as for whisper_cpu_rtf: 16-bit mono WAV files with a
+``.txt`` reference transcript next to each. Recordings whose reference contains
+the phrase should open the gate; every other recording that opens it is a
+false accept. Audio is fed in 100ms frames as the microphone loop does, and
+each phrase check is awaited before the next frame, so latency is the check
+itself and not queueing behind a live stream.
+"""
+import argparse
+import asyncio
+import time
+
+from ..modules.utils import WAKE_PHRASE, WAKE_WORD_MATCH, WAKE_WORD_MODEL
+from ..modules.wake_word import WakeWordGate, phrase_score
+from ..modules.whisper_speechtotext import whisper_registry
+from .whisper_cpu_rtf import load_samples
+
+
+async def run_sample(phrase: str, model_name: str, audio_data: bytes, sample_rate: int) -> dict:
+    gate = WakeWordGate(phrase, sample_rate, whisper_registry, model_name)
+    frame_bytes = sample_rate // 10 * 2
+    for offset in range(0, len(audio_data), frame_bytes):
+        gate.process(audio_data[offset : offset + frame_bytes])
+        await gate.wait_for_check()
+        if gate.is_open:
+            return {"detected_at_s": (offset + frame_bytes) / 2 / sample_rate, "metrics": gate.metrics}
+    return {"detected_at_s": None, "metrics": gate.metrics}
+
+
+async def run(phrase: str, model_name: str, samples) -> list[dict]:
+    await whisper_registry.get_model(model_name)
+    rows = []
+    for name, audio_data, sample_rate, reference in samples:
+        start = time.perf_counter()
+        result = await run_sample(phrase, model_name, audio_data, sample_rate)
+        rows.append(
+            {
+                "name": name,
+                "positive": phrase_score(reference, phrase) >= WAKE_WORD_MATCH,
+                "audio_s": len(audio_data) / 2 / sample_rate,
+                "wall_s": time.perf_counter() - start,
+                **result,
+            }
+        )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", required=True, help="Directory of WAV files with .txt references")
+    parser.add_argument("--phrase", default=WAKE_PHRASE, help="Wake phrase")
+    parser.add_argument("--model", default=WAKE_WORD_MODEL, help="Whisper checkpoint for the phrase checks")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No WAV files with .txt references in {args.samples}")
+    rows = asyncio.run(run(args.phrase, args.model, samples))
+
+    print(f"{'file':<24} {'phrase':>6} {'opened at':>10} {'checks':>7} {'latency':>8}")
+    for r in rows:
+        opened = f"{r['detected_at_s']:.1f}s" if r["detected_at_s"] is not None else "-"
+        latency = f"{r['metrics'].detection_latency_ms_last:.0f}ms" if r["detected_at_s"] is not None else "-"
+        print(f"{r['name']:<24} {str(r['positive']):>6} {opened:>10} {r['metrics'].checks:>7} {latency:>8}")
+
+    positives = [r for r in rows if r["positive"]]
+    negatives = [r for r in rows if not r["positive"]]
+    detected = [r for r in positives if r["detected_at_s"] is not None]
+    false_accepts = [r for r in negatives if r["detected_at_s"] is not None]
+    negative_hours = sum(r["audio_s"] for r in negatives) / 3600
+    latencies = [r["metrics"].detection_latency_ms_last for r in detected]
+    print(
+        f"detected {len(detected)}/{len(positives)} phrases, "
+        f"false accepts {len(false_accepts)}/{len(negatives)} "
+        f"({len(false_accepts) / negative_hours if negative_hours else 0:.1f} per hour of other audio), "
+        f"mean check latency {sum(latencies) / len(latencies) if latencies else 0:.0f}ms"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Real-time factor (processing time / audio duration) against word error rate
+for Whisper checkpoints on the CPU, with and without int8 quantization.
+
+    uv run python -m realtime_api_async_python.benchmarks.whisper_cpu_rtf --samples samples/ --models base.en small.en
+
+``--samples`` is a directory of 16-bit mono WAV files, each with a ``.txt``
+reference transcript next to it (``hello.wav`` + ``hello.txt``). An RTF below
+1.0 is faster than real time.
+"""
+import argparse
+import asyncio
+import re
+import time
+import wave
+from pathlib import Path
+
+from ..modules.whisper_speechtotext import WhisperModelRegistry, pcm16_to_float, resolve_profile
+
+
+def normalize(text: str) -> list[str]:
+    return re.sub(r"[^a-z0-9' ]+", " ", text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    ref, hyp = normalize(reference), normalize(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    # Levenshtein distance over words, one row at a time
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, start=1):
+        current = [i] + [0] * len(hyp)
+        for j, hyp_word in enumerate(hyp, start=1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            )
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def load_samples(directory: str) -> list[tuple[str, bytes, int, str]]:
+    samples = []
+    for wav_path in sorted(Path(directory).glob("*.wav")):
+        reference_path = wav_path.with_suffix(".txt")
+        if not reference_path.exists():
+            continue
+        with wave.open(str(wav_path), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"{wav_path} is not 16-bit mono")
+            samples.append((wav_path.name, wav.readframes(wav.getnframes()), wav.getframerate(), reference_path.read_text()))
+    return samples
+
+
+async def bench(model_name: str, quantize: bool, samples) -> dict:
+    profile = resolve_profile(device="cpu", model_name=model_name).model_copy(update={"quantize": quantize})
+    registry = WhisperModelRegistry(profile)
+    start = time.perf_counter()
+    await registry.get_model()
+    load_s = time.perf_counter() - start
+
+    audio_s = processing_s = errors = 0.0
+    for _, audio_data, sample_rate, reference in samples:
+        audio = pcm16_to_float(audio_data, sample_rate)
+        audio_s += len(audio_data) / 2 / sample_rate
+        start = time.perf_counter()
+        result = await registry.transcribe(audio, language="en")
+        processing_s += time.perf_counter() - start
+        errors += word_error_rate(reference, result.get("text", ""))
+    return {
+        "model": model_name,
+        "int8": quantize,
+        "load_s": load_s,
+        "rtf": processing_s / audio_s if audio_s else 0.0,
+        "wer": errors / len(samples) if samples else 0.0,
+    }
+
+
+async def run(models: list[str], samples) -> list[dict]:
+    return [await bench(model, quantize, samples) for model in models for quantize in (False, True)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--samples", required=True, help="Directory of WAV files with .txt references")
+    parser.add_argument("--models", nargs="+", default=["tiny.en", "base.en", "small.en"], help="Checkpoints to compare")
+    args = parser.parse_args()
+
+    samples = load_samples(args.samples)
+    if not samples:
+        parser.error(f"No WAV files with .txt references in {args.samples}")
+    results = asyncio.run(run(args.models, samples))
+
+    print(f"{'model':<12} {'int8':>5} {'load':>7} {'RTF':>6} {'WER':>6}")
+    for r in results:
+        print(f"{r['model']:<12} {str(r['int8']):>5} {r['load_s']:>6.1f}s {r['rtf']:>6.2f} {r['wer']:>6.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+"""
+Latency of local Whisper transcription: loading the model on every call (the
+old behaviour) against the warm model registry, on the first and subsequent
+calls, plus the worst event loop stall seen while transcribing.
+
+    uv run python -m realtime_api_async_python.benchmarks.whisper_latency --model base --wav sample.wav --calls 5
+
+Without --wav a few seconds of a synthetic tone are used; that measures latency
+but not transcription quality.
+"""
+import argparse
+import asyncio
+import time
+import wave
+
+import numpy as np
+
+from ..modules.utils import RATE
+from ..modules.whisper_speechtotext import WhisperModelRegistry, pcm16_to_float
+
+
+def load_audio(path: str | None, seconds: float) -> tuple[bytes, int]:
+    if path:
+        with wave.open(path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError("Expected a 16-bit mono WAV file")
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+    t = np.arange(int(seconds * RATE)) / RATE
+    tone = (0.2 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+    return tone.tobytes(), RATE
+
+
+async def measure_loop_stall(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Worst delay of a 10ms timer; large values mean something blocked the event loop."""
+    worst = 0.0
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - start - interval)
+    return worst
+
+
+async def timed(coro) -> tuple[float, float]:
+    stop = asyncio.Event()
+    stall_task = asyncio.create_task(measure_loop_stall(stop))
+    start = time.perf_counter()
+    await coro
+    elapsed = time.perf_counter() - start
+    stop.set()
+    return elapsed, await stall_task
+
+
+async def load_per_call(model_name: str, audio: np.ndarray) -> dict:
+    # What transcribe_audio used to do: load the weights and transcribe on the event loop
+    import whisper
+
+    model = whisper.load_model(model_name)
+    return model.transcribe(audio, language="en", fp16=model.device.type == "cuda")
+
+
+async def run(model_name: str, audio: np.ndarray, calls: int) -> list[tuple[str, float, float]]:
+    rows = []
+    for i in range(min(calls, 2)):
+        elapsed, stall = await timed(load_per_call(model_name, audio))
+        rows.append((f"load per call #{i + 1}", elapsed, stall))
+
+    registry = WhisperModelRegistry()
+    for i in range(calls):
+        elapsed, stall = await timed(registry.transcribe(audio, model_name, language="en"))
+        rows.append((f"registry call #{i + 1}" + (" (loads model)" if i == 0 else ""), elapsed, stall))
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default="base", help="Whisper model size")
+    parser.add_argument("--wav", default=None, help="16-bit mono WAV file to transcribe")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Length of the synthetic clip")
+    parser.add_argument("--calls", type=int, default=5, help="Registry calls to time")
+    args = parser.parse_args()
+
+    audio_data, sample_rate = load_audio(args.wav, args.seconds)
+    audio = pcm16_to_float(audio_data, sample_rate)
+    rows = asyncio.run(run(args.model, audio, args.calls))
+
+    print(f"{'call':<32} {'latency':>9} {'loop stall':>11}")
+    for name, elapsed, stall in rows:
+        print(f"{name:<32} {elapsed:>8.2f}s {stall * 1000:>9.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
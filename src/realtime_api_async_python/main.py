@@ -9,24 +9,34 @@ from datetime import datetime
 from dotenv import load_dotenv
 from websockets.exceptions import ConnectionClosedError
 import asyncjson
-from .modules.email_agent import get_fresh_credentials
 
-from   realtime_api_async_python.modules import openai_realtime , whisper_speechtotext
+from   realtime_api_async_python.modules import openai_realtime
 from .modules.logging import log_tool_call, log_error, log_info, log_warning
 
 # Import from modules
-from .modules.async_microphone import AsyncMicrophone, ConversationState
+from .modules.async_microphone import AsyncMicrophone, ConversationState, QueueMicrophone
 from .modules.audio import play_audio
+from .modules.send_queue import OutgoingEventQueue, EventPriority
+from .modules.context_window import ConversationContextManager
+from .modules.gateway import Gateway, GATEWAY_HOST, GATEWAY_PORT
+from .modules.idle_policy import IdlePolicy
+from .modules.llm import log_llm_metrics
+from .modules.startup import startup_orchestrator, log_warmup_summary
+from .modules.transcript_cache import transcript_cache
 from .modules.tools import (
     function_map,
     tools,
 )
+from .modules.tool_registry import ToolSession, active_tool_session
 from .modules.utils import (
     RUN_TIME_TABLE_LOG_JSON,
     SESSION_INSTRUCTIONS,
     PREFIX_PADDING_MS,
     SILENCE_THRESHOLD,
     SILENCE_DURATION_MS,
+    TOOL_GROUPS,
+    WAKE_WORD_ENABLED,
+    IDLE_TIMEOUT_S,
 )
 from .modules.logging import logger, log_ws_event
 import sys
@@ -42,6 +52,8 @@ if missing_vars:
     logger.error("Please set these variables in your .env file.")
     sys.exit(1)
 
+REALTIME_URL = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
+
 scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
 
 # Ensure the scratch pad directory exists
@@ -53,15 +65,27 @@ with open(os.getenv("PERSONALIZATION_FILE"), "r") as f:
 
 
 class OpenAIRealtimeAPI:
-    def __init__(self):
+    def __init__(
+        self,
+        mic=None,
+        audio_sink=play_audio,
+        tool_groups=TOOL_GROUPS,
+        wake_word=WAKE_WORD_ENABLED,
+        idle_timeout_s=IDLE_TIMEOUT_S,
+    ):
         
         self.api_key = os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             logger.error("Please set the OPENAI_API_KEY in your .env file.")
             sys.exit(1)
         self.exit_event = asyncio.Event()
-        self.conversation_state = ConversationState()
-        self.mic = AsyncMicrophone(conversation_state=self.conversation_state)
+        if mic is None:
+            self.conversation_state = ConversationState()
+            self.mic = AsyncMicrophone(conversation_state=self.conversation_state)
+        else:
+            self.conversation_state = mic.conversation_state
+            self.mic = mic
+        self.audio_sink = audio_sink
 
         # Initialize state variables
         self.assistant_reply = ""
@@ -70,27 +94,70 @@ class OpenAIRealtimeAPI:
         self.function_call = None
         self.function_call_args = ""
         self.response_start_time = None
+        self.send_queue = None
+        self.prompts = None
+        self.context = ConversationContextManager()
+        self.tool_groups = tool_groups
+        self.tool_session = None
+        self.idle_policy = IdlePolicy(idle_timeout_s) if idle_timeout_s > 0 else None
+        self.wake_gate = None
+        if wake_word:
+            # Only imported when enabled; it pulls in the local Whisper stack
+            from .modules.wake_word import WakeWordGate
+
+            self.wake_gate = WakeWordGate(sample_rate=self.mic.config.rate)
+
+    def connect(self):
+        headers = {
+            "Authorization": f"Bearer {self.api_key}",
+            "OpenAI-Beta": "realtime=v1",
+        }
+        return websockets.connect(
+            REALTIME_URL,
+            extra_headers=headers,
+            close_timeout=120,
+            ping_interval=30,
+            ping_timeout=10,
+        )
+
+    def start_tool_session(self, groups=None) -> ToolSession:
+        """Enable the configured tool groups for a new server session; switch_tool_groups changes them."""
+        self.tool_session = ToolSession(
+            groups if groups is not None else self.tool_groups,
+            on_change=lambda groups: openai_realtime.update_session_tools(self.send_queue, groups),
+        )
+        active_tool_session.set(self.tool_session)
+        return self.tool_session
 
     async def run(self, prompts=None):
-        await get_fresh_credentials()
+        self.prompts = prompts
+        # Credentials, agents and DNS warm up in the background while we connect;
+        # tools wait for the piece they need on first use.
+        run_started = time.perf_counter()
+        startup_orchestrator.start()
+        summary_task = asyncio.create_task(log_warmup_summary())
+        resume_audio = None  # speech heard while the session was closed for inactivity
         while True:
+            went_idle = False
             try:
-                url = "wss://api.openai.com/v1/realtime?model=gpt-4o-realtime-preview-2024-10-01"
-                headers = {
-                    "Authorization": f"Bearer {self.api_key}",
-                    "OpenAI-Beta": "realtime=v1",
-                }
-
-                async with websockets.connect(
-                    url,
-                    extra_headers=headers,
-                    close_timeout=120,
-                    ping_interval=30,
-                    ping_timeout=10,
-                ) as websocket:
+                async with self.connect() as websocket:
                     log_info("✅ Connected to the server.", style="bold green")
-
-                    await openai_realtime.initialize_session(websocket)
+                    if run_started is not None:
+                        log_runtime("startup_to_connected", time.perf_counter() - run_started)
+                        run_started = None
+
+                    self.send_queue = OutgoingEventQueue()
+                    resuming = resume_audio is not None
+                    # After an idle close the new session gets the conversation so far
+                    replay_events = self.context.replay_events() if resuming else []
+                    self.context.reset()
+                    writer_task = asyncio.create_task(self.send_queue.run(websocket))
+                    tool_session = self.start_tool_session(
+                        self.tool_session.groups if resuming and self.tool_session else None
+                    )
+                    await openai_realtime.initialize_session(self.send_queue, tool_groups=tool_session.groups)
+                    for event in replay_events:
+                        self.send_queue.put_event(event)
                     ws_task = asyncio.create_task(self.process_ws_messages(websocket))
 
                     logger.info(
@@ -103,15 +170,28 @@ class OpenAIRealtimeAPI:
                         self.mic.start_recording()
                         logger.info("Recording started. Listening for speech...")
 
-                   
-                    await self.send_audio_loop([openai_realtime.get_openai_send_audio_callback(websocket)], [openai_realtime.get_openai_after_recieve_callback(websocket)])
+                    if self.idle_policy is not None:
+                        self.idle_policy.touch()
+                    if resuming:
+                        # Queued behind the session update and the replayed items
+                        self.send_queue.put_audio(resume_audio)
+                        resume_audio = None
+                        self.idle_policy.resumed()
+
+                    went_idle = await self.send_audio_loop([openai_realtime.get_openai_send_audio_callback(self.send_queue)], [openai_realtime.get_openai_after_recieve_callback(websocket, self.send_queue)])
                     logger.info("before await ws_task")
 
                     # Wait for the WebSocket processing task to complete
                     await ws_task
+                    self.send_queue.close()
+                    await writer_task
 
                     logger.info("await ws_task complete")
 
+                if went_idle:
+                    # The microphone keeps capturing; reconnect as soon as someone speaks
+                    resume_audio = await self.idle_policy.wait_for_speech(self.mic, self.wake_gate)
+                    continue
                 # If execution reaches here without exceptions, exit the loop
                 break
             except ConnectionClosedError as e:
@@ -128,8 +208,14 @@ class OpenAIRealtimeAPI:
                 logger.exception(f"An unexpected error occurred: {e}")
                 break  # Exit the loop on unexpected exceptions
             finally:
-                self.mic.stop_recording()
-                self.mic.close()
+                if not went_idle:
+                    self.mic.stop_recording()
+                    self.mic.close()
+        summary_task.cancel()
+        if self.idle_policy is not None:
+            self.idle_policy.log_metrics()
+        transcript_cache.log_metrics()
+        log_llm_metrics()
 
 
 
@@ -139,6 +225,8 @@ class OpenAIRealtimeAPI:
                 message = await websocket.recv()
                 event = json.loads(message)
                 log_ws_event("Incoming", event)
+                if self.idle_policy is not None:
+                    self.idle_policy.touch()
                 await self.handle_event(event, websocket)
             except websockets.ConnectionClosed:
                 log_warning("⚠️ WebSocket connection lost.")
@@ -168,7 +256,16 @@ class OpenAIRealtimeAPI:
             case "response.audio.delta":
                 self.audio_chunks.append(base64.b64decode(event["delta"]))
                 
+            case "conversation.item.created" | "response.output_item.done":
+                self.context.track(event.get("item", {}))
+
+            case "conversation.item.deleted":
+                self.context.forget(event.get("item_id"))
+
             case "response.done":
+                self.context.observe_usage(event.get("response", {}).get("usage"))
+                for trim_event in self.context.trim_events():
+                    self.send_queue.put_event(trim_event)
                 await self.handle_response_done()
                 
             case "error":
@@ -176,6 +273,8 @@ class OpenAIRealtimeAPI:
                 
             case "input_audio_buffer.speech_started":
                 logger.info("Speech detected, listening...")
+                if self.wake_gate is not None:
+                    self.wake_gate.touch()
                 
             case "input_audio_buffer.speech_stopped":
                 await self.handle_speech_stopped(websocket)
@@ -208,11 +307,15 @@ class OpenAIRealtimeAPI:
                 args = {}
             await self.execute_function_call(function_name, call_id, args, websocket)
 
+    async def call_tool(self, function_name, args):
+        result = await function_map[function_name](**args)
+        log_tool_call(function_name, args, result)
+        return result
+
     async def execute_function_call(self, function_name, call_id, args, websocket):
         if function_name in function_map:
             try:
-                result = await function_map[function_name](**args)
-                log_tool_call(function_name, args, result)
+                result = await self.call_tool(function_name, args)
             except Exception as e:
                 error_message = f"Error executing function '{function_name}': {str(e)}"
                 log_error(error_message)
@@ -232,9 +335,8 @@ class OpenAIRealtimeAPI:
                 "output": await asyncjson.dumps(result),
             },
         }
-        log_ws_event("Outgoing", function_call_output)
-        await websocket.send(await asyncjson.dumps(function_call_output))
-        await websocket.send(await asyncjson.dumps({"type": "response.create"}))
+        self.send_queue.put_event(function_call_output)
+        self.send_queue.put_event({"type": "response.create"})
 
         # Reset function call state
         self.function_call = None
@@ -249,8 +351,7 @@ class OpenAIRealtimeAPI:
                 "content": [{"type": "text", "text": error_message}],
             },
         }
-        log_ws_event("Outgoing", error_item)
-        await websocket.send(await asyncjson.dumps(error_item))
+        self.send_queue.put_event(error_item)
 
     async def handle_response_done(self):
         if self.response_start_time is not None:
@@ -263,14 +364,17 @@ class OpenAIRealtimeAPI:
         if self.audio_chunks:
             audio_data = b"".join(self.audio_chunks)
             logger.info(
-                f"Sending {len(audio_data)} bytes of audio data to play_audio()"
+                f"Sending {len(audio_data)} bytes of audio data to the audio sink"
             )
-            await play_audio(audio_data)
-            logger.info("Finished play_audio()")
+            await self.audio_sink(audio_data)
+            logger.info("Finished playing audio")
         self.assistant_reply = ""
         self.audio_chunks = []
         logger.info("Calling stop_receiving()")
         self.conversation_state.stop_receiving()
+        if self.wake_gate is not None:
+            # Give the user the full hold time to answer the assistant
+            self.wake_gate.touch()
 
     async def handle_error(self, event, websocket):
         error_message = event.get("error", {}).get("message", "")
@@ -287,11 +391,15 @@ class OpenAIRealtimeAPI:
         self.mic.stop_recording()
         logger.info("Speech ended, processing...")
         self.response_start_time = time.perf_counter()
-        await websocket.send(await asyncjson.dumps({"type": "input_audio_buffer.commit"}))
+        # Keep the commit ordered behind audio that is still queued for sending
+        self.send_queue.put_event({"type": "input_audio_buffer.commit"}, EventPriority.AUDIO)
 
     async def send_initial_prompts(self, websocket):
         logger.info(f"Sending {len(self.prompts)} prompts: {self.prompts}")
-        content = [{"type": "input_text", "text": prompt} for prompt in self.prompts]
+        self.send_user_text(self.prompts)
+
+    def send_user_text(self, prompts):
+        content = [{"type": "input_text", "text": prompt} for prompt in prompts]
         event = {
             "type": "conversation.item.create",
             "item": {
@@ -300,32 +408,43 @@ class OpenAIRealtimeAPI:
                 "content": content,
             },
         }
-        log_ws_event("Outgoing", event)
-        await websocket.send(await asyncjson.dumps(event))
+        self.send_queue.put_event(event)
 
         # Trigger the assistant's response
-        response_create_event = {"type": "response.create"}
-        log_ws_event("Outgoing", response_create_event)
-        await websocket.send(await asyncjson.dumps(response_create_event))
+        self.send_queue.put_event({"type": "response.create"})
 
             
 
     async def send_audio_loop(self, callbacks, post_callbacks):
-        """ Continuously send audio data to the assistant """
+        """ Continuously send audio data to the assistant. Returns True when the session went idle. """
+        went_idle = False
         try:
             while not self.exit_event.is_set():
                 await asyncio.sleep(0.1)  # Small delay to accumulate audio data
+                if self.idle_policy is not None and not self.prompts:
+                    busy = self.response_in_progress or self.conversation_state.is_receiving or self.function_call
+                    if self.idle_policy.should_close(busy=bool(busy)):
+                        went_idle = True
+                        break
                 if not self.conversation_state.is_receiving:
                     audio_data =  self.mic.get_audio_data()
+                    if audio_data and self.wake_gate is not None:
+                        # Nothing leaves the machine until the wake phrase is heard
+                        audio_data = self.wake_gate.process(audio_data)
                     if audio_data and len(audio_data) > 0:                        
                         await asyncio.gather(*[callback(audio_data) for callback in callbacks])
         except KeyboardInterrupt:
             logger.info("Keyboard interrupt received. Closing the connection.")
         finally:
-            self.exit_event.set()
-            self.mic.stop_recording()
-            self.mic.close()
+            if not went_idle:
+                self.exit_event.set()
+                self.mic.stop_recording()
+                self.mic.close()
+                if self.wake_gate is not None:
+                    self.wake_gate.cancel()
+                    self.wake_gate.log_metrics()
             await asyncio.gather(*[callback() for callback in post_callbacks])
+        return went_idle
 
 
 def main():
@@ -335,11 +454,49 @@ def main():
         description="Run the realtime API with optional prompts."
     )
     parser.add_argument("--prompts", type=str, help="Prompts separated by |")
+    parser.add_argument(
+        "--batch",
+        type=str,
+        help="File of prompt scripts to run as concurrent headless text sessions",
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Concurrent sessions for --batch"
+    )
+    parser.add_argument(
+        "--report", type=str, default="batch_report.jsonl", help="JSONL report path for --batch"
+    )
+    parser.add_argument(
+        "--gateway",
+        action="store_true",
+        help="Accept client audio connections and shard sessions across worker processes",
+    )
+    parser.add_argument("--host", type=str, default=GATEWAY_HOST, help="Gateway listen host")
+    parser.add_argument("--port", type=int, default=GATEWAY_PORT, help="Gateway listen port")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="Gateway worker processes (default: one per core)"
+    )
     args = parser.parse_args()
 
+    if args.gateway:
+        try:
+            asyncio.run(Gateway(args.workers, args.host, args.port).serve())
+        except KeyboardInterrupt:
+            logger.info("Gateway terminated by user")
+        return
+
+    if args.batch:
+        from .batch_runner import run_batch
+
+        try:
+            asyncio.run(run_batch(args.batch, args.report, args.concurrency))
+        except KeyboardInterrupt:
+            logger.info("Batch run terminated by user")
+        return
+
     prompts = args.prompts.split("|") if args.prompts else None
 
-    realtime_api_instance = OpenAIRealtimeAPI()
+    # Text prompts don't need an audio device, so skip opening PortAudio
+    realtime_api_instance = OpenAIRealtimeAPI(mic=QueueMicrophone() if prompts else None)
     try:
         asyncio.run(realtime_api_instance.run(prompts))
     except KeyboardInterrupt:
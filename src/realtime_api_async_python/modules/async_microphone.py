@@ -6,7 +6,7 @@ from pydantic import BaseModel
 
 
 from pydantic import BaseModel, Field, PrivateAttr
-from typing import Optional
+from typing import Callable, Optional
 import pyaudio
 import queue
 import logging
@@ -40,10 +40,12 @@ class AsyncMicrophone(BaseModel):
     _p: pyaudio.PyAudio = PrivateAttr()
     _stream: pyaudio.Stream = PrivateAttr()
     _queue: queue.Queue = PrivateAttr()
+    _listeners: list = PrivateAttr()
 
     def model_post_init(self, __context) -> None:
         """Initialize PyAudio components after model initialization"""
         self._queue = queue.Queue()
+        self._listeners = []
         self._p = pyaudio.PyAudio()
         self._stream = self._p.open(
             format=self.config.format,
@@ -58,8 +60,18 @@ class AsyncMicrophone(BaseModel):
     def callback(self, in_data, frame_count, time_info, status):
         if self.is_recording and not self.conversation_state.is_receiving:
             self._queue.put(in_data)
+            for listener in tuple(self._listeners):
+                listener(in_data)
         return (None, pyaudio.paContinue)
 
+    def add_listener(self, listener: Callable[[bytes], None]) -> None:
+        """Also hand every captured frame to ``listener``. Called on the PortAudio thread."""
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[bytes], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
     def start_recording(self) -> None:
         self.is_recording = True
         logging.info("Started recording. State: %s", self.conversation_state.model_dump_json())
@@ -85,4 +97,52 @@ class AsyncMicrophone(BaseModel):
         logging.info("AsyncMicrophone closed")
 
     class Config:
-        arbitrary_types_allowed = True
\ No newline at end of file
+        arbitrary_types_allowed = True
+
+
+class QueueMicrophone(BaseModel):
+    """
+    Drop-in replacement for AsyncMicrophone that is fed audio frames by the
+    caller instead of PortAudio, e.g. from a remote client connection.
+    """
+    config: AudioFormat = Field(default_factory=AudioFormat)
+    conversation_state: ConversationState = Field(default_factory=ConversationState)
+    is_recording: bool = Field(default=False, description="Whether the microphone is recording")
+
+    _queue: queue.Queue = PrivateAttr()
+    _listeners: list = PrivateAttr()
+
+    def model_post_init(self, __context) -> None:
+        self._queue = queue.Queue()
+        self._listeners = []
+
+    def feed(self, in_data: bytes) -> None:
+        if self.is_recording and not self.conversation_state.is_receiving:
+            self._queue.put(in_data)
+            for listener in tuple(self._listeners):
+                listener(in_data)
+
+    def add_listener(self, listener: Callable[[bytes], None]) -> None:
+        self._listeners.append(listener)
+
+    def remove_listener(self, listener: Callable[[bytes], None]) -> None:
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def start_recording(self) -> None:
+        self.is_recording = True
+
+    def stop_recording(self) -> None:
+        self.is_recording = False
+
+    def get_audio_data(self) -> Optional[bytes]:
+        data = b""
+        while not self._queue.empty():
+            data += self._queue.get()
+        return data if data else None
+
+    def close(self) -> None:
+        self.is_recording = False
+
+    class Config:
+        arbitrary_types_allowed = True
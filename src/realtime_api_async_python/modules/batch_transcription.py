@@ -0,0 +1,265 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import wave
+from concurrent.futures import Executor, ProcessPoolExecutor
+from pathlib import Path
+from typing import Optional
+
+import aiofiles
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_info
+from .transcript_cache import TRANSCRIPT_CACHE_ENABLED, TranscriptCache, transcript_key
+from .utils import RATE, WHISPER_DEVICE, WHISPER_MODEL, WHISPER_THREADS
+from .vad import VAD_ENABLED
+from .whisper_speechtotext import WhisperModelRegistry, pcm16_to_float, resolve_profile
+
+AUDIO_SUFFIXES = (".wav", ".pcm")
+# Each worker process holds its own model; on the CPU the cores are split between them
+BATCH_TRANSCRIBE_WORKERS = int(os.getenv("BATCH_TRANSCRIBE_WORKERS", str(max(1, (os.cpu_count() or 1) // 4))))
+
+
+class AudioJob(BaseModel):
+    path: str = Field(description="Absolute path of a WAV or raw PCM16 mono file")
+    sample_rate: int = Field(default=RATE, description="Sample rate of raw .pcm files; WAV headers take precedence")
+
+
+class TranscriptRecord(BaseModel):
+    path: str
+    text: str = ""
+    language: Optional[str] = None
+    audio_s: float = Field(default=0.0, description="Duration of the recording")
+    processing_s: float = Field(default=0.0, description="Time spent reading and transcribing the file")
+    worker: Optional[int] = Field(default=None, description="PID of the worker process")
+    cached: bool = Field(default=False, description="Answered from the transcript cache")
+    error: Optional[str] = None
+
+
+class BatchSummary(BaseModel):
+    files: int = 0
+    skipped: int = Field(default=0, description="Files already transcribed by an earlier run")
+    failed: int = 0
+    cached: int = Field(default=0, description="Files answered from the transcript cache")
+    audio_s: float = 0.0
+    wall_s: float = 0.0
+
+    @property
+    def audio_hours_per_wall_hour(self) -> float:
+        return self.audio_s / self.wall_s if self.wall_s else 0.0
+
+
+def discover_jobs(source: str, sample_rate: int = RATE) -> list[AudioJob]:
+    """
+    Collect the recordings to transcribe. ``source`` is either a directory,
+    searched recursively for .wav and .pcm files, or a manifest with one entry
+    per line: a path, or a JSON object with ``path`` and optionally
+    ``sample_rate``. Relative manifest paths are resolved against the
+    manifest's directory. Blank lines and ``#`` comments are skipped.
+    """
+    source_path = Path(source)
+    if source_path.is_dir():
+        return [
+            AudioJob(path=str(path.resolve()), sample_rate=sample_rate)
+            for path in sorted(source_path.rglob("*"))
+            if path.suffix.lower() in AUDIO_SUFFIXES and path.is_file()
+        ]
+
+    jobs = []
+    with open(source_path, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            entry = json.loads(line) if line.startswith("{") else {"path": line}
+            path = Path(entry["path"])
+            if not path.is_absolute():
+                path = source_path.parent / path
+            jobs.append(AudioJob(path=str(path.resolve()), sample_rate=entry.get("sample_rate", sample_rate)))
+    return jobs
+
+
+def read_audio(job: AudioJob) -> tuple[bytes, int]:
+    """Return the PCM16 mono samples of ``job`` and their sample rate."""
+    if job.path.lower().endswith(".wav"):
+        with wave.open(job.path, "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getnchannels() != 1:
+                raise ValueError(f"{job.path} is not 16-bit mono")
+            return wav.readframes(wav.getnframes()), wav.getframerate()
+    with open(job.path, "rb") as f:
+        return f.read(), job.sample_rate
+
+
+def completed_paths(output_path: str) -> set[str]:
+    """Paths an earlier run already transcribed without error, read from its JSONL output."""
+    done = set()
+    if not os.path.exists(output_path):
+        return done
+    with open(output_path, "r") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write leaves a partial last line
+                continue
+            if not record.get("error"):
+                done.add(record["path"])
+    return done
+
+
+def truncate_partial_line(output_path: str, chunk_size: int = 64 * 1024) -> None:
+    """Cut a partial last line left by a run killed mid-write, so appended records start on their own line."""
+    if not os.path.exists(output_path):
+        return
+    with open(output_path, "rb+") as f:
+        end = f.seek(0, os.SEEK_END)
+        position = end
+        while position > 0:
+            start = max(0, position - chunk_size)
+            f.seek(start)
+            newline = f.read(position - start).rfind(b"\n")
+            if newline != -1:
+                position = start + newline + 1
+                break
+            position = start
+        if position < end:
+            # The cut record was not in completed_paths either, so it is transcribed again
+            f.truncate(position)
+
+
+# One registry and transcript cache per worker process, created by _init_worker
+_worker_registry: Optional[WhisperModelRegistry] = None
+_worker_cache: Optional[TranscriptCache] = None
+
+
+def _init_worker(device: Optional[str], model_name: Optional[str], threads: int) -> None:
+    global _worker_registry, _worker_cache
+    profile = resolve_profile(device, model_name)
+    if profile.device == "cpu" and not profile.intra_op_threads:
+        profile = profile.model_copy(update={"intra_op_threads": threads})
+    _worker_registry = WhisperModelRegistry(profile)
+    _worker_cache = TranscriptCache() if TRANSCRIPT_CACHE_ENABLED else None
+    # Load the weights before the first job so the model stays warm for every file
+    _worker_registry._load()
+
+
+def transcribe_file(job: AudioJob) -> TranscriptRecord:
+    """Runs in a worker process; errors are recorded rather than raised so one bad file does not end the batch."""
+    record = TranscriptRecord(path=job.path, worker=os.getpid())
+    start = time.perf_counter()
+    try:
+        audio_data, sample_rate = read_audio(job)
+        record.audio_s = len(audio_data) / 2 / sample_rate
+        result, key = None, None
+        if _worker_cache is not None:
+            config = _worker_registry.cache_config(None, VAD_ENABLED, language="en")
+            key = transcript_key(audio_data, sample_rate, config)
+            result = _worker_cache.lookup(key, record.audio_s)
+            record.cached = result is not None
+        if result is None:
+            # Already off the event loop, so call the registry's worker-side methods directly
+            transcribe = _worker_registry._transcribe_speech if VAD_ENABLED else _worker_registry._transcribe
+            result = transcribe(None, pcm16_to_float(audio_data, sample_rate), language="en")
+            if key is not None:
+                _worker_cache.store(key, result)
+        record.text = result.get("text", "").strip()
+        record.language = result.get("language")
+    except Exception as e:
+        record.error = f"{type(e).__name__}: {e}"
+    record.processing_s = time.perf_counter() - start
+    return record
+
+
+def create_pool(workers: int, device: Optional[str] = WHISPER_DEVICE, model_name: Optional[str] = WHISPER_MODEL) -> ProcessPoolExecutor:
+    threads = WHISPER_THREADS or max(1, (os.cpu_count() or 1) // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        # torch does not survive fork once it has started its thread pools
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_worker,
+        initargs=(device, model_name, threads),
+    )
+
+
+async def transcribe_batch(
+    source: str,
+    output_path: str,
+    workers: int = BATCH_TRANSCRIBE_WORKERS,
+    resume: bool = True,
+    sample_rate: int = RATE,
+    executor: Optional[Executor] = None,
+) -> BatchSummary:
+    """
+    Transcribe every recording in ``source`` (see ``discover_jobs``) on a pool
+    of ``workers`` processes, each with its own warm Whisper model, appending
+    one JSON line per file to ``output_path`` as each finishes. With
+    ``resume`` files already transcribed in ``output_path`` are skipped and
+    failed ones are retried; otherwise the output is overwritten.
+    """
+    jobs = discover_jobs(source, sample_rate)
+    done = completed_paths(output_path) if resume else set()
+    pending = [job for job in jobs if job.path not in done]
+    summary = BatchSummary(files=len(pending), skipped=len(jobs) - len(pending))
+    log_info(
+        f"Transcribing {len(pending)} recordings with {workers} workers ({summary.skipped} already done)",
+        style="bold green",
+    )
+    if not pending:
+        return summary
+
+    loop = asyncio.get_running_loop()
+    pool = executor or create_pool(workers)
+    start = time.perf_counter()
+    if resume:
+        truncate_partial_line(output_path)
+    try:
+        async with aiofiles.open(output_path, "a" if resume else "w") as output:
+            futures = [loop.run_in_executor(pool, transcribe_file, job) for job in pending]
+            for completed, future in enumerate(asyncio.as_completed(futures), start=1):
+                record = await future
+                await output.write(record.model_dump_json() + "\n")
+                await output.flush()
+                summary.audio_s += record.audio_s
+                summary.cached += record.cached
+                if record.error:
+                    summary.failed += 1
+                    logger.warning(f"Failed to transcribe {record.path}: {record.error}")
+                if completed % 100 == 0:
+                    logger.info(f"Transcribed {completed}/{len(pending)} recordings")
+    finally:
+        if executor is None:
+            pool.shutdown(cancel_futures=True)
+    summary.wall_s = time.perf_counter() - start
+
+    logger.info(
+        f"Batch transcription finished: {summary.files} files ({summary.failed} failed, {summary.cached} cached, "
+        f"{summary.skipped} skipped), "
+        f"{summary.audio_s / 3600:.2f} audio hours in {summary.wall_s / 3600:.2f} wall hours, "
+        f"{summary.audio_hours_per_wall_hour:.1f} audio-hours per wall-hour. Output: {output_path}"
+    )
+    return summary
+
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser(description="Transcribe recorded session audio offline with local Whisper.")
+    parser.add_argument("source", help="Directory of .wav/.pcm files or a manifest with one path per line")
+    parser.add_argument("--output", default="transcripts.jsonl", help="JSONL output path")
+    parser.add_argument("--workers", type=int, default=BATCH_TRANSCRIBE_WORKERS, help="Worker processes")
+    parser.add_argument("--sample-rate", type=int, default=RATE, help="Sample rate of raw .pcm files")
+    parser.add_argument("--no-resume", action="store_true", help="Overwrite the output instead of skipping done files")
+    args = parser.parse_args(argv)
+
+    summary = asyncio.run(
+        transcribe_batch(args.source, args.output, max(1, args.workers), not args.no_resume, args.sample_rate)
+    )
+    print(
+        f"{summary.files} transcribed ({summary.failed} failed), {summary.skipped} skipped, "
+        f"{summary.audio_hours_per_wall_hour:.1f} audio-hours per wall-hour"
+    )
+
+
+if __name__ == "__main__":
+    main()
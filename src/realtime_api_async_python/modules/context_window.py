@@ -0,0 +1,251 @@
+import itertools
+from collections import OrderedDict
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger
+from .utils import estimate_tokens, CONTEXT_TOKEN_BUDGET, CONTEXT_SUMMARY_ENABLED
+
+# Audio parts without a transcript are billed by duration; assume a short utterance.
+AUDIO_ITEM_TOKENS = 150
+# Trim down to this fraction of the budget so we don't trim again on the next turn.
+LOW_WATERMARK = 0.75
+# Items this large are trimmed before older but smaller ones.
+LARGE_ITEM_TOKENS = 1000
+PREVIEW_CHARS = 160
+
+
+class TrackedItem(BaseModel):
+    item_id: str
+    type: str = Field(description="message, function_call or function_call_output")
+    role: Optional[str] = None
+    call_id: Optional[str] = None
+    name: Optional[str] = Field(default=None, description="Function name for function calls")
+    tokens: int = 0
+    preview: str = ""
+    replay: Optional[dict] = Field(default=None, description="Text-only copy of the item to recreate it in a new session")
+
+
+def _item_text(item: dict) -> tuple[str, int]:
+    """Return the text of a conversation item and extra tokens for untranscribed audio."""
+    match item.get("type"):
+        case "function_call":
+            return f"{item.get('name', '')}({item.get('arguments', '')})", 0
+        case "function_call_output":
+            return item.get("output", "") or "", 0
+    texts, audio_tokens = [], 0
+    for part in item.get("content") or []:
+        text = part.get("text") or part.get("transcript")
+        if text:
+            texts.append(text)
+        elif part.get("type") in ("input_audio", "audio"):
+            audio_tokens += AUDIO_ITEM_TOKENS
+    return "\n".join(texts), audio_tokens
+
+
+def _replay_item(item: dict) -> Optional[dict]:
+    """A conversation.item.create payload for ``item`` with audio replaced by its transcript."""
+    match item.get("type"):
+        case "function_call":
+            if not item.get("call_id"):
+                return None
+            return {
+                "id": item["id"],
+                "type": "function_call",
+                "call_id": item["call_id"],
+                "name": item.get("name", ""),
+                "arguments": item.get("arguments", ""),
+            }
+        case "function_call_output":
+            if not item.get("call_id"):
+                return None
+            return {"id": item["id"], "type": "function_call_output", "call_id": item["call_id"], "output": item.get("output", "")}
+    text, _ = _item_text(item)
+    if not text:
+        return None
+    role = item.get("role", "user")
+    # Assistant messages take "text" parts; user and system messages take "input_text"
+    part_type = "text" if role == "assistant" else "input_text"
+    return {"id": item["id"], "type": "message", "role": role, "content": [{"type": part_type, "text": text}]}
+
+
+class ConversationContextManager:
+    """
+    Tracks the items the server holds in the realtime conversation and keeps
+    their estimated size under a token budget by deleting the oldest and
+    largest items, optionally replacing them with a short summary item.
+    """
+
+    def __init__(
+        self,
+        token_budget: int = CONTEXT_TOKEN_BUDGET,
+        keep_recent: int = 6,
+        summarize: bool = CONTEXT_SUMMARY_ENABLED,
+    ):
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.summarize = summarize
+        self.items: "OrderedDict[str, TrackedItem]" = OrderedDict()
+        self.observed_input_tokens = 0
+        self.pending_deletes: set[str] = set()
+        self.deleted_items = 0
+        self.freed_tokens = 0
+        self._summary_ids = (f"ctx_summary_{n}" for n in itertools.count())
+
+    def reset(self) -> None:
+        """Forget everything, e.g. after reconnecting to a fresh server session."""
+        self.items.clear()
+        self.pending_deletes.clear()
+        self.observed_input_tokens = 0
+
+    @property
+    def estimated_tokens(self) -> int:
+        return sum(
+            item.tokens for item in self.items.values() if item.item_id not in self.pending_deletes
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        # response.done usage is the ground truth for what the server holds, but it
+        # goes stale as soon as we delete items, so never trust it below our estimate.
+        return max(self.estimated_tokens, self.observed_input_tokens)
+
+    def track(self, item: dict) -> None:
+        """Record a conversation item from conversation.item.created or response.output_item.done."""
+        item_id = item.get("id")
+        if not item_id:
+            return
+        text, audio_tokens = _item_text(item)
+        tracked = TrackedItem(
+            item_id=item_id,
+            type=item.get("type", "message"),
+            role=item.get("role"),
+            call_id=item.get("call_id"),
+            name=item.get("name"),
+            tokens=estimate_tokens(text) + audio_tokens,
+            preview=text[:PREVIEW_CHARS],
+            replay=_replay_item(item),
+        )
+        if item_id in self.items:
+            # Output items are created empty and completed later; keep their position
+            existing = self.items[item_id]
+            tracked.name = tracked.name or existing.name
+            tracked.call_id = tracked.call_id or existing.call_id
+        self.items[item_id] = tracked
+
+    def forget(self, item_id: str) -> None:
+        """Drop an item after conversation.item.deleted."""
+        self.pending_deletes.discard(item_id)
+        self.items.pop(item_id, None)
+
+    def observe_usage(self, usage: Optional[dict]) -> None:
+        if usage and usage.get("input_tokens"):
+            self.observed_input_tokens = usage["input_tokens"]
+
+    def _select_victims(self, tokens_to_free: int) -> list[TrackedItem]:
+        items = list(self.items.values())
+        recent = {item.item_id for item in items[len(items) - self.keep_recent :]} if self.keep_recent else set()
+        candidates = [
+            item for item in items if item.item_id not in recent and item.item_id not in self.pending_deletes
+        ]
+        # Large tool outputs (ingest_file, ingest_memory, ...) go first, oldest first;
+        # then everything else, oldest first.
+        ordered = [i for i in candidates if i.tokens >= LARGE_ITEM_TOKENS] + [
+            i for i in candidates if i.tokens < LARGE_ITEM_TOKENS
+        ]
+        victims: dict[str, TrackedItem] = {}
+        freed = 0
+        for item in ordered:
+            if freed >= tokens_to_free:
+                break
+            if item.item_id in victims:
+                continue
+            group = [item]
+            if item.call_id:
+                # Delete a function call and its output together so neither is left dangling;
+                # if either is recent or already being deleted, keep both
+                group += [i for i in items if i.call_id == item.call_id and i is not item]
+                if any(m.item_id in recent or m.item_id in self.pending_deletes for m in group):
+                    continue
+            for member in group:
+                victims[member.item_id] = member
+                freed += member.tokens
+        return list(victims.values())
+
+    def _summary_text(self, victims: list[TrackedItem]) -> str:
+        lines = ["Summary of earlier conversation that was removed to save context:"]
+        for item in victims:
+            if item.type == "function_call":
+                lines.append(f"- called {item.preview}")
+            elif item.type == "function_call_output":
+                lines.append(f"- tool output ({item.tokens} tokens): {item.preview}")
+            elif item.preview:
+                lines.append(f"- {item.role or 'message'}: {item.preview}")
+        return "\n".join(lines)
+
+    def replay_events(self) -> list[dict[str, Any]]:
+        """
+        Events that recreate the tracked conversation, in order, in a fresh
+        server session, e.g. after the idle policy closed the previous one.
+        Audio is replayed as its transcript.
+        """
+        return [
+            {"type": "conversation.item.create", "item": item.replay}
+            for item in self.items.values()
+            if item.replay is not None and item.item_id not in self.pending_deletes
+        ]
+
+    def trim_events(self) -> list[dict[str, Any]]:
+        """
+        Return the client events needed to bring the context back under budget.
+        Returns an empty list while under budget.
+        """
+        total = self.total_tokens
+        if total <= self.token_budget:
+            return []
+
+        target = int(self.token_budget * LOW_WATERMARK)
+        victims = self._select_victims(total - target)
+        if not victims:
+            logger.warning(f"Context at ~{total} tokens is over budget but nothing can be trimmed")
+            return []
+
+        events: list[dict[str, Any]] = []
+        if self.summarize:
+            victim_ids = {v.item_id for v in victims}
+            # Insert the summary where the trimmed span started ("root" = conversation start)
+            previous_item_id = "root"
+            for item_id in self.items:
+                if item_id in victim_ids:
+                    break
+                if item_id not in self.pending_deletes:
+                    previous_item_id = item_id
+            summary_item = {
+                "id": next(self._summary_ids),
+                "type": "message",
+                "role": "system",
+                "content": [{"type": "input_text", "text": self._summary_text(victims)}],
+            }
+            events.append(
+                {
+                    "type": "conversation.item.create",
+                    "previous_item_id": previous_item_id,
+                    "item": summary_item,
+                }
+            )
+
+        freed = 0
+        for victim in victims:
+            self.pending_deletes.add(victim.item_id)
+            freed += victim.tokens
+            events.append({"type": "conversation.item.delete", "item_id": victim.item_id})
+
+        self.deleted_items += len(victims)
+        self.freed_tokens += freed
+        self.observed_input_tokens = max(0, self.observed_input_tokens - freed)
+        logger.info(
+            f"✂️ Context ~{total} tokens over budget {self.token_budget}: "
+            f"deleting {len(victims)} items (~{freed} tokens)"
+        )
+        return events
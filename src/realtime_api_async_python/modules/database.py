@@ -1,7 +1,10 @@
-import psycopg2
-import pandas as pd
 import sqlite3
-import duckdb
+from typing import TYPE_CHECKING
+
+# Database drivers and pandas are imported on first use to keep them out of
+# assistant startup; most sessions never touch SQL.
+if TYPE_CHECKING:
+    import pandas as pd
 
 class Database:
     def connect(self, url: str):
@@ -10,7 +13,7 @@ class Database:
     def read_tables(self, schema: str = None) -> str:
         raise NotImplementedError("Subclasses must implement this method.")
 
-    def execute_sql(self, sql: str) -> pd.DataFrame:
+    def execute_sql(self, sql: str) -> "pd.DataFrame":
         raise NotImplementedError("Subclasses must implement this method.")
 
 class PostgresDatabase(Database):
@@ -18,6 +21,8 @@ class PostgresDatabase(Database):
         self.connection = None
 
     def connect(self, url: str):
+        import psycopg2
+
         self.connection = psycopg2.connect(url)
 
     def read_tables(self, schema: str = None) -> str:
@@ -71,7 +76,9 @@ class PostgresDatabase(Database):
         cursor.close()
         return table_defs
 
-    def execute_sql(self, sql: str) -> pd.DataFrame:
+    def execute_sql(self, sql: str) -> "pd.DataFrame":
+        import pandas as pd
+
         df = pd.read_sql_query(sql, self.connection)
         return df
 
@@ -107,7 +114,9 @@ class SQLiteDatabase(Database):
         cursor.close()
         return table_defs
 
-    def execute_sql(self, sql: str) -> pd.DataFrame:
+    def execute_sql(self, sql: str) -> "pd.DataFrame":
+        import pandas as pd
+
         df = pd.read_sql_query(sql, self.connection)
         return df
 
@@ -116,6 +125,8 @@ class DuckDBDatabase(Database):
         self.connection = None
 
     def connect(self, url: str):
+        import duckdb
+
         self.connection = duckdb.connect(database=url)
 
     def read_tables(self, schema: str = None) -> str:
@@ -139,7 +150,7 @@ class DuckDBDatabase(Database):
         cursor.close()
         return table_defs
 
-    def execute_sql(self, sql: str) -> pd.DataFrame:
+    def execute_sql(self, sql: str) -> "pd.DataFrame":
         df = self.connection.execute(sql).fetchdf()
         return df
 
@@ -0,0 +1,90 @@
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Callable, Optional
+
+import pydantic
+from pydantic import BaseModel, Field
+
+from . import gen_descriptor
+from .gen_descriptor import build_function_descriptor
+from .logging import logger, log_warning
+
+DESCRIPTOR_CACHE_FILE = os.getenv("DESCRIPTOR_CACHE_FILE", "./.tool_descriptors.json")
+DESCRIPTOR_CACHE_ENABLED = os.getenv("DESCRIPTOR_CACHE_ENABLED", "true").lower() == "true"
+
+
+class ToolDescriptorCache(BaseModel):
+    fingerprint: str = Field(description="Hash of the tool sources, generator and pydantic version")
+    names: list[str] = Field(description="Tool names in session order")
+    tools_json: str = Field(description="Serialized tools array for session.update")
+
+
+def tools_fingerprint(functions: list[Callable]) -> str:
+    """
+    Hash everything a descriptor depends on: the source of every module that
+    defines a tool (its docstrings, annotations and models), the generator
+    itself, and the pydantic and Python versions.
+    """
+    digest = hashlib.sha256()
+    digest.update(f"pydantic={pydantic.VERSION};python={sys.version_info[:2]}".encode())
+    digest.update("|".join(func.__name__ for func in functions).encode())
+    paths = {gen_descriptor.__file__}
+    for func in functions:
+        module = sys.modules.get(func.__module__)
+        if module is not None and getattr(module, "__file__", None):
+            paths.add(module.__file__)
+    for path in sorted(paths):
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def _read_cache(cache_file: str) -> Optional[ToolDescriptorCache]:
+    try:
+        with open(cache_file, "r") as f:
+            return ToolDescriptorCache.model_validate_json(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.debug(f"Ignoring unreadable descriptor cache {cache_file}: {e}")
+        return None
+
+
+def _write_cache(cache_file: str, cache: ToolDescriptorCache) -> None:
+    directory = os.path.dirname(os.path.abspath(cache_file))
+    try:
+        os.makedirs(directory, exist_ok=True)
+        # Write then rename so a concurrent reader never sees half a file
+        with tempfile.NamedTemporaryFile("w", dir=directory, delete=False, suffix=".tmp") as f:
+            f.write(cache.model_dump_json())
+        os.replace(f.name, cache_file)
+    except OSError as e:
+        log_warning(f"⚠️ Could not write descriptor cache {cache_file}: {e}")
+
+
+def load_tool_descriptors(
+    functions: list[Callable],
+    cache_file: str = DESCRIPTOR_CACHE_FILE,
+    enabled: bool = DESCRIPTOR_CACHE_ENABLED,
+) -> tuple[list[dict[str, Any]], str]:
+    """
+    Return the tools array for ``functions`` and the same array serialized as
+    JSON. On a cache hit nothing is introspected; on a miss the descriptors are
+    built and the cache file is rewritten.
+    """
+    fingerprint = tools_fingerprint(functions)
+    names = [func.__name__ for func in functions]
+    if enabled:
+        cached = _read_cache(cache_file)
+        if cached is not None and cached.fingerprint == fingerprint and cached.names == names:
+            logger.debug(f"Loaded {len(names)} tool descriptors from {cache_file}")
+            return json.loads(cached.tools_json), cached.tools_json
+
+    tools = [build_function_descriptor(func) for func in functions]
+    tools_json = json.dumps(tools)
+    if enabled:
+        _write_cache(cache_file, ToolDescriptorCache(fingerprint=fingerprint, names=names, tools_json=tools_json))
+    return tools, tools_json
@@ -9,16 +9,22 @@ from typing import Optional
 
 import aiofiles
 import aiohttp
+import functools
 from async_lru import alru_cache
-from google.auth.transport.requests import Request
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from googleapiclient.discovery import Resource, build
 from pydantic import (AnyHttpUrl, BaseModel, EmailStr, Field, HttpUrl, model_validator)
-from pydantic_ai import Agent, RunContext
-from pydantic_ai.result import RunResult
 from pydantic_extra_types.phone_numbers import PhoneNumber
 import asyncio
+from typing import TYPE_CHECKING
+
+from .startup import startup_orchestrator
+from .tool_registry import tool, ToolGroup
+
+# The Google client libraries and pydantic_ai are imported on first use; they
+# add seconds to startup and most sessions never send an email.
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
+    from googleapiclient.discovery import Resource
+    from pydantic_ai import Agent
 
 
 class ContactSearchRequest(BaseModel):
@@ -124,8 +130,17 @@ class ContactSearchResults(BaseModel):
     results: list[ContactSearchResult] = Field(description="List of contact search results", default=[])
     
 @alru_cache(maxsize=32)
-async def get_fresh_credentials() -> Credentials:
+async def get_fresh_credentials() -> "Credentials":
     """Get fresh credentials using client secrets JSON. Will open browser first time."""
+    # Token file I/O, refreshes and the browser flow all block, so keep them off the event loop
+    return await asyncio.to_thread(_load_credentials)
+
+
+def _load_credentials() -> "Credentials":
+    from google.auth.transport.requests import Request
+    from google.oauth2.credentials import Credentials
+    from google_auth_oauthlib.flow import InstalledAppFlow
+
     print(f"\n\n\n {["*"]*10}\n Getting fresh credentials")
     scopes = ['https://www.googleapis.com/auth/gmail.modify',
               "https://www.googleapis.com/auth/contacts",
@@ -183,7 +198,9 @@ class GoogleServices( Enum):
         self.version = version
         self.base_url = base_url
     
-    def get_google_service(self, credentials: Credentials) -> Resource:
+    def get_google_service(self, credentials: "Credentials") -> "Resource":
+        from googleapiclient.discovery import build
+
         # Build and return the service
         return build(self.service_name, self.version, credentials=credentials)
     
@@ -195,21 +212,12 @@ class GoogleServices( Enum):
 
 
 
-email_send_agent: Agent[EmailRequest, EmailSendResult] = Agent(  
-    'openai:gpt-4o',  
-    deps_type=EmailRequest,
-    result_type=EmailSendResult,  
-    system_prompt=(  
+EMAIL_SEND_SYSTEM_PROMPT = (  
         'You are an email sending agent. Validate the email content '
         'and send it using the Gmail API.'
-    ),
-) 
-
-contact_lookup_agent: Agent[ContactSearchRequest, ContactSearchResults] = Agent(  
-    'openai:gpt-4o',  
-    deps_type=ContactSearchRequest,
-    result_type=ContactSearchResults,  
-    system_prompt=(  
+    )
+
+CONTACT_LOOKUP_SYSTEM_PROMPT = (  
     """
     <prompt>
     <role>
@@ -255,8 +263,7 @@ contact_lookup_agent: Agent[ContactSearchRequest, ContactSearchResults] = Agent(
     </validQueries>
 </prompt>
     """
-    ),
-) 
+    )
 
 
 import json
@@ -393,7 +400,7 @@ async def _lookup_contact(query: str) -> ContactSearchResults:
 
 from typing import List, Set
 
-async def _get_page_tokens(session: aiohttp.ClientSession, creds: Credentials) -> List[str]:
+async def _get_page_tokens(session: aiohttp.ClientSession, creds: "Credentials") -> List[str]:
     """Get all page tokens first"""
     url = f"{GoogleServices.contacts.base_url}/{GoogleServices.contacts.version}/people/me/connections"
     headers = {"Authorization": f"Bearer {creds.token}", "Accept": "application/json"}
@@ -418,7 +425,7 @@ async def _get_page_tokens(session: aiohttp.ClientSession, creds: Credentials) -
             
     return tokens
 
-async def _get_page(session: aiohttp.ClientSession, creds: Credentials, page_token: Optional[str] = None) -> List[dict]:
+async def _get_page(session: aiohttp.ClientSession, creds: "Credentials", page_token: Optional[str] = None) -> List[dict]:
     """Get a single page of contacts"""
     url = f"{GoogleServices.contacts.base_url}/{GoogleServices.contacts.version}/people/me/connections"
     headers = {"Authorization": f"Bearer {creds.token}", "Accept": "application/json"}
@@ -436,7 +443,7 @@ async def _get_page(session: aiohttp.ClientSession, creds: Credentials, page_tok
     
     return data.get("connections", [])
 
-async def _get_all_contacts(session: aiohttp.ClientSession, creds: Credentials) -> list:
+async def _get_all_contacts(session: aiohttp.ClientSession, creds: "Credentials") -> list:
     """Get all contacts using the nextPageToken"""
     url = f"{GoogleServices.contacts.base_url}/{GoogleServices.contacts.version}/people/me/connections"
     headers = {
@@ -498,25 +505,58 @@ async def _lookup_contact2(query: str) -> ContactSearchResults:
         return ContactSearchResults(results=results)
 import sys
     
-@contact_lookup_agent.tool  
-async def lookup_contact( ctx: RunContext[ContactSearchRequest] ) -> ContactSearchResults:
-    """Look up contacts via query using Gmail API"""
-    query = ctx.deps.query
-    print(f"\n\n\n {["*"]*100}\n Looking up contact with query: {query}")
+@functools.cache
+def get_contact_lookup_agent() -> "Agent[ContactSearchRequest, ContactSearchResults]":
+    """Build the contact lookup agent on first use."""
+    from pydantic_ai import Agent, RunContext
 
-    return await _lookup_contact(query)
+    from .llm import create_model
 
+    contact_lookup_agent = Agent(  
+        create_model('gpt-4o'),  
+        deps_type=ContactSearchRequest,
+        result_type=ContactSearchResults,  
+        system_prompt=CONTACT_LOOKUP_SYSTEM_PROMPT,
+    ) 
 
+    @contact_lookup_agent.tool  
+    async def lookup_contact( ctx: RunContext[ContactSearchRequest] ) -> ContactSearchResults:
+        """Look up contacts via query using Gmail API"""
+        query = ctx.deps.query
+        print(f"\n\n\n {["*"]*100}\n Looking up contact with query: {query}")
 
+        return await _lookup_contact(query)
 
-@email_send_agent.tool  
-async def send_email(
-    ctx: RunContext[EmailRequest], 
-) -> EmailSendResult:
-    """sends an email using the Gmail API"""  
- 
+    return contact_lookup_agent
+
+
+@functools.cache
+def get_email_send_agent() -> "Agent[EmailRequest, EmailSendResult]":
+    """Build the email sending agent on first use."""
+    from pydantic_ai import Agent, RunContext
+
+    from .llm import create_model
+
+    email_send_agent = Agent(  
+        create_model('gpt-4o'),  
+        deps_type=EmailRequest,
+        result_type=EmailSendResult,  
+        system_prompt=EMAIL_SEND_SYSTEM_PROMPT,
+    ) 
+
+    @email_send_agent.tool  
+    async def send_email(
+        ctx: RunContext[EmailRequest], 
+    ) -> EmailSendResult:
+        """sends an email using the Gmail API"""  
+        return await _send_email(ctx.deps)
+
+    return email_send_agent
+
+
+async def _send_email(content: EmailRequest) -> EmailSendResult:
+    """Send an email through the Gmail REST API"""
     creds = await get_fresh_credentials()
-    content = ctx.deps
 
     headers = {
         "Authorization": f"Bearer {creds.token}",
@@ -570,12 +610,15 @@ from pydantic import BaseModel
 #     return decorator
 
 
+@tool(ToolGroup.email)
 async def send_email_to_recipient(prompt: Annotated[str, {"description": "User instruction or prompt for sending the email"}], content:EmailRequest) -> EmailSendResult:
     """ Sends an email to the recipient using the Gmail API if the email address isnt found you must use the contacts agent to look up the email address"""
-    return (await email_send_agent.run(prompt, deps=EmailRequest(**content))).data.model_dump()
+    await startup_orchestrator.ready("pydantic_ai")
+    return (await get_email_send_agent().run(prompt, deps=EmailRequest(**content))).data.model_dump()
 import sys
+@tool(ToolGroup.email)
 async def find_contact_information(content:Annotated[ContactSearchRequest, "the query to lookup contact info for"]) -> ContactSearchResults:
     """ Finds the contact information for the recipient using the contacts agent"""
-    
-    return (await contact_lookup_agent.run(f"please find the closest contact details you can for the contact given in the dependencies", deps=ContactSearchRequest(**content))).data.model_dump()
+    await startup_orchestrator.ready("pydantic_ai")
+    return (await get_contact_lookup_agent().run(f"please find the closest contact details you can for the contact given in the dependencies", deps=ContactSearchRequest(**content))).data.model_dump()
         
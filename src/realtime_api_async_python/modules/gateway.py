@@ -0,0 +1,303 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import time
+import uuid
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+import websockets
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_info, log_warning, log_error
+
+GATEWAY_HOST = os.getenv("GATEWAY_HOST", "127.0.0.1")
+GATEWAY_PORT = int(os.getenv("GATEWAY_PORT", "8765"))
+GATEWAY_WORKER_BASE_PORT = int(os.getenv("GATEWAY_WORKER_BASE_PORT", "8800"))
+GATEWAY_HEALTH_INTERVAL_S = float(os.getenv("GATEWAY_HEALTH_INTERVAL_S", "5"))
+GATEWAY_DRAIN_TIMEOUT_S = float(os.getenv("GATEWAY_DRAIN_TIMEOUT_S", "60"))
+
+# Close code for "try again later", used when a worker is draining.
+CLOSE_TRY_AGAIN_LATER = 1013
+
+
+class WorkerHealth(BaseModel):
+    index: int = Field(description="Worker index in the pool")
+    pid: Optional[int] = Field(default=None, description="Worker process id")
+    healthy: bool = Field(default=False, description="Whether the last health check succeeded")
+    draining: bool = Field(default=False, description="Whether the worker refuses new sessions")
+    active_sessions: int = Field(default=0, description="Sessions currently running on the worker")
+    last_check: float = Field(default=0.0, description="time.time() of the last health check")
+
+
+# ---------------------------------------------------------------------------
+# Worker process
+# ---------------------------------------------------------------------------
+
+
+class _WorkerServer:
+    """Runs OpenAIRealtimeAPI sessions for client connections proxied by the gateway."""
+
+    def __init__(self, index: int, port: int):
+        self.index = index
+        self.port = port
+        self.active_sessions: dict[str, asyncio.Task] = {}
+        self.draining = False
+        self.stopped = asyncio.Event()
+
+    def status(self) -> dict:
+        return WorkerHealth(
+            index=self.index,
+            pid=os.getpid(),
+            healthy=True,
+            draining=self.draining,
+            active_sessions=len(self.active_sessions),
+            last_check=time.time(),
+        ).model_dump()
+
+    def drain(self) -> None:
+        self.draining = True
+        if not self.active_sessions:
+            self.stopped.set()
+
+    async def handle(self, websocket):
+        path = urlparse(websocket.path).path
+        if path == "/health":
+            await websocket.send(json.dumps(self.status()))
+            return
+        if path == "/drain":
+            self.drain()
+            await websocket.send(json.dumps(self.status()))
+            return
+        if self.draining:
+            await websocket.close(code=CLOSE_TRY_AGAIN_LATER, reason="worker draining")
+            return
+
+        session_id = path.rsplit("/", 1)[-1] or uuid.uuid4().hex
+        task = asyncio.current_task()
+        self.active_sessions[session_id] = task
+        try:
+            await self.run_session(session_id, websocket)
+        finally:
+            self.active_sessions.pop(session_id, None)
+            if self.draining and not self.active_sessions:
+                self.stopped.set()
+
+    async def run_session(self, session_id: str, websocket):
+        # Imported here so the gateway process never loads the assistant stack
+        from ..main import OpenAIRealtimeAPI
+        from .async_microphone import QueueMicrophone
+
+        logger.info(f"Worker {self.index}: session {session_id} started")
+        mic = QueueMicrophone()
+
+        async def send_to_client(audio_data: bytes):
+            await websocket.send(audio_data)
+
+        api = OpenAIRealtimeAPI(mic=mic, audio_sink=send_to_client)
+
+        async def pump_client_audio():
+            try:
+                async for message in websocket:
+                    if isinstance(message, bytes):
+                        mic.feed(message)
+                    elif json.loads(message).get("type") == "session.end":
+                        break
+            except websockets.ConnectionClosed:
+                pass
+            finally:
+                api.exit_event.set()
+
+        pump_task = asyncio.create_task(pump_client_audio())
+        try:
+            await api.run()
+        finally:
+            pump_task.cancel()
+            logger.info(f"Worker {self.index}: session {session_id} finished")
+
+    async def serve(self):
+        loop = asyncio.get_running_loop()
+        # The gateway drives shutdown through /drain; ignore the terminal's Ctrl+C
+        loop.add_signal_handler(signal.SIGINT, lambda: None)
+        loop.add_signal_handler(signal.SIGTERM, self.drain)
+        async with websockets.serve(self.handle, "127.0.0.1", self.port):
+            log_info(f"Worker {self.index} (pid {os.getpid()}) listening on {self.port}", style="bold green")
+            await self.stopped.wait()
+        log_info(f"Worker {self.index} drained", style="bold blue")
+
+
+def _worker_main(index: int, port: int) -> None:
+    asyncio.run(_WorkerServer(index, port).serve())
+
+
+# ---------------------------------------------------------------------------
+# Gateway process
+# ---------------------------------------------------------------------------
+
+
+class Gateway:
+    """
+    Accepts client audio connections and spreads sessions across a pool of
+    worker processes, one per core by default. Sessions are routed sticky by
+    the ``session`` query parameter so reconnecting clients land on the same
+    worker while it stays healthy.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        host: str = GATEWAY_HOST,
+        port: int = GATEWAY_PORT,
+        worker_base_port: int = GATEWAY_WORKER_BASE_PORT,
+    ):
+        self.worker_count = workers or os.cpu_count() or 1
+        self.host = host
+        self.port = port
+        self.worker_base_port = worker_base_port
+        self.processes: list[Optional[multiprocessing.Process]] = [None] * self.worker_count
+        self.health = [WorkerHealth(index=i) for i in range(self.worker_count)]
+        self.sticky_routes: dict[str, int] = {}
+        self.shutting_down = asyncio.Event()
+        self._mp = multiprocessing.get_context("spawn")
+
+    def worker_port(self, index: int) -> int:
+        return self.worker_base_port + index
+
+    def start_worker(self, index: int) -> None:
+        process = self._mp.Process(
+            target=_worker_main,
+            args=(index, self.worker_port(index)),
+            name=f"realtime-worker-{index}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[index] = process
+        self.health[index] = WorkerHealth(index=index, pid=process.pid)
+
+    async def check_worker(self, index: int) -> WorkerHealth:
+        process = self.processes[index]
+        if process is None or not process.is_alive():
+            if not self.shutting_down.is_set():
+                log_warning(f"⚠️ Worker {index} is not running, restarting it.")
+                self.start_worker(index)
+            return self.health[index]
+        try:
+            async with websockets.connect(f"ws://127.0.0.1:{self.worker_port(index)}/health", open_timeout=2) as ws:
+                self.health[index] = WorkerHealth(**json.loads(await asyncio.wait_for(ws.recv(), 2)))
+        except Exception as e:
+            logger.debug(f"Health check failed for worker {index}: {e}")
+            self.health[index].healthy = False
+            self.health[index].last_check = time.time()
+        return self.health[index]
+
+    async def wait_until_ready(self, timeout: float = 30.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            health = await asyncio.gather(*[self.check_worker(i) for i in range(self.worker_count)])
+            if all(h.healthy for h in health):
+                return
+            await asyncio.sleep(0.5)
+        log_warning("⚠️ Not all workers became healthy before the gateway started listening.")
+
+    async def health_loop(self) -> None:
+        while not self.shutting_down.is_set():
+            await asyncio.gather(*[self.check_worker(i) for i in range(self.worker_count)])
+            try:
+                await asyncio.wait_for(self.shutting_down.wait(), GATEWAY_HEALTH_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+
+    def pick_worker(self, session_id: str) -> Optional[int]:
+        index = self.sticky_routes.get(session_id)
+        if index is not None and self.health[index].healthy and not self.health[index].draining:
+            return index
+        candidates = [h for h in self.health if h.healthy and not h.draining]
+        if not candidates:
+            return None
+        index = min(candidates, key=lambda h: h.active_sessions).index
+        self.sticky_routes[session_id] = index
+        # Count the session now so a burst of connects spreads before the next health check
+        self.health[index].active_sessions += 1
+        return index
+
+    async def route(self, client):
+        if self.shutting_down.is_set():
+            await client.close(code=CLOSE_TRY_AGAIN_LATER, reason="gateway shutting down")
+            return
+        query = parse_qs(urlparse(client.path).query)
+        session_id = query.get("session", [uuid.uuid4().hex])[0]
+        index = self.pick_worker(session_id)
+        if index is None:
+            await client.close(code=CLOSE_TRY_AGAIN_LATER, reason="no healthy workers")
+            return
+
+        logger.info(f"Routing session {session_id} to worker {index}")
+        try:
+            async with websockets.connect(
+                f"ws://127.0.0.1:{self.worker_port(index)}/session/{session_id}",
+                max_size=None,
+            ) as upstream:
+                await self.proxy(client, upstream)
+        except Exception as e:
+            log_error(f"Session {session_id} on worker {index} failed: {e}")
+            self.health[index].healthy = False
+
+    @staticmethod
+    async def proxy(client, upstream) -> None:
+        async def pipe(source, sink):
+            try:
+                async for message in source:
+                    await sink.send(message)
+            except websockets.ConnectionClosed:
+                pass
+            finally:
+                await sink.close()
+
+        await asyncio.gather(pipe(client, upstream), pipe(upstream, client))
+
+    async def drain(self) -> None:
+        """Stop routing new sessions, let workers finish active ones, then stop them."""
+        log_info("Draining workers...", style="bold yellow")
+        self.shutting_down.set()
+
+        async def drain_worker(index: int):
+            try:
+                async with websockets.connect(f"ws://127.0.0.1:{self.worker_port(index)}/drain", open_timeout=2):
+                    pass
+            except Exception as e:
+                logger.debug(f"Drain request to worker {index} failed: {e}")
+
+        await asyncio.gather(*[drain_worker(i) for i in range(self.worker_count)])
+        deadline = time.monotonic() + GATEWAY_DRAIN_TIMEOUT_S
+        for index, process in enumerate(self.processes):
+            if process is None:
+                continue
+            await asyncio.to_thread(process.join, max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                log_warning(f"⚠️ Worker {index} did not drain in time, killing it.")
+                process.kill()
+
+    async def serve(self) -> None:
+        for index in range(self.worker_count):
+            self.start_worker(index)
+
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+
+        await self.wait_until_ready()
+        health_task = asyncio.create_task(self.health_loop())
+        async with websockets.serve(self.route, self.host, self.port, max_size=None):
+            log_info(
+                f"✅ Gateway listening on ws://{self.host}:{self.port} with {self.worker_count} workers",
+                style="bold green",
+            )
+            await stop.wait()
+            # Keep the listener open while draining so in-flight proxies finish;
+            # route() turns new connections away once shutting_down is set.
+            await self.drain()
+        health_task.cancel()
+        log_info("Gateway stopped.", style="bold blue")
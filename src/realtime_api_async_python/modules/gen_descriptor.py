@@ -1,10 +1,17 @@
 from typing import get_type_hints, Any, Dict, get_origin, get_args
 from pydantic import BaseModel
+import copy
+import functools
 import inspect
 from typing import Optional, List, Dict as TypeDict, Union
 
 def get_pydantic_schema(model_class: type[BaseModel]) -> Dict[str, Any]:
     """Extract schema from a Pydantic model including nested models"""
+    # Memoized per model class; callers add descriptions to the result, so hand out copies
+    return copy.deepcopy(_get_pydantic_schema(model_class))
+
+@functools.cache
+def _get_pydantic_schema(model_class: type[BaseModel]) -> Dict[str, Any]:
     schema = model_class.model_json_schema()
     properties = {}
     
@@ -149,6 +156,11 @@ def build_function_descriptor(func) -> Dict[str, Any]:
     Creates a JSON-like function descriptor by inspecting the function's
     signature, docstring, and type annotations.
     """
+    # Memoized per function; see descriptor_cache.py for the on-disk cache
+    return copy.deepcopy(_build_function_descriptor(func))
+
+@functools.cache
+def _build_function_descriptor(func) -> Dict[str, Any]:
     doc = func.__doc__ or ""
     type_hints = get_type_hints(func,  include_extras=True)
     
@@ -0,0 +1,133 @@
+import asyncio
+import importlib.util
+import os
+import time
+from typing import TYPE_CHECKING, Awaitable, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    import httpx
+
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+LLM_HTTP_KEEPALIVE_EXPIRY_S = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_S", "120"))
+# HTTP/2 needs the optional h2 package (`uv add h2`); without it the client speaks HTTP/1.1
+LLM_HTTP2 = os.getenv("LLM_HTTP2", "true").lower() == "true"
+LLM_HTTP_WARM_CONNECTIONS = int(os.getenv("LLM_HTTP_WARM_CONNECTIONS", "2"))
+# Same timeouts as the OpenAI and pydantic_ai clients
+LLM_HTTP_TIMEOUT_S = float(os.getenv("LLM_HTTP_TIMEOUT_S", "600"))
+LLM_HTTP_CONNECT_TIMEOUT_S = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT_S", "5"))
+
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com/v1")
+
+
+class HttpClientMetrics(BaseModel):
+    requests: int = Field(default=0, description="Requests sent through the shared client")
+    connections: int = Field(default=0, description="TCP connections opened")
+    tls_handshakes: int = Field(default=0, description="TLS handshakes completed")
+    tls_handshake_ms_total: float = Field(default=0.0, description="Time spent in TLS handshakes")
+
+    @property
+    def reuse_rate(self) -> float:
+        """Share of requests that went out on an already open connection."""
+        return 1 - self.connections / self.requests if self.requests else 0.0
+
+
+def http2_available() -> bool:
+    return LLM_HTTP2 and importlib.util.find_spec("h2") is not None
+
+
+class SharedHttpClient:
+    """
+    One keep-alive ``httpx.AsyncClient`` for every pydantic_ai model, so the
+    agents share a connection pool instead of each dialling and handshaking
+    with the API on its own. Connection setup is traced per request to count
+    new connections and TLS handshakes; ``warm`` opens connections ahead of
+    the first tool call.
+    """
+
+    def __init__(
+        self,
+        max_connections: int = LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive: int = LLM_HTTP_MAX_KEEPALIVE,
+        keepalive_expiry_s: float = LLM_HTTP_KEEPALIVE_EXPIRY_S,
+        http2: Optional[bool] = None,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry_s = keepalive_expiry_s
+        self.http2 = http2_available() if http2 is None else http2
+        self.metrics = HttpClientMetrics()
+        # Awaited with every response, e.g. to read rate limit headers
+        self.response_hooks: list[Callable[["httpx.Response"], Awaitable[None]]] = []
+        self._client: Optional["httpx.AsyncClient"] = None
+
+    async def _on_request(self, request: "httpx.Request") -> None:
+        self.metrics.requests += 1
+        tls_started = None
+
+        async def trace(event: str, info: dict) -> None:
+            nonlocal tls_started
+            if event == "connection.connect_tcp.complete":
+                self.metrics.connections += 1
+            elif event == "connection.start_tls.started":
+                tls_started = time.perf_counter()
+            elif event == "connection.start_tls.complete" and tls_started is not None:
+                self.metrics.tls_handshakes += 1
+                self.metrics.tls_handshake_ms_total += (time.perf_counter() - tls_started) * 1000
+
+        request.extensions["trace"] = trace
+
+    async def _on_response(self, response: "httpx.Response") -> None:
+        for hook in self.response_hooks:
+            await hook(response)
+
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        if self._client is None or self._client.is_closed:
+            # httpx comes with pydantic_ai; keep it off the startup path like pydantic_ai itself
+            import httpx
+
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_keepalive,
+                    keepalive_expiry=self.keepalive_expiry_s,
+                ),
+                timeout=httpx.Timeout(timeout=LLM_HTTP_TIMEOUT_S, connect=LLM_HTTP_CONNECT_TIMEOUT_S),
+                event_hooks={"request": [self._on_request], "response": [self._on_response]},
+            )
+        return self._client
+
+    async def warm(self, base_url: str = OPENAI_BASE_URL, connections: int = LLM_HTTP_WARM_CONNECTIONS) -> None:
+        """Open ``connections`` pooled connections (one is enough over HTTP/2) with a cheap authenticated GET."""
+        api_key = os.getenv("OPENAI_API_KEY")
+        headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
+        count = 1 if self.http2 else max(1, min(connections, self.max_keepalive))
+        # The status does not matter, only the connection left in the pool
+        await asyncio.gather(*[self.client.get(f"{base_url}/models", headers=headers) for _ in range(count)])
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def log_metrics(self) -> None:
+        if not self.metrics.requests:
+            return
+        logger.info(
+            "🔌 LLM HTTP pool: requests=%d connections=%d TLS handshakes=%d (%.0fms) reuse=%.0f%% http2=%s",
+            self.metrics.requests,
+            self.metrics.connections,
+            self.metrics.tls_handshakes,
+            self.metrics.tls_handshake_ms_total,
+            self.metrics.reuse_rate * 100,
+            self.http2,
+        )
+
+
+shared_http_client = SharedHttpClient()
@@ -0,0 +1,127 @@
+import asyncio
+import time
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_info
+from .utils import IDLE_RESUME_PREROLL_MS, IDLE_TIMEOUT_S
+
+
+class IdleMetrics(BaseModel):
+    idle_closes: int = Field(default=0, description="Sessions closed for inactivity")
+    resumes: int = Field(default=0, description="Sessions reopened because speech resumed")
+    idle_s_total: float = Field(default=0.0, description="Time spent without an open session")
+    resume_latency_ms_last: float = Field(default=0.0, description="Speech detected to session ready, last resume")
+    resume_latency_ms_max: float = Field(default=0.0, description="Worst resume latency observed")
+    resume_latency_ms_total: float = Field(default=0.0, description="Sum of resume latencies")
+
+    @property
+    def resume_latency_ms_avg(self) -> float:
+        return self.resume_latency_ms_total / self.resumes if self.resumes else 0.0
+
+
+class IdlePolicy:
+    """
+    Decides when an idle realtime session should be closed and when it should
+    be reopened.
+
+    ``touch`` on every server event; once ``timeout_s`` pass without one and no
+    response is in flight, ``should_close`` says so. ``wait_for_speech`` then
+    keeps reading the microphone locally and returns as soon as the energy VAD
+    (or the wake word gate, if there is one) hears speech, with the audio to
+    send once the new session is up. ``resumed`` records how long that took.
+    """
+
+    def __init__(
+        self,
+        timeout_s: float = IDLE_TIMEOUT_S,
+        preroll_ms: int = IDLE_RESUME_PREROLL_MS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.timeout_s = timeout_s
+        self.preroll_ms = preroll_ms
+        self.clock = clock
+        self.metrics = IdleMetrics()
+        self._last_activity = clock()
+        self._resume_started: Optional[float] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.timeout_s > 0
+
+    def touch(self) -> None:
+        self._last_activity = self.clock()
+
+    def should_close(self, busy: bool = False) -> bool:
+        return self.enabled and not busy and self.clock() - self._last_activity > self.timeout_s
+
+    async def wait_for_speech(self, mic, wake_gate=None, poll_s: float = 0.1) -> bytes:
+        """
+        Read ``mic`` until someone speaks (or the wake phrase is heard) and
+        return the audio to send first: the speech so far and ``preroll_ms``
+        before it.
+        """
+        # Only needed once the session has gone idle, so kept off the startup path
+        import numpy as np
+
+        from .vad import detect_speech
+
+        closed_at = self.clock()
+        self.metrics.idle_closes += 1
+        log_info(f"💤 No activity for {self.timeout_s:.0f}s, closed the realtime session", style="bold blue")
+        preroll_bytes = int(self.preroll_ms * mic.config.rate / 1000) * 2
+        recent = bytearray()
+        mic.start_recording()
+        while True:
+            await asyncio.sleep(poll_s)
+            audio_data = mic.get_audio_data()
+            if not audio_data:
+                continue
+            if wake_gate is not None:
+                # The gate keeps its own pre-roll and only lets audio through once addressed
+                was_open = wake_gate.is_open
+                forwarded = wake_gate.process(audio_data)
+                if forwarded and not was_open:
+                    pending = forwarded
+                    break
+                if not forwarded:
+                    continue
+                # The window was still open when the session closed, so the gate forwards
+                # silence too; listen for speech in what it lets through
+                audio_data = forwarded
+            recent += audio_data
+            del recent[: max(0, len(recent) - preroll_bytes - len(audio_data))]
+            if detect_speech(np.frombuffer(bytes(recent), dtype=np.int16), mic.config.rate):
+                pending = bytes(recent)
+                break
+
+        self._resume_started = self.clock()
+        self.metrics.idle_s_total += self._resume_started - closed_at
+        logger.info(f"Speech after {self._resume_started - closed_at:.0f}s idle, reopening the realtime session")
+        return pending
+
+    def resumed(self) -> None:
+        """The new session is initialized and the buffered speech is queued."""
+        self.touch()
+        if self._resume_started is None:
+            return
+        latency_ms = (self.clock() - self._resume_started) * 1000
+        self._resume_started = None
+        self.metrics.resumes += 1
+        self.metrics.resume_latency_ms_last = latency_ms
+        self.metrics.resume_latency_ms_max = max(self.metrics.resume_latency_ms_max, latency_ms)
+        self.metrics.resume_latency_ms_total += latency_ms
+        log_info(f"Realtime session resumed in {latency_ms:.0f}ms", style="bold green")
+
+    def log_metrics(self) -> None:
+        if not self.metrics.idle_closes:
+            return
+        logger.info(
+            "💤 Idle policy: closes=%d resumes=%d idle=%.0fs resume latency avg=%.0fms max=%.0fms",
+            self.metrics.idle_closes,
+            self.metrics.resumes,
+            self.metrics.idle_s_total,
+            self.metrics.resume_latency_ms_avg,
+            self.metrics.resume_latency_ms_max,
+        )
@@ -1,19 +1,226 @@
 
+import asyncio
 import os
-from pydantic import BaseModel
-from pydantic_ai import Agent
-from pydantic_ai.models.openai import OpenAIModel
-from typing import Type, TypeVar , Any, Optional
+import time
+from collections import deque
+from pydantic import BaseModel, Field
+from typing import AsyncIterator, Awaitable, Callable, Type, TypeVar , Any, Optional, TYPE_CHECKING
 from async_lru import alru_cache
+from pydantic import ValidationError
+
+from .http_client import shared_http_client
+from .llm_cache import LLM_CACHE_ENABLED, LLM_CACHE_TTL_S, llm_cache, response_key
+from .llm_scheduler import LLM_OUTPUT_TOKEN_ESTIMATE, llm_scheduler
+from .logging import logger
+from .prompt_templates import prompt_cache_stats
+from .startup import startup_orchestrator
+from .utils import estimate_tokens
+
+# "openai", or "scripted" for the offline stand-in in scripted_llm.py (no network, canned answers)
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai").lower()
+# Stream deltas are grouped over this window before being yielded (and partially validated)
+LLM_STREAM_DEBOUNCE_S = float(os.getenv("LLM_STREAM_DEBOUNCE_S", "0.05"))
+# Hedged requests for calls that pass hedge_model (file and key selections); off by default
+LLM_HEDGE_ENABLED = os.getenv("LLM_HEDGE_ENABLED", "false").lower() == "true"
+# The duplicate goes out once the first request is slower than this percentile of recent calls
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+# Delay used until LLM_HEDGE_MIN_SAMPLES latencies are known for the model
+LLM_HEDGE_DEFAULT_DELAY_S = float(os.getenv("LLM_HEDGE_DEFAULT_DELAY_S", "1.5"))
+LLM_HEDGE_MIN_SAMPLES = 20
+# Share of hedgeable calls that may fire a duplicate, on top of a burst of two
+LLM_HEDGE_BUDGET = float(os.getenv("LLM_HEDGE_BUDGET", "0.1"))
+
+if TYPE_CHECKING:
+    from pydantic_ai import Agent
+    from pydantic_ai.models import Model
 
 
 
 T = TypeVar('T', bound=BaseModel)
+R = TypeVar('R')
+
+
+class SingleFlightMetrics(BaseModel):
+    calls: int = Field(default=0, description="Requests that reached the model")
+    coalesced: int = Field(default=0, description="Requests that joined an identical one already in flight")
+    shared_errors: int = Field(default=0, description="Coalesced requests that received the leader's error")
+
+
+class SingleFlight:
+    """
+    Runs at most one model request per key at a time. Callers arriving while
+    an identical request is in flight await the same task and get its result
+    or its exception. The request runs as its own task, so a cancelled caller
+    does not cancel it for the others; it is only cancelled once every caller
+    waiting on it is gone.
+    """
+
+    def __init__(self):
+        self.metrics = SingleFlightMetrics()
+        # key -> (task, number of callers waiting on it)
+        self._in_flight: dict[str, list] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable[R]]) -> R:
+        entry = self._in_flight.get(key)
+        leader = entry is None
+        if leader:
+            self.metrics.calls += 1
+            entry = self._in_flight[key] = [asyncio.ensure_future(call()), 0]
+            entry[0].add_done_callback(lambda _: self._forget(key, entry))
+        else:
+            self.metrics.coalesced += 1
+
+        task = entry[0]
+        entry[1] += 1
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if entry[1] == 1 and not task.done():
+                self._forget(key, entry)
+                task.cancel()
+            raise
+        except Exception:
+            if not leader:
+                self.metrics.shared_errors += 1
+            raise
+        finally:
+            entry[1] -= 1
+
+    def _forget(self, key: str, entry: list) -> None:
+        if self._in_flight.get(key) is entry:
+            del self._in_flight[key]
+
+    def log_metrics(self) -> None:
+        if not self.metrics.coalesced:
+            return
+        logger.info(
+            "🔗 LLM single-flight: calls=%d coalesced=%d shared errors=%d",
+            self.metrics.calls,
+            self.metrics.coalesced,
+            self.metrics.shared_errors,
+        )
+
+
+llm_single_flight = SingleFlight()
+
+
+class HedgeMetrics(BaseModel):
+    calls: int = Field(default=0, description="Hedgeable requests")
+    fired: int = Field(default=0, description="Duplicate requests sent after the hedge delay")
+    won: int = Field(default=0, description="Duplicates that answered before the original")
+    denied: int = Field(default=0, description="Hedges skipped because the budget was spent")
+
+
+class HedgePolicy:
+    """
+    Hedged requests for latency-critical calls. A request that has not
+    answered within the ``percentile`` latency of recent calls to its model
+    gets a duplicate, on the same or another model; the first valid result
+    wins and the other request is cancelled. A failed request waits for the
+    other one instead of failing the call. Every call earns ``budget`` of a
+    hedge, up to ``burst``, so at most that share of calls is duplicated.
+    """
+
+    def __init__(
+        self,
+        percentile: float = LLM_HEDGE_PERCENTILE,
+        default_delay_s: float = LLM_HEDGE_DEFAULT_DELAY_S,
+        min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        budget: float = LLM_HEDGE_BUDGET,
+        burst: float = 2.0,
+        window: int = 200,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.percentile = percentile
+        self.default_delay_s = default_delay_s
+        self.min_samples = min_samples
+        self.budget = budget
+        self.burst = burst
+        self.window = window
+        self.clock = clock
+        self.metrics = HedgeMetrics()
+        self._credit = burst
+        self._latencies: dict[str, deque] = {}
+
+    def delay_s(self, model: str) -> float:
+        samples = self._latencies.get(model, ())
+        if len(samples) < self.min_samples:
+            return self.default_delay_s
+        ordered = sorted(samples)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * self.percentile))]
+
+    def record(self, model: str, latency_s: float) -> None:
+        self._latencies.setdefault(model, deque(maxlen=self.window)).append(latency_s)
+
+    async def run(self, model: str, call: Callable[[str], Awaitable[R]], hedge_model: str) -> R:
+        """``call(model)``, duplicated as ``call(hedge_model)`` if it is slow."""
+        self.metrics.calls += 1
+        self._credit = min(self.burst, self._credit + self.budget)
+        primary = asyncio.ensure_future(call(model))
+        # task -> (model, start); cancelled losers are not recorded, only completed requests
+        tasks = {primary: (model, self.clock())}
+        try:
+            done, _ = await asyncio.wait({primary}, timeout=self.delay_s(model))
+            if not done:
+                if self._credit >= 1:
+                    self._credit -= 1
+                    self.metrics.fired += 1
+                    tasks[asyncio.ensure_future(call(hedge_model))] = (hedge_model, self.clock())
+                else:
+                    self.metrics.denied += 1
+
+            pending, error = set(tasks), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=lambda t: t is not primary):
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                        continue
+                    task_model, started = tasks[task]
+                    self.record(task_model, self.clock() - started)
+                    if task is not primary:
+                        self.metrics.won += 1
+                    return task.result()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    def log_metrics(self) -> None:
+        if not self.metrics.fired and not self.metrics.denied:
+            return
+        logger.info(
+            "🪁 LLM hedging: calls=%d hedged=%d won=%d over budget=%d",
+            self.metrics.calls,
+            self.metrics.fired,
+            self.metrics.won,
+            self.metrics.denied,
+        )
+
+
+llm_hedge = HedgePolicy()
+shared_http_client.response_hooks.append(llm_scheduler.observe_response)
+
+
+def create_model(llm_model: str) -> "Model":
+    """The pydantic_ai model for ``llm_model`` on the configured LLM_BACKEND."""
+    if LLM_BACKEND == "scripted":
+        from .scripted_llm import scripted_llm
+
+        return scripted_llm.model()
+    from pydantic_ai.models.openai import OpenAIModel
+
+    return OpenAIModel(llm_model, api_key=os.getenv("OPENAI_API_KEY"), http_client=shared_http_client.client)
 
 
 @alru_cache(maxsize=32)
-async def get_agent(response_format: Optional[Type[T]]=None, llm_model: str = "gpt-4o-2024-08-06") -> Agent[Any, T]:
-    model = OpenAIModel(llm_model, api_key=os.getenv("OPENAI_API_KEY"))
+async def get_agent(response_format: Optional[Type[T]]=None, llm_model: str = "gpt-4o-2024-08-06") -> "Agent[Any, T]":
+    # pydantic_ai (and the openai client) are imported on first use, not at startup;
+    # wait for the background import if one is running rather than blocking the loop
+    await startup_orchestrator.ready("pydantic_ai")
+    from pydantic_ai import Agent
+
+    model = create_model(llm_model)
     if response_format is None:
         return Agent(model)
     else:
@@ -24,24 +231,68 @@ async def get_agent(response_format: Optional[Type[T]]=None, llm_model: str = "g
 
 
 async def structured_output_prompt(
-    prompt: str, response_format: Type[T], llm_model: str = "gpt-4o-2024-08-06"
+    prompt: str,
+    response_format: Type[T],
+    llm_model: str = "gpt-4o-2024-08-06",
+    cache_ttl: Optional[float] = None,
+    use_cache: bool = True,
+    hedge_model: Optional[str] = None,
 ) -> T:
     """
     Parse the response from the OpenAI API using structured output.
 
+    Responses are cached by (model, response schema, normalized prompt), so
+    repeated selections skip the round trip, and identical requests already
+    in flight are joined rather than sent again. Calls to the model wait for
+    an llm_scheduler slot at the calling task's ``llm_priority``. With
+    LLM_HEDGE_ENABLED, a call given ``hedge_model`` is duplicated to that model
+    when it runs slow (see HedgePolicy).
+
     Args:
         prompt (str): The prompt to send to the OpenAI API.
         response_format (BaseModel): The Pydantic model representing the expected response format.
+        cache_ttl (float): Seconds to keep this response; defaults to LLM_CACHE_TTL_S.
+        use_cache (bool): False for calls whose answer should differ every time, e.g. generated content.
+        hedge_model (str): Model for a hedged duplicate request; None never hedges.
 
     Returns:
         BaseModel: The parsed response from the OpenAI API.
     """
-    agent:Agent[Any,T] = await get_agent(response_format, llm_model)
-    completion = await agent.run(
-        prompt,
-    )
+    key = response_key(llm_model, response_format, prompt)
+    cacheable = use_cache and LLM_CACHE_ENABLED
+    if cacheable:
+        cached = await llm_cache.get(key, response_format)
+        if cached is not None:
+            return cached
+    else:
+        llm_cache.metrics.bypassed += 1
+
+    async def attempt(model: str) -> T:
+        agent: "Agent[Any, T]" = await get_agent(response_format, model)
+        async with llm_scheduler.slot(model, estimate_tokens(prompt) + LLM_OUTPUT_TOKEN_ESTIMATE):
+            completion = await agent.run(
+                prompt,
+            )
+        prompt_cache_stats.observe(prompt, completion.usage())
+        return completion.data
+
+    async def run() -> T:
+        start = time.perf_counter()
+        if hedge_model and LLM_HEDGE_ENABLED:
+            data = await llm_hedge.run(llm_model, attempt, hedge_model)
+        else:
+            data = await attempt(llm_model)
+        if cacheable:
+            await llm_cache.put(
+                key,
+                data,
+                LLM_CACHE_TTL_S if cache_ttl is None else cache_ttl,
+                (time.perf_counter() - start) * 1000,
+            )
+        return data
 
-    return completion.data
+    # Cached and uncached calls never share a flight: only one of them stores the result
+    return await llm_single_flight.do(f"{key}:{int(cacheable)}", run)
 
 
 async def chat_prompt(prompt: str, llm_model: str) -> str:
@@ -55,12 +306,79 @@ async def chat_prompt(prompt: str, llm_model: str) -> str:
     Returns:
         str: The assistant's response.
     """
-    agent:Agent[Any,str] = await get_agent(llm_model)
-    completion = await agent.run(
-        prompt,
-    )
+    async def run() -> str:
+        agent: "Agent[Any, str]" = await get_agent(None, llm_model)
+        async with llm_scheduler.slot(llm_model, estimate_tokens(prompt) + LLM_OUTPUT_TOKEN_ESTIMATE):
+            completion = await agent.run(
+                prompt,
+            )
+        prompt_cache_stats.observe(prompt, completion.usage())
+        return completion.data
 
-    return completion.data
+    return await llm_single_flight.do(response_key(llm_model, None, prompt), run)
+
+
+async def stream_chat_prompt(prompt: str, llm_model: str, debounce_s: float = LLM_STREAM_DEBOUNCE_S) -> AsyncIterator[str]:
+    """
+    Run a chat model and yield the response text as it arrives.
+
+    Args:
+        prompt (str): The prompt to send to the OpenAI API.
+        llm_model (str): The model ID to use for the API call.
+        debounce_s (float): Group deltas arriving within this many seconds.
+
+    Yields:
+        str: The next piece of the assistant's response.
+    """
+    agent: "Agent[Any, str]" = await get_agent(None, llm_model)
+    async with llm_scheduler.slot(llm_model, estimate_tokens(prompt) + LLM_OUTPUT_TOKEN_ESTIMATE):
+        async with agent.run_stream(prompt) as result:
+            async for delta in result.stream_text(delta=True, debounce_by=debounce_s):
+                yield delta
+        prompt_cache_stats.observe(prompt, result.usage())
+
+
+async def stream_structured_output_prompt(
+    prompt: str,
+    response_format: Type[T],
+    llm_model: str = "gpt-4o-2024-08-06",
+    debounce_s: float = LLM_STREAM_DEBOUNCE_S,
+) -> AsyncIterator[T]:
+    """
+    Stream a structured output response as partially validated objects.
+
+    String fields grow as tokens arrive; the last object yielded is the
+    complete, fully validated response. Partial objects are only yielded once
+    every required field has started, so put long fields last in the model.
+    Streamed responses are neither cached nor coalesced.
+
+    Args:
+        prompt (str): The prompt to send to the OpenAI API.
+        response_format (BaseModel): The Pydantic model representing the expected response format.
+        debounce_s (float): Validate at most once per this many seconds.
+
+    Yields:
+        BaseModel: The response so far.
+    """
+    agent: "Agent[Any, T]" = await get_agent(response_format, llm_model)
+    async with llm_scheduler.slot(llm_model, estimate_tokens(prompt) + LLM_OUTPUT_TOKEN_ESTIMATE):
+        async with agent.run_stream(prompt) as result:
+            async for message, is_last in result.stream_structured(debounce_by=debounce_s):
+                try:
+                    yield await result.validate_structured_result(message, allow_partial=not is_last)
+                except ValidationError:
+                    if is_last:
+                        raise
+        prompt_cache_stats.observe(prompt, result.usage())
+
+
+def log_llm_metrics() -> None:
+    llm_cache.log_metrics()
+    llm_single_flight.log_metrics()
+    llm_hedge.log_metrics()
+    llm_scheduler.log_metrics()
+    shared_http_client.log_metrics()
+    prompt_cache_stats.log_metrics()
 
 
 def parse_markdown_backticks(str) -> str:
@@ -72,3 +390,57 @@ def parse_markdown_backticks(str) -> str:
     str = str.rsplit("```", 1)[0]
     # Remove any leading or trailing whitespace
     return str.strip()
+
+
+class MarkdownFenceStripper:
+    """
+    Incremental ``parse_markdown_backticks`` for streamed text: ``feed`` each
+    chunk and write what it returns, then write ``finish()``. Text that may
+    still turn out to be a fence or trailing whitespace is held back until
+    it can be decided. A response is treated as unfenced once
+    ``lookahead`` characters pass without a fence, so unlike the batch
+    version, prose longer than that before a code block is kept.
+    """
+
+    def __init__(self, lookahead: int = 256):
+        self.lookahead = lookahead
+        self._state = "start"  # start, language, body
+        self._text = ""
+        self._sent = 0
+        self._fenced = False
+
+    def feed(self, chunk: str) -> str:
+        self._text += chunk
+        if self._state == "start":
+            fence = self._text.find("```")
+            if fence >= 0:
+                self._text, self._state, self._fenced = self._text[fence + 3 :], "language", True
+            elif len(self._text.lstrip()) >= self.lookahead:
+                self._text, self._state = self._text.lstrip(), "body"
+            else:
+                return ""
+        if self._state == "language":
+            if "\n" not in self._text:
+                return ""
+            self._text, self._state = self._text.split("\n", 1)[1].lstrip(), "body"
+        return self._emit(final=False)
+
+    def finish(self) -> str:
+        if self._state == "start":
+            return self._text.strip()
+        return self._emit(final=True)
+
+    def _emit(self, final: bool) -> str:
+        if self._sent == 0:
+            self._text = self._text.lstrip()
+        end = len(self._text)
+        fence = self._text.rfind("```", self._sent) if self._fenced else -1
+        if fence >= 0:
+            # Everything from the last fence on is dropped unless another fence follows
+            end = fence
+        elif self._fenced and not final:
+            # A backtick or two at the end may be the start of the closing fence
+            end = len(self._text.rstrip("`"))
+        out = self._text[self._sent : end].rstrip()
+        self._sent += len(out)
+        return out
@@ -0,0 +1,207 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from functools import cache
+from typing import Optional, Type, TypeVar
+
+from cachetools import LRUCache
+from pydantic import BaseModel, Field
+
+from .logging import logger
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_S = float(os.getenv("LLM_CACHE_TTL_S", "3600"))
+LLM_CACHE_MEMORY_ENTRIES = int(os.getenv("LLM_CACHE_MEMORY_ENTRIES", "512"))
+# On-disk persistence is opt-in: cached answers then survive restarts
+LLM_CACHE_PERSIST = os.getenv("LLM_CACHE_PERSIST", "false").lower() == "true"
+LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "./.llm_cache.sqlite")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "10000"))
+
+T = TypeVar("T", bound=BaseModel)
+
+
+class LLMCacheMetrics(BaseModel):
+    memory_hits: int = Field(default=0, description="Responses served from the in-memory LRU")
+    disk_hits: int = Field(default=0, description="Responses served from SQLite")
+    misses: int = Field(default=0, description="Lookups that went to the model, expired entries included")
+    expired: int = Field(default=0, description="Entries found but past their TTL")
+    bypassed: int = Field(default=0, description="Calls made with use_cache=False")
+    miss_latency_ms_total: float = Field(default=0.0, description="Model time spent on misses")
+    by_format: dict[str, list[int]] = Field(default_factory=dict, description="[hits, misses] per response format")
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    @property
+    def saved_ms_estimate(self) -> float:
+        """Hits times the average model latency of a miss."""
+        return self.hits * self.miss_latency_ms_total / self.misses if self.misses else 0.0
+
+
+def normalize_prompt(prompt: str) -> str:
+    """Collapse whitespace runs and trailing space, keeping line breaks and indentation (prompts embed code)."""
+    lines = []
+    for line in prompt.strip().splitlines():
+        stripped = line.lstrip()
+        lines.append(line[: len(line) - len(stripped)] + " ".join(stripped.split()))
+    return "\n".join(lines)
+
+
+@cache
+def _schema_json(response_format: Optional[Type[BaseModel]]) -> str:
+    if response_format is None:
+        return "text"
+    return json.dumps(response_format.model_json_schema(), sort_keys=True)
+
+
+def response_key(llm_model: str, response_format: Optional[Type[BaseModel]], prompt: str) -> str:
+    """``response_format=None`` keys a plain text (chat) completion."""
+    digest = hashlib.sha256()
+    digest.update(llm_model.encode())
+    digest.update(b"\0" + _schema_json(response_format).encode())
+    digest.update(b"\0" + normalize_prompt(prompt).encode())
+    return digest.hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Cache of structured model responses keyed by (model, response schema,
+    normalized prompt). Entries carry their own expiry, so every call site can
+    pick a TTL. An in-memory LRU answers first; with ``path`` set, a SQLite
+    table keeps responses across restarts, trimmed to ``max_entries``.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = LLM_CACHE_FILE if LLM_CACHE_PERSIST else None,
+        memory_entries: int = LLM_CACHE_MEMORY_ENTRIES,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        clock=time.time,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.clock = clock
+        self.metrics = LLMCacheMetrics()
+        # key -> (expires_at, response JSON); JSON so callers cannot mutate cached models
+        self._memory: LRUCache = LRUCache(maxsize=max(1, memory_entries))
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        if self._connection is None and self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS responses "
+                    "(key TEXT PRIMARY KEY, response TEXT NOT NULL, expires_at REAL NOT NULL, last_used REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS responses_last_used ON responses (last_used)")
+                connection.commit()
+                self._connection = connection
+            except sqlite3.Error as e:
+                logger.warning(f"LLM response cache {self.path} unavailable, using memory only: {e}")
+                self.path = None
+        return self._connection
+
+    def _count(self, response_format: Type[BaseModel], hit: bool) -> None:
+        counts = self.metrics.by_format.setdefault(response_format.__name__, [0, 0])
+        counts[0 if hit else 1] += 1
+
+    def _read_disk(self, key: str) -> Optional[tuple[float, str]]:
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return None
+            row = db.execute("SELECT expires_at, response FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                db.execute("UPDATE responses SET last_used = ? WHERE key = ?", (self.clock(), key))
+                db.commit()
+            return row
+
+    def _write_disk(self, key: str, expires_at: float, response: str) -> None:
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO responses (key, response, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, response, expires_at, self.clock()),
+            )
+            db.execute("DELETE FROM responses WHERE expires_at <= ?", (self.clock(),))
+            db.execute(
+                "DELETE FROM responses WHERE key NOT IN (SELECT key FROM responses ORDER BY last_used DESC LIMIT ?)",
+                (self.max_entries,),
+            )
+            db.commit()
+
+    async def get(self, key: str, response_format: Type[T]) -> Optional[T]:
+        entry = self._memory.get(key)
+        from_disk = False
+        if entry is None and self.path:
+            entry = await asyncio.to_thread(self._read_disk, key)
+            from_disk = entry is not None
+        if entry is not None and entry[0] <= self.clock():
+            self.metrics.expired += 1
+            self._memory.pop(key, None)
+            entry = None
+        if entry is None:
+            self.metrics.misses += 1
+            self._count(response_format, hit=False)
+            return None
+
+        if from_disk:
+            self._memory[key] = entry
+            self.metrics.disk_hits += 1
+        else:
+            self.metrics.memory_hits += 1
+        self._count(response_format, hit=True)
+        return response_format.model_validate_json(entry[1])
+
+    async def put(self, key: str, response: BaseModel, ttl_s: float, latency_ms: float = 0.0) -> None:
+        self.metrics.miss_latency_ms_total += latency_ms
+        if ttl_s <= 0:
+            return
+        entry = (self.clock() + ttl_s, response.model_dump_json())
+        self._memory[key] = entry
+        if self.path:
+            await asyncio.to_thread(self._write_disk, key, *entry)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        with self._lock:
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM responses")
+                db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def log_metrics(self) -> None:
+        logger.info(
+            "🗃️ LLM cache: hit rate=%.0f%% (memory=%d disk=%d miss=%d expired=%d bypassed=%d) saved ~%.1fs",
+            self.metrics.hit_rate * 100,
+            self.metrics.memory_hits,
+            self.metrics.disk_hits,
+            self.metrics.misses,
+            self.metrics.expired,
+            self.metrics.bypassed,
+            self.metrics.saved_ms_estimate / 1000,
+        )
+
+
+llm_cache = LLMResponseCache()
@@ -0,0 +1,236 @@
+import asyncio
+import itertools
+import json
+import os
+import re
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import TYPE_CHECKING, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    import httpx
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+# Completion tokens reserved per call on top of the prompt estimate
+LLM_OUTPUT_TOKEN_ESTIMATE = int(os.getenv("LLM_OUTPUT_TOKEN_ESTIMATE", "512"))
+
+
+class Priority(IntEnum):
+    interactive = 0
+    background = 1
+
+
+# Priority of the LLM calls made from the current task; tasks inherit it when created
+llm_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.interactive)
+
+
+def parse_reset(value: str) -> float:
+    """OpenAI reset durations such as ``1s``, ``6m0s``, ``20ms`` or ``1h2m3.5s``, in seconds."""
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    return sum(float(amount) * units[unit] for amount, unit in re.findall(r"([\d.]+)(ms|h|m|s)", value))
+
+
+class RateBucket:
+    """
+    Last known request or token allowance for one model: ``remaining`` until
+    ``reset_at``, then the full ``limit`` again. Unknown until the first
+    update, and an unknown bucket never holds a call back.
+    """
+
+    def __init__(self):
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.reset_at = 0.0
+
+    def update(self, limit: int, remaining: int, reset_s: float, now: float) -> None:
+        self.limit = limit
+        self.remaining = remaining
+        self.reset_at = now + reset_s
+
+    def available(self, now: float) -> Optional[int]:
+        if self.remaining is None:
+            return None
+        return self.limit if now >= self.reset_at else self.remaining
+
+    def wait_s(self, amount: int, now: float) -> float:
+        available = self.available(now)
+        # A call larger than the whole limit still goes once the bucket is full
+        if available is None or available >= min(amount, self.limit):
+            return 0.0
+        return max(self.reset_at - now, 0.0)
+
+    def take(self, amount: int, now: float) -> None:
+        available = self.available(now)
+        if available is not None:
+            self.remaining = available - amount
+            if now >= self.reset_at:
+                # The server will report the new window; until then assume a minute like the API's limits
+                self.reset_at = now + 60
+
+
+class SchedulerMetrics(BaseModel):
+    granted: dict[str, int] = Field(default_factory=dict, description="Calls started per priority")
+    wait_ms_total: dict[str, float] = Field(default_factory=dict, description="Queue wait per priority")
+    wait_ms_max: float = Field(default=0.0, description="Longest time a call waited for its slot")
+    rate_limited: int = Field(default=0, description="Calls held back by a request or token bucket")
+    throttled: int = Field(default=0, description="429 responses seen despite the buckets")
+
+    def wait_ms_avg(self, priority: Priority) -> float:
+        granted = self.granted.get(priority.name, 0)
+        return self.wait_ms_total.get(priority.name, 0.0) / granted if granted else 0.0
+
+
+class _Waiter:
+    def __init__(self, priority: Priority, seq: int, model: str, tokens: int, queued_at: float):
+        self.priority = priority
+        self.seq = seq
+        self.model = model
+        self.tokens = tokens
+        self.queued_at = queued_at
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+        self.held = False
+
+
+class LLMScheduler:
+    """
+    Admits tool-side model calls in priority order, interactive tool steps
+    ahead of background work. A call starts when one of ``max_concurrency``
+    slots is free and its model's request and token buckets cover it. The
+    buckets follow the ``x-ratelimit-*`` response headers of the tool models'
+    own calls, so calls wait for the window to reset instead of drawing 429s.
+    The realtime model's limits are separate and are not tracked here. Calls
+    for a model never overtake an earlier call for the same model that is
+    waiting on its buckets.
+    """
+
+    def __init__(self, max_concurrency: int = LLM_MAX_CONCURRENCY, clock: Callable[[], float] = time.monotonic):
+        self.max_concurrency = max(1, max_concurrency)
+        self.clock = clock
+        self.metrics = SchedulerMetrics()
+        self.buckets: dict[str, tuple[RateBucket, RateBucket]] = {}
+        self._waiting: list[_Waiter] = []
+        self._active = 0
+        self._seq = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def _limits(self, model: str) -> tuple[RateBucket, RateBucket]:
+        if model not in self.buckets:
+            self.buckets[model] = (RateBucket(), RateBucket())
+        return self.buckets[model]
+
+    @asynccontextmanager
+    async def slot(self, model: str, tokens: int, priority: Optional[Priority] = None):
+        """Hold a slot for one call to ``model`` estimated at ``tokens`` tokens."""
+        priority = llm_priority.get() if priority is None else priority
+        waiter = _Waiter(priority, next(self._seq), model, tokens, self.clock())
+        self._waiting.append(waiter)
+        self._pump()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter in self._waiting:
+                self._waiting.remove(waiter)
+            elif waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            raise
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._pump()
+
+    def _pump(self) -> None:
+        now = self.clock()
+        blocked: set[str] = set()
+        wake_in: Optional[float] = None
+        for waiter in sorted(self._waiting, key=lambda w: (w.priority, w.seq)):
+            if self._active >= self.max_concurrency:
+                break
+            if waiter.model in blocked:
+                continue
+            requests, tokens = self._limits(waiter.model)
+            wait = max(requests.wait_s(1, now), tokens.wait_s(waiter.tokens, now))
+            if wait > 0:
+                blocked.add(waiter.model)
+                if not waiter.held:
+                    waiter.held = True
+                    self.metrics.rate_limited += 1
+                wake_in = wait if wake_in is None else min(wake_in, wait)
+                continue
+
+            requests.take(1, now)
+            tokens.take(waiter.tokens, now)
+            self._active += 1
+            self._waiting.remove(waiter)
+            self._record_wait(waiter, now)
+            waiter.future.set_result(None)
+
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if wake_in is not None:
+            self._timer = asyncio.get_running_loop().call_later(wake_in, self._pump)
+
+    def _record_wait(self, waiter: _Waiter, now: float) -> None:
+        wait_ms = (now - waiter.queued_at) * 1000
+        name = waiter.priority.name
+        self.metrics.granted[name] = self.metrics.granted.get(name, 0) + 1
+        self.metrics.wait_ms_total[name] = self.metrics.wait_ms_total.get(name, 0.0) + wait_ms
+        self.metrics.wait_ms_max = max(self.metrics.wait_ms_max, wait_ms)
+
+    def observe_headers(self, model: str, headers, status_code: int = 200) -> None:
+        now = self.clock()
+        requests, tokens = self._limits(model)
+        for bucket, kind in ((requests, "requests"), (tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            if limit is not None and remaining is not None:
+                bucket.update(int(limit), int(remaining), parse_reset(headers.get(f"x-ratelimit-reset-{kind}", "0s")), now)
+        if status_code == 429:
+            self.metrics.throttled += 1
+            retry_after = headers.get("retry-after")
+            if retry_after is not None and requests.limit is not None:
+                requests.update(requests.limit, 0, float(retry_after), now)
+        self._pump()
+
+    async def observe_response(self, response: "httpx.Response") -> None:
+        """httpx response hook: update the buckets of the model named in the request body."""
+        if response.status_code != 429 and "x-ratelimit-limit-requests" not in response.headers:
+            return
+        try:
+            model = json.loads(response.request.content).get("model")
+        except (ValueError, AttributeError):
+            return
+        if model:
+            self.observe_headers(model, response.headers, response.status_code)
+
+    def log_metrics(self) -> None:
+        if not self.metrics.granted:
+            return
+        logger.info(
+            "🚦 LLM scheduler: interactive=%d (avg wait %.0fms) background=%d (avg wait %.0fms) "
+            "max wait=%.0fms rate limited=%d 429s=%d",
+            self.metrics.granted.get(Priority.interactive.name, 0),
+            self.metrics.wait_ms_avg(Priority.interactive),
+            self.metrics.granted.get(Priority.background.name, 0),
+            self.metrics.wait_ms_avg(Priority.background),
+            self.metrics.wait_ms_max,
+            self.metrics.rate_limited,
+            self.metrics.throttled,
+        )
+
+
+llm_scheduler = LLMScheduler()
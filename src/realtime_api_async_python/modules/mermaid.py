@@ -2,15 +2,17 @@
 
 import os
 import base64
-import requests
-from PIL import Image, UnidentifiedImageError
 import io
-from typing import Optional, List
+from typing import Optional, List, TYPE_CHECKING
 from pydantic import BaseModel
 from dotenv import load_dotenv
-import openai
+
+if TYPE_CHECKING:
+    from PIL import Image
 
 from realtime_api_async_python.modules.memory_management import memory_manager
+from realtime_api_async_python.modules.prompt_templates import PromptTemplate
+from realtime_api_async_python.modules.tool_registry import tool, ToolGroup
 
 from realtime_api_async_python.modules.llm import (
     parse_markdown_backticks,
@@ -33,7 +35,11 @@ def build_file_path(name: str):
     return os.path.join(scratch_pad_dir, name)
 
 
-def build_image(graph: str, filename: str) -> Optional[Image.Image]:
+def build_image(graph: str, filename: str) -> Optional["Image.Image"]:
+    # Imported on first use to keep PIL and requests out of assistant startup
+    import requests
+    from PIL import Image, UnidentifiedImageError
+
     graphbytes = graph.encode("utf8")
     base64_bytes = base64.b64encode(graphbytes)
     base64_string = base64_bytes.decode("ascii")
@@ -51,7 +57,7 @@ def build_image(graph: str, filename: str) -> Optional[Image.Image]:
         return None
 
 
-def mm(graph: str, filename: str) -> Optional[Image.Image]:
+def mm(graph: str, filename: str) -> Optional["Image.Image"]:
     img = build_image(graph, filename)
     if img:
         output_path = build_file_path(filename)
@@ -61,23 +67,11 @@ def mm(graph: str, filename: str) -> Optional[Image.Image]:
         return None
 
 
-# Main function to generate diagrams
-async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
+MERMAID_PROMPT = PromptTemplate(
+    "generate_diagram",
     """
-    Generates diagrams based on the prompt, producing multiple versions.
-
-    Args:
-        prompt (str): The prompt describing the diagram to generate.
-        version_count (int): The number of versions to generate.
-
-    Returns:
-        dict: A dictionary containing information about the generated diagrams.
-    """
-    memory_content = memory_manager.get_xml_for_prompt(["*"])
-
-    mermaid_prompt = f"""
 <purpose>
-    Generate {version_count} mermaid diagram(s) based on the user's prompt and the current memory content.
+    Generate as many mermaid diagrams as the version-count asks for, based on the user's prompt and the current memory content.
 </purpose>
 
 <instructions>
@@ -88,12 +82,6 @@ async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
     <instructions>Refer to the examples to understand the format of the mermaid diagrams.</instructions>
 </instructions>
 
-<user_prompt>
-    {prompt}
-</user_prompt>
-
-{memory_content}
-
 <examples>
     <example>
         <user-chart-request>
@@ -171,9 +159,30 @@ async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
         </chart-response>
     </example>
 </examples>
-"""
+""",
+    memory=True,
+    user=("version-count", "user_prompt"),
+)
+
+
+# Main function to generate diagrams
+@tool(ToolGroup.diagrams)
+async def generate_diagram(prompt: str, version_count: int = 1) -> dict:
+    """
+    Generates diagrams based on the prompt, producing multiple versions.
+
+    Args:
+        prompt (str): The prompt describing the diagram to generate.
+        version_count (int): The number of versions to generate.
+
+    Returns:
+        dict: A dictionary containing information about the generated diagrams.
+    """
+    memory_content = memory_manager.get_xml_for_prompt(["*"])
+
+    mermaid_prompt = MERMAID_PROMPT.render(memory=memory_content, version_count=version_count, user_prompt=prompt)
 
-    response: MermaidResponse = await structured_output_prompt(mermaid_prompt, MermaidResponse)
+    response: MermaidResponse = await structured_output_prompt(mermaid_prompt, MermaidResponse, use_cache=False)
     base_name = response.base_name
 
     print("response", response)
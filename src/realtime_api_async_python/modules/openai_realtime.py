@@ -1,6 +1,5 @@
-from .logging import logger, log_ws_event
-from .utils import base64_encode_audio
-import asyncjson
+from .logging import logger
+from .send_queue import OutgoingEventQueue
 from .utils import (
     RUN_TIME_TABLE_LOG_JSON,
     SESSION_INSTRUCTIONS,
@@ -8,48 +7,51 @@ from .utils import (
     SILENCE_THRESHOLD,
     SILENCE_DURATION_MS,
 )
-from .tools import (
-    tools,
-)
+from .tools import registry
 
 
-def get_openai_send_audio_callback(websocket):    
+def get_openai_send_audio_callback(send_queue: OutgoingEventQueue):
     async def send_audio(audio_data):
-        base64_audio = base64_encode_audio(audio_data)
-        if base64_audio:
-            audio_event = {
-                "type": "input_audio_buffer.append",
-                "audio": base64_audio,
-            }
-            log_ws_event("Outgoing", audio_event)
-            await websocket.send(await asyncjson.dumps(audio_event))
+        if audio_data:
+            send_queue.put_audio(audio_data)
         else:
             logger.debug("No audio data to send")
     return send_audio
     
-def get_openai_after_recieve_callback(websocket):
+def get_openai_after_recieve_callback(websocket, send_queue: OutgoingEventQueue):
     async def close_websocket():
+        send_queue.close()
         await websocket.close()
     return close_websocket
 
 
-async def initialize_session(websocket):
+def _with_tools(event: dict, tool_groups) -> dict:
+    tools, _ = registry.payload(tool_groups)
+    event["session"]["tools"] = tools
+    return event
+
+
+async def initialize_session(send_queue: OutgoingEventQueue, modalities=("text", "audio"), tool_groups=None):
     session_update = {
         "type": "session.update",
         "session": {
-            "modalities": ["text", "audio"],
+            "modalities": list(modalities),
             "instructions": SESSION_INSTRUCTIONS,
             "voice": "alloy",
             "input_audio_format": "pcm16",
             "output_audio_format": "pcm16",
+            # Text-only sessions have no input audio, so server VAD is switched off
             "turn_detection": {
                 "type": "server_vad",
                 "threshold": SILENCE_THRESHOLD,
                 "prefix_padding_ms": PREFIX_PADDING_MS,
                 "silence_duration_ms": SILENCE_DURATION_MS,
-            },
-            "tools": tools,
+            } if "audio" in modalities else None,
         },
     }
-    log_ws_event("Outgoing", session_update)
-    await websocket.send(await asyncjson.dumps(session_update))
\ No newline at end of file
+    send_queue.put_event(_with_tools(session_update, tool_groups))
+
+
+def update_session_tools(send_queue: OutgoingEventQueue, tool_groups):
+    """Swap the advertised tools mid-session; applies from the next response."""
+    send_queue.put_event(_with_tools({"type": "session.update", "session": {}}, tool_groups))
\ No newline at end of file
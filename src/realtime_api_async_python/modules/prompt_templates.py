@@ -0,0 +1,116 @@
+import textwrap
+from typing import Any, Optional, Sequence
+
+from pydantic import BaseModel, Field
+
+from .logging import logger
+
+
+class RenderedPrompt(str):
+    """A prompt string that remembers which template produced it."""
+
+    template: str
+
+    def __new__(cls, text: str, template: str):
+        prompt = super().__new__(cls, text)
+        prompt.template = template
+        return prompt
+
+
+class PromptTemplate:
+    """
+    A tool prompt split by how often its parts change. The static purpose
+    and instructions are compiled once into a fixed prefix; sections follow
+    in tier order (schema, then memory, then the user's input), so repeated
+    calls share the longest possible leading run of identical tokens and the
+    provider's prompt cache can serve it (OpenAI caches prompts from 1024
+    tokens on). Static text must not interpolate anything; per-call values
+    belong in sections.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        instructions: str,
+        schema: Sequence[str] = (),
+        memory: bool = False,
+        user: Sequence[str] = ("user-prompt",),
+        memory_tag: Optional[str] = None,
+    ):
+        self.name = name
+        self.prefix = textwrap.dedent(instructions).strip() + "\n"
+        # Sections are named by their tag, used verbatim; render() takes each as a keyword
+        # with hyphens spelled as underscores. schema (table definitions, dialects): stable
+        # across calls; memory: changes as the session goes on; user: the user's prompt
+        # and the content picked for this call
+        tags = [*schema, *(["memory"] if memory else []), *user]
+        # Opening and closing tags per keyword; memory arrives already wrapped in <memory>
+        self._tags = {
+            tag.replace("-", "_"): self._wrap(memory_tag) if tag == "memory" else self._wrap(tag) for tag in tags
+        }
+        self.sections = list(self._tags)
+
+    @staticmethod
+    def _wrap(tag: Optional[str]) -> tuple[str, str]:
+        return (f"<{tag}>\n", f"\n</{tag}>") if tag else ("", "")
+
+    def render(self, **values: Any) -> RenderedPrompt:
+        missing = set(self.sections) - values.keys()
+        unknown = values.keys() - set(self.sections)
+        if missing or unknown:
+            raise ValueError(f"Prompt template {self.name}: missing {sorted(missing)}, unknown {sorted(unknown)}")
+        parts = [self.prefix]
+        for section in self.sections:
+            value = str(values[section])
+            if not value:
+                continue
+            opening, closing = self._tags[section]
+            parts.append(f"{opening}{value}{closing}\n")
+        return RenderedPrompt("\n".join(parts), self.name)
+
+
+class PromptCacheMetrics(BaseModel):
+    calls: dict[str, int] = Field(default_factory=dict, description="Model calls per template")
+    prompt_tokens: dict[str, int] = Field(default_factory=dict, description="Prompt tokens billed per template")
+    cached_tokens: dict[str, int] = Field(default_factory=dict, description="Prompt tokens served from the provider cache")
+
+    def cached_ratio(self, template: Optional[str] = None) -> float:
+        if template is None:
+            prompt, cached = sum(self.prompt_tokens.values()), sum(self.cached_tokens.values())
+        else:
+            prompt, cached = self.prompt_tokens.get(template, 0), self.cached_tokens.get(template, 0)
+        return cached / prompt if prompt else 0.0
+
+
+class PromptCacheStats:
+    """Cached prompt tokens per template, read from the usage of each model response."""
+
+    def __init__(self):
+        self.metrics = PromptCacheMetrics()
+
+    def observe(self, prompt: str, usage: Any) -> None:
+        """Record ``usage`` (a pydantic_ai ``Usage``) for a call made with ``prompt``."""
+        if not usage.request_tokens:
+            return
+        name = getattr(prompt, "template", "untemplated")
+        self.metrics.calls[name] = self.metrics.calls.get(name, 0) + 1
+        self.metrics.prompt_tokens[name] = self.metrics.prompt_tokens.get(name, 0) + usage.request_tokens
+        cached = (usage.details or {}).get("cached_tokens", 0)
+        self.metrics.cached_tokens[name] = self.metrics.cached_tokens.get(name, 0) + cached
+
+    def log_metrics(self) -> None:
+        if not self.metrics.calls:
+            return
+        per_template = " ".join(
+            f"{name}={self.metrics.cached_ratio(name) * 100:.0f}%" for name in sorted(self.metrics.calls)
+        )
+        logger.info(
+            "🧩 Prompt cache: cached tokens=%d/%d (%.0f%%) %s",
+            sum(self.metrics.cached_tokens.values()),
+            sum(self.metrics.prompt_tokens.values()),
+            self.metrics.cached_ratio() * 100,
+            per_template,
+        )
+
+
+prompt_cache_stats = PromptCacheStats()
@@ -0,0 +1,143 @@
+import asyncio
+import json
+import os
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
+
+from .logging import logger
+
+if TYPE_CHECKING:
+    from pydantic_ai.messages import ModelMessage, ModelResponse
+    from pydantic_ai.models.function import AgentInfo, FunctionModel
+
+LLM_SCRIPTED_LATENCY_MS = float(os.getenv("LLM_SCRIPTED_LATENCY_MS", "0"))
+# JSON object of canned answers: response format name -> result arguments, "text" -> chat reply
+LLM_SCRIPTED_RESPONSES = os.getenv("LLM_SCRIPTED_RESPONSES")
+LLM_SCRIPTED_CHUNK_CHARS = 64
+
+# An answer is either the value itself or a function of the prompt that returns it
+Answer = Union[Any, Callable[[str], Any]]
+
+
+def sample_from_schema(schema: dict, defs: Optional[dict] = None) -> Any:
+    """Smallest value valid for a JSON schema: defaults, first enum member, empty strings and lists."""
+    defs = schema.get("$defs", defs) or {}
+    if "$ref" in schema:
+        return sample_from_schema(defs[schema["$ref"].rsplit("/", 1)[-1]], defs)
+    if "default" in schema:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+    if "const" in schema:
+        return schema["const"]
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return sample_from_schema(options[0], defs)
+    match schema.get("type"):
+        case "object":
+            properties = schema.get("properties", {})
+            return {
+                name: sample_from_schema(properties[name], defs)
+                for name in schema.get("required", properties)
+                if name in properties
+            }
+        case "array":
+            return []
+        case "string":
+            return ""
+        case "integer":
+            return 0
+        case "number":
+            return 0.0
+        case "boolean":
+            return False
+    return None
+
+
+def _prompt_text(messages: list["ModelMessage"]) -> str:
+    for message in reversed(messages):
+        for part in reversed(getattr(message, "parts", [])):
+            if part.part_kind == "user-prompt":
+                return part.content
+    return ""
+
+
+class ScriptedLLM:
+    """
+    Offline stand-in for the OpenAI models behind ``get_agent``
+    (``LLM_BACKEND=scripted``). Structured calls get the canned arguments
+    registered for their response format's name, or the smallest valid object
+    for its schema; chat calls get ``responses["text"]``. Every call waits
+    ``latency_ms`` first, and streamed calls arrive in small chunks, so tools
+    run their whole pipeline without a network or an API key.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[dict[str, Answer]] = None,
+        latency_ms: float = LLM_SCRIPTED_LATENCY_MS,
+        chunk_chars: int = LLM_SCRIPTED_CHUNK_CHARS,
+    ):
+        self.responses: dict[str, Answer] = dict(responses or {})
+        self.latency_ms = latency_ms
+        self.chunk_chars = max(1, chunk_chars)
+        # (response format or "text", prompt) per call, for tests and benchmarks
+        self.calls: list[tuple[str, str]] = []
+
+    def _answer(self, messages: list["ModelMessage"], info: "AgentInfo") -> tuple[Optional[str], Any]:
+        """(result tool name or None for text, answer)"""
+        prompt = _prompt_text(messages)
+        if info.result_tools:
+            tool = info.result_tools[0]
+            schema = tool.parameters_json_schema
+            name = schema.get("title", tool.name)
+            answer = self.responses.get(name)
+            self.calls.append((name, prompt))
+            if answer is None:
+                return tool.name, sample_from_schema(schema)
+            return tool.name, answer(prompt) if callable(answer) else answer
+        answer = self.responses.get("text", "Scripted response.")
+        self.calls.append(("text", prompt))
+        return None, answer(prompt) if callable(answer) else answer
+
+    async def respond(self, messages: list["ModelMessage"], info: "AgentInfo") -> "ModelResponse":
+        from pydantic_ai.messages import ModelResponse, ToolCallPart
+
+        await asyncio.sleep(self.latency_ms / 1000)
+        tool_name, answer = self._answer(messages, info)
+        if tool_name is None:
+            return ModelResponse.from_text(answer)
+        return ModelResponse.from_tool_call(ToolCallPart.from_raw_args(tool_name, answer))
+
+    async def stream(self, messages: list["ModelMessage"], info: "AgentInfo"):
+        from pydantic_ai.models.function import DeltaToolCall
+
+        await asyncio.sleep(self.latency_ms / 1000)
+        tool_name, answer = self._answer(messages, info)
+        text = answer if tool_name is None else json.dumps(answer)
+        for start in range(0, max(len(text), 1), self.chunk_chars):
+            chunk = text[start : start + self.chunk_chars]
+            if tool_name is None:
+                yield chunk
+            else:
+                yield {0: DeltaToolCall(name=tool_name if start == 0 else None, json_args=chunk)}
+            await asyncio.sleep(0)
+
+    def model(self) -> "FunctionModel":
+        from pydantic_ai.models.function import FunctionModel
+
+        return FunctionModel(self.respond, stream_function=self.stream)
+
+
+def load_responses(path: Optional[str] = LLM_SCRIPTED_RESPONSES) -> dict[str, Any]:
+    if not path:
+        return {}
+    try:
+        with open(path, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Scripted LLM responses {path} not loaded: {e}")
+        return {}
+
+
+scripted_llm = ScriptedLLM(load_responses())
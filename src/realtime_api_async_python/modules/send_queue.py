@@ -0,0 +1,169 @@
+import asyncio
+import heapq
+import itertools
+import time
+from dataclasses import dataclass, field
+from enum import IntEnum
+from typing import Any, Union
+
+import asyncjson
+import websockets
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_ws_event, log_warning
+from .utils import base64_encode_audio
+
+# Upper bound for a single coalesced input_audio_buffer.append (raw PCM bytes).
+# The realtime API accepts appends up to 15 MiB of base64; stay well below it.
+MAX_COALESCED_AUDIO_BYTES = 512 * 1024
+
+
+class EventPriority(IntEnum):
+    """Lower values are sent first. Events of equal priority keep FIFO order."""
+
+    CONTROL = 0
+    AUDIO = 1
+
+
+class SendQueueMetrics(BaseModel):
+    depth: int = Field(default=0, description="Entries currently waiting to be sent")
+    max_depth: int = Field(default=0, description="Highest queue depth observed")
+    sent: int = Field(default=0, description="Websocket messages sent")
+    coalesced: int = Field(default=0, description="Audio frames merged into a previous append")
+    send_latency_ms_last: float = Field(default=0.0, description="Enqueue-to-sent latency of the last message")
+    send_latency_ms_max: float = Field(default=0.0, description="Worst enqueue-to-sent latency observed")
+    send_latency_ms_total: float = Field(default=0.0, description="Sum of enqueue-to-sent latencies")
+
+    @property
+    def send_latency_ms_avg(self) -> float:
+        return self.send_latency_ms_total / self.sent if self.sent else 0.0
+
+
+@dataclass(order=True)
+class _Entry:
+    priority: int
+    seq: int
+    enqueued_at: float = field(compare=False)
+    payload: Union[dict, bytes] = field(compare=False)
+
+    @property
+    def is_audio(self) -> bool:
+        return isinstance(self.payload, bytes)
+
+
+class OutgoingEventQueue:
+    """
+    Single-writer outgoing queue for the realtime websocket.
+
+    Every coroutine that used to call ``websocket.send`` enqueues here instead,
+    and one writer task (``run``) owns the socket. Control events pre-empt
+    audio, and audio frames that pile up behind each other are merged into a
+    single ``input_audio_buffer.append`` when the socket falls behind.
+    """
+
+    def __init__(self, max_coalesced_audio_bytes: int = MAX_COALESCED_AUDIO_BYTES):
+        self.max_coalesced_audio_bytes = max_coalesced_audio_bytes
+        self.metrics = SendQueueMetrics()
+        self._heap: list[_Entry] = []
+        self._seq = itertools.count()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._heap)
+
+    def _push(self, priority: EventPriority, payload: Union[dict, bytes]) -> None:
+        if self._closed:
+            logger.debug("Send queue closed, dropping outgoing message")
+            return
+        heapq.heappush(
+            self._heap, _Entry(int(priority), next(self._seq), time.perf_counter(), payload)
+        )
+        self.metrics.depth = len(self._heap)
+        self.metrics.max_depth = max(self.metrics.max_depth, self.metrics.depth)
+        self._wakeup.set()
+
+    def put_event(self, event: dict, priority: EventPriority = EventPriority.CONTROL) -> None:
+        """
+        Enqueue a client event.
+
+        Args:
+            event: The client event dict.
+            priority: ``CONTROL`` jumps ahead of pending audio. Use ``AUDIO`` for
+                events that must stay ordered behind the audio already queued,
+                such as ``input_audio_buffer.commit``.
+        """
+        self._push(priority, event)
+
+    def put_audio(self, audio_data: bytes) -> None:
+        """Enqueue raw PCM16 audio to be sent as ``input_audio_buffer.append``."""
+        if audio_data:
+            self._push(EventPriority.AUDIO, bytes(audio_data))
+
+    def close(self) -> None:
+        """Stop accepting messages. The writer exits once the queue is drained."""
+        self._closed = True
+        self._wakeup.set()
+
+    def _pop_batch(self) -> tuple[Union[dict, bytes], float]:
+        entry = heapq.heappop(self._heap)
+        if not entry.is_audio:
+            return entry.payload, entry.enqueued_at
+
+        audio = bytearray(entry.payload)
+        while (
+            self._heap
+            and self._heap[0].is_audio
+            and len(audio) + len(self._heap[0].payload) <= self.max_coalesced_audio_bytes
+        ):
+            audio += heapq.heappop(self._heap).payload
+            self.metrics.coalesced += 1
+        return bytes(audio), entry.enqueued_at
+
+    async def _serialize(self, payload: Union[dict, bytes]) -> tuple[dict, str]:
+        if isinstance(payload, bytes):
+            event = {
+                "type": "input_audio_buffer.append",
+                "audio": base64_encode_audio(payload),
+            }
+            return event, await asyncjson.dumps(event)
+        return payload, await asyncjson.dumps(payload)
+
+    async def run(self, websocket: Any) -> None:
+        """Writer loop. Owns ``websocket.send`` until the queue is closed and drained."""
+        while True:
+            while not self._heap:
+                if self._closed:
+                    self.log_metrics()
+                    return
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            payload, enqueued_at = self._pop_batch()
+            self.metrics.depth = len(self._heap)
+            event, message = await self._serialize(payload)
+            log_ws_event("Outgoing", event)
+            try:
+                await websocket.send(message)
+            except websockets.ConnectionClosed:
+                log_warning("⚠️ WebSocket closed, dropping queued outgoing messages.")
+                self._closed = True
+                self._heap.clear()
+                self.log_metrics()
+                return
+
+            latency_ms = (time.perf_counter() - enqueued_at) * 1000
+            self.metrics.sent += 1
+            self.metrics.send_latency_ms_last = latency_ms
+            self.metrics.send_latency_ms_max = max(self.metrics.send_latency_ms_max, latency_ms)
+            self.metrics.send_latency_ms_total += latency_ms
+
+    def log_metrics(self) -> None:
+        logger.info(
+            "📤 Send queue: sent=%d coalesced=%d max_depth=%d latency avg=%.1fms max=%.1fms",
+            self.metrics.sent,
+            self.metrics.coalesced,
+            self.metrics.max_depth,
+            self.metrics.send_latency_ms_avg,
+            self.metrics.send_latency_ms_max,
+        )
@@ -0,0 +1,159 @@
+import asyncio
+import importlib
+import time
+from typing import Awaitable, Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_info, log_warning
+from .utils import WAKE_WORD_ENABLED, WAKE_WORD_MODEL, WHISPER_PRELOAD
+
+# Hosts the tools talk to; resolving them early takes DNS off the first tool call.
+WARM_HOSTS = (
+    "api.openai.com",
+    "oauth2.googleapis.com",
+    "people.googleapis.com",
+    "gmail.googleapis.com",
+)
+
+
+class WarmupStatus(BaseModel):
+    name: str
+    state: str = Field(default="pending", description="pending, running, done or failed")
+    duration_s: Optional[float] = Field(default=None, description="Time the warm-up took")
+    error: Optional[str] = None
+
+
+class StartupOrchestrator:
+    """
+    Runs registered warm-ups (credentials, agents, DNS, ...) as background tasks
+    so the realtime connection can start immediately. Code that needs a
+    warmed resource awaits ``ready(name)``, which returns at once if the
+    warm-up already finished or was never started.
+    """
+
+    def __init__(self):
+        self.warmups: dict[str, Callable[[], Awaitable[object]]] = {}
+        self.status: dict[str, WarmupStatus] = {}
+        self.tasks: dict[str, asyncio.Task] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def register_warmup(self, name: str, warmup: Callable[[], Awaitable[object]]) -> None:
+        self.warmups[name] = warmup
+        self.status[name] = WarmupStatus(name=name)
+
+    async def _run(self, name: str) -> None:
+        status = self.status[name]
+        status.state = "running"
+        status.error = None
+        start = time.perf_counter()
+        try:
+            await self.warmups[name]()
+            status.state = "done"
+        except Exception as e:
+            # A failed warm-up is retried by the tool that needs it, so just report it
+            status.state = "failed"
+            status.error = str(e)
+            log_warning(f"⚠️ Warm-up '{name}' failed: {e}")
+        finally:
+            status.duration_s = time.perf_counter() - start
+            logger.info(f"Warm-up '{name}' {status.state} in {status.duration_s:.2f}s")
+
+    def start(self) -> None:
+        """Start every warm-up that is not running or done yet. Safe to call per session."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Tasks from an earlier asyncio.run() can't be awaited on this loop
+            self._loop = loop
+            self.tasks.clear()
+        for name in self.warmups:
+            task = self.tasks.get(name)
+            if task is None or (task.done() and self.status[name].state == "failed"):
+                self.tasks[name] = loop.create_task(self._run(name), name=f"warmup-{name}")
+
+    async def ready(self, name: str) -> None:
+        task = self.tasks.get(name)
+        if task is None or task.get_loop() is not asyncio.get_running_loop():
+            return
+        await asyncio.shield(task)
+
+    async def wait_all(self, timeout: Optional[float] = None) -> dict[str, WarmupStatus]:
+        tasks = [t for t in self.tasks.values() if t.get_loop() is asyncio.get_running_loop()]
+        if tasks:
+            await asyncio.wait(tasks, timeout=timeout)
+        return self.status
+
+
+startup_orchestrator = StartupOrchestrator()
+
+
+async def warm_pydantic_ai():
+    # Importing pydantic_ai pulls in openai and httpx; do it off the event loop
+    await asyncio.to_thread(importlib.import_module, "pydantic_ai.models.openai")
+
+
+async def warm_agents():
+    from .email_agent import get_contact_lookup_agent, get_email_send_agent
+    from .llm import get_agent
+    from .utils import model_name_to_id
+
+    await startup_orchestrator.ready("pydantic_ai")
+    await asyncio.gather(*[get_agent(None, model_id) for model_id in model_name_to_id.values()])
+    get_email_send_agent()
+    get_contact_lookup_agent()
+
+
+async def warm_http_pool():
+    from .http_client import shared_http_client
+    from .llm import LLM_BACKEND
+
+    if LLM_BACKEND == "scripted":
+        return
+
+    # httpx is imported with pydantic_ai; then open the pooled connections to the API
+    await startup_orchestrator.ready("pydantic_ai")
+    await shared_http_client.warm()
+
+
+async def warm_google_credentials():
+    from .email_agent import get_fresh_credentials
+
+    await get_fresh_credentials()
+
+
+async def warm_dns():
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*[loop.getaddrinfo(host, 443) for host in WARM_HOSTS])
+
+
+async def warm_whisper():
+    from .whisper_speechtotext import whisper_registry
+
+    await whisper_registry.get_model()
+
+
+async def warm_wake_word():
+    from .whisper_speechtotext import whisper_registry
+
+    # The gate cannot open until its model is loaded, so never leave it for the first check
+    await whisper_registry.get_model(WAKE_WORD_MODEL)
+
+
+startup_orchestrator.register_warmup("pydantic_ai", warm_pydantic_ai)
+startup_orchestrator.register_warmup("agents", warm_agents)
+startup_orchestrator.register_warmup("http_pool", warm_http_pool)
+startup_orchestrator.register_warmup("google_credentials", warm_google_credentials)
+startup_orchestrator.register_warmup("dns", warm_dns)
+if WHISPER_PRELOAD:
+    startup_orchestrator.register_warmup("whisper", warm_whisper)
+if WAKE_WORD_ENABLED:
+    startup_orchestrator.register_warmup("wake_word", warm_wake_word)
+
+
+async def log_warmup_summary() -> None:
+    status = await startup_orchestrator.wait_all()
+    summary = ", ".join(
+        f"{s.name}={s.state}" + (f" ({s.duration_s:.2f}s)" if s.duration_s is not None else "")
+        for s in status.values()
+    )
+    log_info(f"Warm-up finished: {summary}", style="bold blue")
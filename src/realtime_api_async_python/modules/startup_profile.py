@@ -0,0 +1,113 @@
+import argparse
+import os
+import subprocess
+import sys
+import time
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+# Cold start budget for `import realtime_api_async_python.main`, checked by
+# tests/test_startup_time.py and `profile-imports --check`.
+STARTUP_TIME_BUDGET_S = float(os.getenv("STARTUP_TIME_BUDGET_S", "3.0"))
+STARTUP_MODULE = "realtime_api_async_python.main"
+
+# Only needed by rarely used tools; they must be imported on first use.
+HEAVY_MODULES = (
+    "torch",
+    "whisper",
+    "pandas",
+    "duckdb",
+    "psycopg2",
+    "matplotlib",
+    "PIL",
+    "firecrawl",
+    "googleapiclient",
+    "pydantic_ai",
+)
+
+
+class ImportTiming(BaseModel):
+    module: str
+    self_us: int = Field(description="Time spent importing the module itself, in microseconds")
+    cumulative_us: int = Field(description="Time including the module's own imports, in microseconds")
+
+
+class StartupProfile(BaseModel):
+    module: str
+    wall_time_s: float = Field(description="Wall time of the whole interpreter run")
+    imports: list[ImportTiming] = Field(default_factory=list)
+
+    def top(self, n: int = 25) -> list[ImportTiming]:
+        return sorted(self.imports, key=lambda t: t.cumulative_us, reverse=True)[:n]
+
+    def loaded(self, name: str) -> bool:
+        return any(t.module == name or t.module.startswith(name + ".") for t in self.imports)
+
+
+def parse_importtime(stderr: str) -> list[ImportTiming]:
+    """Parse the `-X importtime` report: `import time: self [us] | cumulative | imported package`."""
+    timings = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue  # header line
+        timings.append(
+            ImportTiming(
+                module=fields[2].strip(),
+                self_us=int(fields[0]),
+                cumulative_us=int(fields[1]),
+            )
+        )
+    return timings
+
+
+def profile_imports(
+    module: str = STARTUP_MODULE,
+    env: Optional[dict] = None,
+    cwd: Optional[str] = None,
+) -> StartupProfile:
+    """Import ``module`` in a fresh interpreter so nothing is already cached in sys.modules."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=cwd,
+    )
+    wall_time = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+    return StartupProfile(module=module, wall_time_s=wall_time, imports=parse_importtime(result.stderr))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Profile the cold start imports of the assistant.")
+    parser.add_argument("--module", default=STARTUP_MODULE, help="Module to import")
+    parser.add_argument("--top", type=int, default=25, help="Number of slowest imports to show")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help=f"Exit with status 1 if the import exceeds STARTUP_TIME_BUDGET_S ({STARTUP_TIME_BUDGET_S}s) "
+        "or loads a heavy dependency",
+    )
+    args = parser.parse_args()
+
+    profile = profile_imports(args.module)
+    print(f"{'cumulative ms':>14} {'self ms':>9}  module")
+    for timing in profile.top(args.top):
+        print(f"{timing.cumulative_us / 1000:>14.1f} {timing.self_us / 1000:>9.1f}  {timing.module}")
+    print(f"\nImported {args.module} in {profile.wall_time_s:.2f}s (budget {STARTUP_TIME_BUDGET_S:.2f}s)")
+
+    eager = [name for name in HEAVY_MODULES if profile.loaded(name)]
+    if eager:
+        print(f"Heavy modules loaded at import time: {', '.join(eager)}")
+    if args.check and (profile.wall_time_s > STARTUP_TIME_BUDGET_S or eager):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
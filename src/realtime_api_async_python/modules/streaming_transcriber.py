@@ -0,0 +1,183 @@
+import asyncio
+import os
+import re
+from typing import AsyncIterator, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger
+from .whisper_speechtotext import WhisperModelRegistry, pcm16_to_float, whisper_registry
+
+# Longest stretch of audio decoded at once; older audio is dropped at a segment boundary.
+STREAM_WINDOW_S = float(os.getenv("STREAM_WINDOW_S", "15"))
+# New audio needed before the window is decoded again.
+STREAM_STEP_S = float(os.getenv("STREAM_STEP_S", "1.0"))
+# No frames for this long ends the utterance (the mic stops sending when recording stops).
+STREAM_FINALIZE_AFTER_S = float(os.getenv("STREAM_FINALIZE_AFTER_S", "0.8"))
+# Context from the finished part of the utterance passed to Whisper as initial_prompt.
+PROMPT_CHARS = 200
+
+
+class TranscriptHypothesis(BaseModel):
+    text: str = Field(description="Committed text followed by the tentative tail")
+    committed: str = Field(description="Prefix that later decodes will not change")
+    is_final: bool = Field(default=False, description="The utterance ended; this is the last hypothesis for it")
+    audio_s: float = Field(default=0.0, description="Seconds of utterance audio covered")
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r"[^\w']", "", word.lower())
+
+
+def agreed_prefix(previous: list[str], current: list[str]) -> int:
+    """Number of leading words two consecutive decodes agree on, ignoring case and punctuation."""
+    count = 0
+    for a, b in zip(previous, current):
+        if _normalize(a) != _normalize(b):
+            break
+        count += 1
+    return count
+
+
+class StreamingTranscriber:
+    """
+    Transcribes microphone audio while the user is still talking.
+
+    Frames are tapped from the microphone as they are captured. Every
+    ``step_s`` of new audio the current window is decoded again, and words
+    that two consecutive decodes agree on are committed (local agreement), so
+    the committed prefix never changes. Once the window grows past
+    ``window_s`` the audio of fully committed segments is dropped.
+
+        async for hypothesis in StreamingTranscriber(mic).hypotheses():
+            print(hypothesis.committed, hypothesis.is_final)
+    """
+
+    def __init__(
+        self,
+        mic,
+        registry: WhisperModelRegistry = whisper_registry,
+        model_name: Optional[str] = None,
+        window_s: float = STREAM_WINDOW_S,
+        step_s: float = STREAM_STEP_S,
+        finalize_after_s: float = STREAM_FINALIZE_AFTER_S,
+    ):
+        self.mic = mic
+        self.registry = registry
+        self.model_name = model_name
+        self.sample_rate = mic.config.rate
+        self.window_s = window_s
+        self.step_s = step_s
+        self.finalize_after_s = finalize_after_s
+        self._frames: asyncio.Queue[Optional[bytes]] = asyncio.Queue()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self._buffer = bytearray()  # PCM16 audio not yet dropped from the window
+        self._dropped_s = 0.0  # utterance audio already dropped from the window
+        self._pending_s = 0.0  # audio received since the last decode
+        self._finished_words: list[str] = []  # words of audio dropped from the window
+        self._committed: list[str] = []  # committed words of the current window
+        self._previous: list[str] = []  # last hypothesis for the current window
+
+    @property
+    def _buffer_s(self) -> float:
+        return len(self._buffer) / 2 / self.sample_rate
+
+    def _on_frame(self, frame: bytes) -> None:
+        # Called on the capture thread for AsyncMicrophone
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._frames.put_nowait, bytes(frame))
+
+    def close(self) -> None:
+        """Finish the current utterance and end ``hypotheses()``."""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._frames.put_nowait, None)
+
+    async def _decode(self) -> dict:
+        audio = pcm16_to_float(bytes(self._buffer), self.sample_rate)
+        options = {"language": "en"}
+        if self._finished_words:
+            options["initial_prompt"] = " ".join(self._finished_words)[-PROMPT_CHARS:]
+        return await self.registry.transcribe(audio, self.model_name, **options)
+
+    def _hypothesis(self, tentative: list[str], is_final: bool = False) -> TranscriptHypothesis:
+        committed = self._finished_words + self._committed
+        return TranscriptHypothesis(
+            text=" ".join(committed + tentative),
+            committed=" ".join(committed),
+            is_final=is_final,
+            audio_s=self._dropped_s + self._buffer_s,
+        )
+
+    def _slide_window(self, result: dict) -> None:
+        """Drop audio from the front of the window once it is longer than window_s."""
+        if self._buffer_s <= self.window_s:
+            return
+        cut_s, cut_words, words_so_far = 0.0, 0, 0
+        for segment in result.get("segments", []):
+            words_so_far += len(segment.get("text", "").split())
+            # Only cut after segments whose words are all committed
+            if words_so_far > len(self._committed) or segment["end"] >= self._buffer_s:
+                break
+            cut_s, cut_words = segment["end"], words_so_far
+
+        if cut_words == 0:
+            # One long segment and nothing safe to cut at: finish what we have
+            logger.debug("Streaming window full without a segment boundary, committing the hypothesis")
+            self._finished_words += self._previous
+            cut_s, self._committed, self._previous = self._buffer_s, [], []
+        else:
+            self._finished_words += self._committed[:cut_words]
+            self._committed = self._committed[cut_words:]
+            self._previous = self._previous[cut_words:]
+
+        cut_bytes = min(len(self._buffer), int(cut_s * self.sample_rate) * 2)
+        del self._buffer[:cut_bytes]
+        self._dropped_s += cut_bytes / 2 / self.sample_rate
+
+    async def _step(self) -> TranscriptHypothesis:
+        result = await self._decode()
+        words = result.get("text", "").split()
+        agreed = agreed_prefix(self._previous, words)
+        # Append only; words already committed are never rewritten
+        self._committed += words[len(self._committed):agreed]
+        self._previous = words
+        hypothesis = self._hypothesis(words[len(self._committed):])
+        self._slide_window(result)
+        return hypothesis
+
+    async def _finalize(self) -> TranscriptHypothesis:
+        result = await self._decode()
+        words = result.get("text", "").split()
+        # Keep the committed prefix as emitted and take the rest from the last decode
+        self._committed += words[len(self._committed):]
+        hypothesis = self._hypothesis([], is_final=True)
+        self._reset()
+        return hypothesis
+
+    async def hypotheses(self) -> AsyncIterator[TranscriptHypothesis]:
+        """Yield partial hypotheses while audio arrives and a final one per utterance."""
+        self._loop = asyncio.get_running_loop()
+        self.mic.add_listener(self._on_frame)
+        try:
+            while True:
+                try:
+                    frame = await asyncio.wait_for(self._frames.get(), self.finalize_after_s)
+                except asyncio.TimeoutError:
+                    if self._buffer:
+                        yield await self._finalize()
+                    continue
+                if frame is None:
+                    break
+                self._buffer += frame
+                self._pending_s += len(frame) / 2 / self.sample_rate
+                if self._pending_s >= self.step_s:
+                    self._pending_s = 0.0
+                    yield await self._step()
+            if self._buffer:
+                yield await self._finalize()
+        finally:
+            self.mic.remove_listener(self._on_frame)
+            self._loop = None
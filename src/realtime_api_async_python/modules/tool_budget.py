@@ -0,0 +1,180 @@
+import argparse
+import copy
+import json
+import re
+from enum import IntEnum
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from .utils import estimate_tokens, TOOL_TOKEN_BUDGET
+
+# build_function_descriptor folds the return schema into the description after this marker
+RETURNS_MARKER = "\nReturns: "
+# get_pydantic_schema's placeholder for fields without a description
+FILLER_DESCRIPTION = re.compile(r"^Field '[^']*'$")
+
+
+class CompactLevel(IntEnum):
+    """How hard descriptors are squeezed; each level includes the ones before it."""
+
+    FULL = 0
+    COMPACT = 1  # no return schemas, no filler descriptions, repeated sub-schemas deduplicated
+    SHORT = 2  # descriptions cut to their first sentence
+    MINIMAL = 3  # no parameter descriptions at all
+
+
+class ToolTokens(BaseModel):
+    name: str
+    full_tokens: int = Field(description="Estimated tokens of the descriptor as generated")
+    tokens: int = Field(description="Estimated tokens after compaction")
+
+
+class ToolSetTokens(BaseModel):
+    level: CompactLevel
+    budget: int
+    tools: list[ToolTokens]
+
+    @property
+    def full_tokens(self) -> int:
+        return sum(t.full_tokens for t in self.tools)
+
+    @property
+    def tokens(self) -> int:
+        return sum(t.tokens for t in self.tools)
+
+
+def descriptor_tokens(descriptor: dict[str, Any]) -> int:
+    return estimate_tokens(json.dumps(descriptor))
+
+
+def _first_sentence(text: str) -> str:
+    match = re.match(r"(.+?[.!?])(\s|$)", text)
+    return match.group(1) if match else text
+
+
+def _compact_text(text: str, level: CompactLevel) -> str:
+    text = text.split(RETURNS_MARKER, 1)[0]
+    text = " ".join(text.split())
+    return _first_sentence(text) if level >= CompactLevel.SHORT else text
+
+
+def _compact_schema(schema: dict[str, Any], level: CompactLevel, keep_description: bool = True) -> dict[str, Any]:
+    compact = {}
+    for key, value in schema.items():
+        if key == "description":
+            if keep_description and level < CompactLevel.MINIMAL and not FILLER_DESCRIPTION.match(value):
+                compact[key] = _compact_text(value, level)
+        elif key == "properties":
+            compact[key] = {
+                name: _compact_schema(prop, level, keep_description) for name, prop in value.items()
+            }
+        elif key in ("items", "additionalProperties") and isinstance(value, dict):
+            compact[key] = _compact_schema(value, level, keep_description)
+        elif key == "anyOf":
+            compact[key] = [_compact_schema(option, level, keep_description) for option in value]
+        else:
+            compact[key] = value
+    return compact
+
+
+def compact_descriptors(descriptors: list[dict[str, Any]], level: CompactLevel) -> list[dict[str, Any]]:
+    """Return compacted copies of ``descriptors``; the input is left untouched."""
+    if level == CompactLevel.FULL:
+        return copy.deepcopy(descriptors)
+
+    seen_objects: dict[str, str] = {}
+    compacted = []
+    for descriptor in descriptors:
+        properties = {}
+        for name, schema in descriptor["parameters"]["properties"].items():
+            if schema.get("type") == "object" and schema.get("properties"):
+                # Models such as EmailRequest show up in several tools; describe their
+                # fields once and point back to the first tool that used them.
+                key = json.dumps({k: v for k, v in schema.items() if k != "description"}, sort_keys=True)
+                first_use = seen_objects.setdefault(key, f"{descriptor['name']}.{name}")
+                if first_use != f"{descriptor['name']}.{name}":
+                    compact = _compact_schema(schema, level, keep_description=False)
+                    compact["description"] = f"Same fields as {first_use}"
+                    properties[name] = compact
+                    continue
+            properties[name] = _compact_schema(schema, level)
+        compacted.append(
+            {
+                **descriptor,
+                "description": _compact_text(descriptor.get("description", ""), level),
+                "parameters": {**descriptor["parameters"], "properties": properties},
+            }
+        )
+    return compacted
+
+
+def fit_to_budget(
+    descriptors: list[dict[str, Any]],
+    budget: int = TOOL_TOKEN_BUDGET,
+    level: CompactLevel = CompactLevel.COMPACT,
+) -> tuple[list[dict[str, Any]], CompactLevel]:
+    """
+    Compact ``descriptors`` at ``level`` and keep stepping up the level until the
+    tool set fits ``budget`` tokens. A budget of 0 or less disables the check.
+
+    Raises:
+        ValueError: If the tool set is over budget even at CompactLevel.MINIMAL.
+    """
+    while True:
+        compacted = compact_descriptors(descriptors, level)
+        total = sum(descriptor_tokens(d) for d in compacted)
+        if budget <= 0 or total <= budget:
+            return compacted, level
+        if level == CompactLevel.MINIMAL:
+            raise ValueError(
+                f"Tool set needs ~{total} tokens even at minimal descriptors, over TOOL_TOKEN_BUDGET={budget}. "
+                "Enable fewer tool groups or raise the budget."
+            )
+        level = CompactLevel(level + 1)
+
+
+def token_report(
+    descriptors: list[dict[str, Any]],
+    budget: int = TOOL_TOKEN_BUDGET,
+    level: CompactLevel = CompactLevel.COMPACT,
+) -> ToolSetTokens:
+    compacted, level = fit_to_budget(descriptors, budget, level)
+    return ToolSetTokens(
+        level=level,
+        budget=budget,
+        tools=[
+            ToolTokens(name=full["name"], full_tokens=descriptor_tokens(full), tokens=descriptor_tokens(compact))
+            for full, compact in zip(descriptors, compacted)
+        ],
+    )
+
+
+def main(argv: Optional[list[str]] = None):
+    from .tools import registry
+
+    parser = argparse.ArgumentParser(description="Report the token cost of the tool descriptors.")
+    parser.add_argument("--groups", type=str, default="all", help="Comma separated tool groups")
+    parser.add_argument("--budget", type=int, default=TOOL_TOKEN_BUDGET, help="Token budget for the tool set")
+    parser.add_argument(
+        "--level",
+        type=str,
+        default="compact",
+        choices=[level.name.lower() for level in CompactLevel],
+        help="Starting compaction level",
+    )
+    args = parser.parse_args(argv)
+
+    descriptors = registry.full_descriptors(args.groups.split(","))
+    report = token_report(descriptors, args.budget, CompactLevel[args.level.upper()])
+    print(f"{'tool':<32} {'full':>6} {'compact':>8}")
+    for tool in sorted(report.tools, key=lambda t: t.full_tokens, reverse=True):
+        print(f"{tool.name:<32} {tool.full_tokens:>6} {tool.tokens:>8}")
+    print(
+        f"{'total':<32} {report.full_tokens:>6} {report.tokens:>8}  "
+        f"(level {report.level.name.lower()}, budget {report.budget})"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+import json
+from contextvars import ContextVar
+from enum import Enum
+from typing import Any, Callable, Iterable, Optional
+
+from pydantic import BaseModel, ConfigDict, Field
+
+from .descriptor_cache import load_tool_descriptors, DESCRIPTOR_CACHE_ENABLED
+from .logging import logger
+from .tool_budget import CompactLevel, compact_descriptors, fit_to_budget
+from .utils import TOOL_DESCRIPTOR_MODE, TOOL_TOKEN_BUDGET
+
+
+class ToolGroup(str, Enum):
+    """Tools are advertised to the model a group at a time. ``core`` is always on."""
+
+    core = "core"
+    files = "files"
+    sql = "sql"
+    email = "email"
+    memory = "memory"
+    diagrams = "diagrams"
+
+
+ALL_TOOL_GROUPS = frozenset(ToolGroup)
+
+
+class RegisteredTool(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    name: str
+    group: ToolGroup
+    func: Callable[..., Any]
+    advertised: bool = Field(
+        default=True, description="Sent to the model in session.update; unadvertised tools can still be called"
+    )
+
+
+def resolve_groups(groups: Optional[Iterable[str]]) -> frozenset[ToolGroup]:
+    """Turn group names (or ``all``) into ToolGroups, always including core. Unknown names are ignored."""
+    if groups is None:
+        return ALL_TOOL_GROUPS
+    resolved = {ToolGroup.core}
+    for name in groups:
+        if isinstance(name, ToolGroup):
+            resolved.add(name)
+            continue
+        name = str(name).strip().lower()
+        if name == "all":
+            return ALL_TOOL_GROUPS
+        try:
+            resolved.add(ToolGroup(name))
+        except ValueError:
+            logger.warning(f"Unknown tool group '{name}', ignoring it")
+    return frozenset(resolved)
+
+
+class ToolRegistry:
+    """
+    Tools register themselves with ``@tool(group)``. The registry derives the
+    function map used to dispatch calls and the descriptor payload for any
+    set of enabled groups.
+    """
+
+    def __init__(
+        self,
+        cache_enabled: bool = DESCRIPTOR_CACHE_ENABLED,
+        descriptor_mode: str = TOOL_DESCRIPTOR_MODE,
+        token_budget: int = TOOL_TOKEN_BUDGET,
+    ):
+        self.cache_enabled = cache_enabled
+        self.compact_level = CompactLevel.COMPACT if descriptor_mode == "compact" else CompactLevel.FULL
+        self.token_budget = token_budget
+        self._tools: dict[str, RegisteredTool] = {}
+        self._payloads: dict[frozenset[ToolGroup], tuple[list[dict[str, Any]], str]] = {}
+        self._descriptors: Optional[dict[str, dict[str, Any]]] = None
+
+    def register(self, func: Callable, group: ToolGroup = ToolGroup.core, advertised: bool = True) -> Callable:
+        self._tools[func.__name__] = RegisteredTool(
+            name=func.__name__, group=ToolGroup(group), func=func, advertised=advertised
+        )
+        # Descriptors are built on first use, so later registrations just invalidate them
+        self._descriptors = None
+        self._payloads.clear()
+        return func
+
+    def tool(self, group: ToolGroup = ToolGroup.core, advertised: bool = True) -> Callable[[Callable], Callable]:
+        def decorator(func: Callable) -> Callable:
+            return self.register(func, group, advertised)
+
+        return decorator
+
+    @property
+    def function_map(self) -> dict[str, Callable]:
+        return {name: registered.func for name, registered in self._tools.items()}
+
+    def tools_in(self, groups: Iterable[ToolGroup]) -> list[RegisteredTool]:
+        groups = set(groups)
+        return [t for t in self._tools.values() if t.advertised and t.group in groups]
+
+    def _all_descriptors(self) -> dict[str, dict[str, Any]]:
+        if self._descriptors is None:
+            functions = [t.func for t in self._tools.values() if t.advertised]
+            descriptors, _ = load_tool_descriptors(functions, enabled=self.cache_enabled)
+            self._descriptors = {descriptor["name"]: descriptor for descriptor in descriptors}
+        return self._descriptors
+
+    def full_descriptors(self, groups: Optional[Iterable[str]] = None) -> list[dict[str, Any]]:
+        """Descriptors for ``groups`` exactly as generated, before compaction."""
+        descriptors = self._all_descriptors()
+        return [descriptors[t.name] for t in self.tools_in(resolve_groups(groups))]
+
+    def payload(self, groups: Optional[Iterable[str]] = None) -> tuple[list[dict[str, Any]], str]:
+        """
+        Return the tools array for ``groups``, compacted to fit the token budget,
+        and the same array serialized as JSON. A tool set that is over budget
+        even at minimal descriptors is sent minimal with a warning rather than
+        failing the import or the session.
+        """
+        groups = resolve_groups(groups)
+        if groups not in self._payloads:
+            descriptors = self.full_descriptors(groups)
+            try:
+                tools, level = fit_to_budget(descriptors, self.token_budget, self.compact_level)
+            except ValueError as e:
+                logger.warning(f"⚠️ {e}")
+                tools, level = compact_descriptors(descriptors, CompactLevel.MINIMAL), CompactLevel.MINIMAL
+            if level > self.compact_level:
+                logger.info(f"Tool descriptors compacted to level '{level.name.lower()}' to fit the token budget")
+            self._payloads[groups] = (tools, json.dumps(tools))
+        return self._payloads[groups]
+
+
+registry = ToolRegistry()
+tool = registry.tool
+
+
+class ToolSession:
+    """The tool groups enabled for one realtime session."""
+
+    def __init__(
+        self,
+        groups: Optional[Iterable[str]] = None,
+        on_change: Optional[Callable[[frozenset[ToolGroup]], None]] = None,
+    ):
+        self.groups = resolve_groups(groups)
+        self.on_change = on_change
+
+    def switch(self, enable: Iterable[str] = (), disable: Iterable[str] = ()) -> frozenset[ToolGroup]:
+        enabled = {g for g in resolve_groups(enable) if g is not ToolGroup.core}
+        disabled = {g for g in resolve_groups(disable) if g is not ToolGroup.core} if disable else set()
+        groups = frozenset((self.groups | enabled) - disabled)
+        if groups != self.groups:
+            self.groups = groups
+            logger.info(f"🧰 Tool groups now: {', '.join(sorted(g.value for g in groups))}")
+            if self.on_change:
+                self.on_change(groups)
+        return self.groups
+
+
+# Set per session so a tool call can reach the session that made it, even when
+# several sessions share a process (gateway workers, batch runs).
+active_tool_session: ContextVar[Optional[ToolSession]] = ContextVar("active_tool_session", default=None)
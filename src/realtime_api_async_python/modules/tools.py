@@ -6,17 +6,24 @@ import json
 import random
 import logging
 import subprocess
+import time
 import pyperclip
-import pandas as pd
 from pydantic import BaseModel
-from typing import Any, Dict, Tuple, List, Optional
+from typing import Annotated, Any, AsyncIterator, Dict, Tuple, List, Optional
 from datetime import datetime
 from concurrent.futures import ThreadPoolExecutor
 from enum import Enum
 
-from realtime_api_async_python.modules.gen_descriptor import build_function_descriptor
-from .llm import parse_markdown_backticks, structured_output_prompt, chat_prompt
+from .tool_registry import registry, tool, ToolGroup, active_tool_session
+from .llm import (
+    MarkdownFenceStripper,
+    structured_output_prompt,
+    chat_prompt,
+    stream_chat_prompt,
+    stream_structured_output_prompt,
+)
 from .memory_management import memory_manager
+from .prompt_templates import PromptTemplate
 from .logging import log_info
 from .utils import (
     timeit_decorator,
@@ -32,7 +39,14 @@ from .database import get_database_instance
 import re
 from .email_agent import  find_contact_information, send_email_to_recipient
 
+# File and key selections embed the current listing in their prompt, so a changed
+# directory is a new cache key anyway; the shorter TTL covers edits to file contents.
+SELECTION_CACHE_TTL_S = 600
+# Selections block the spoken reply; with LLM_HEDGE_ENABLED a slow one is duplicated on this tier
+SELECTION_HEDGE_MODEL = model_name_to_id[ModelName(os.getenv("LLM_HEDGE_MODEL_NAME", ModelName.fast_model.value))]
+
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def ingest_memory() -> dict:
     """
@@ -47,6 +61,7 @@ async def ingest_memory() -> dict:
     }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def ingest_file(prompt: str) -> dict:
     """
@@ -78,6 +93,8 @@ async def ingest_file(prompt: str) -> dict:
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -114,6 +131,7 @@ async def ingest_file(prompt: str) -> dict:
     }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def add_to_memory(key: str, value: Any) -> dict:
     """
@@ -132,6 +150,7 @@ async def add_to_memory(key: str, value: Any) -> dict:
         }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def reset_active_memory(force_delete: bool = False) -> dict:
     """
@@ -160,8 +179,9 @@ class WebUrl(BaseModel):
 
 
 class CreateFileResponse(BaseModel):
-    file_content: str
+    # file_name first: the content is streamed into the file before the response is complete
     file_name: str
+    file_content: str
 
 
 class FileSelectionResponse(BaseModel):
@@ -210,16 +230,55 @@ class PythonChartResponse(BaseModel):
     executable_python: str
 
 
+async def write_streamed_file(file_path: str, chunks: AsyncIterator[str]) -> str:
+    """
+    Write streamed model output to ``file_path`` as it arrives, without any
+    markdown fence. The text goes to ``<file_path>.partial`` first and replaces
+    the file once the stream ends, so a failed generation never leaves a
+    truncated file behind. Returns the text written.
+    """
+    fence = MarkdownFenceStripper()
+    partial_path = f"{file_path}.partial"
+    name = os.path.basename(file_path)
+    start = time.perf_counter()
+    written = []
+    try:
+        with open(partial_path, "w") as f:
+            async for chunk in chunks:
+                text = fence.feed(chunk)
+                if not text:
+                    continue
+                if not written:
+                    log_info(f"✍️ Writing {name}, first bytes after {time.perf_counter() - start:.2f}s", style="bold cyan")
+                f.write(text)
+                f.flush()
+                written.append(text)
+            tail = fence.finish()
+            f.write(tail)
+            written.append(tail)
+        os.replace(partial_path, file_path)
+    except BaseException:
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+        raise
+    content = "".join(written)
+    log_info(f"✍️ Wrote {len(content)} characters to {name} in {time.perf_counter() - start:.2f}s", style="bold cyan")
+    return content
+
+
+@tool(ToolGroup.core)
 @timeit_decorator
 async def get_current_time():
     return {"current_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")}
 
 
+@tool(ToolGroup.core)
 @timeit_decorator
 async def get_random_number():
     return {"random_number": random.randint(1, 100)}
 
 
+@tool(ToolGroup.core)
 @timeit_decorator
 async def open_browser(prompt: str):
     """
@@ -273,6 +332,27 @@ async def open_browser(prompt: str):
         return {"status": "No URL found"}
 
 
+CREATE_FILE_PROMPT = PromptTemplate(
+    "create_file",
+    """
+<purpose>
+    Generate content for a new file based on the user's prompt, the file name, and the current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, the file name, and the current memory content, generate content for a new file.</instruction>
+    <instruction>The file name is the name of the file that the user wants to create.</instruction>
+    <instruction>The user's prompt is the prompt that the user wants to use to generate the content for the new file.</instruction>
+    <instruction>Consider the current memory content when generating the file content, if relevant.</instruction>
+    <instruction>If code generation was requested, be sure to output runnable code, don't include any markdown formatting.</instruction>
+</instructions>
+""",
+    memory=True,
+    user=("file-name", "user-prompt"),
+)
+
+
+@tool(ToolGroup.files)
 @timeit_decorator
 async def create_file(file_name: str, prompt: str) -> dict:
     """
@@ -294,40 +374,50 @@ async def create_file(file_name: str, prompt: str) -> dict:
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
     # Build the structured prompt
-    prompt_structure = f"""
-<purpose>
-    Generate content for a new file based on the user's prompt, the file name, and the current memory content.
-</purpose>
+    prompt_structure = CREATE_FILE_PROMPT.render(
+        memory=memory_content, file_name=file_name, user_prompt=prompt
+    )
 
-<instructions>
-    <instruction>Based on the user's prompt, the file name, and the current memory content, generate content for a new file.</instruction>
-    <instruction>The file name is the name of the file that the user wants to create.</instruction>
-    <instruction>The user's prompt is the prompt that the user wants to use to generate the content for the new file.</instruction>
-    <instruction>Consider the current memory content when generating the file content, if relevant.</instruction>
-    <instruction>If code generation was requested, be sure to output runnable code, don't include any markdown formatting.</instruction>
-</instructions>
+    # Stream the generated content into the file as the LLM writes it
+    response: Optional[CreateFileResponse] = None
 
-<user-prompt>
-    {prompt}
-</user-prompt>
+    async def file_content() -> AsyncIterator[str]:
+        nonlocal response
+        sent = 0
+        async for response in stream_structured_output_prompt(prompt_structure, CreateFileResponse):
+            yield response.file_content[sent:]
+            sent = len(response.file_content)
 
-<file-name>
-    {file_name}
-</file-name>
+    await write_streamed_file(file_path, file_content())
 
-{memory_content}
-    """
+    return {"status": "file created", "file_name": response.file_name}
 
-    # Call the LLM to generate the file content
-    response = await structured_output_prompt(prompt_structure, CreateFileResponse)
 
-    # Write the generated content to the file
-    with open(file_path, "w") as f:
-        f.write(parse_markdown_backticks(response.file_content))
+UPDATE_FILE_PROMPT = PromptTemplate(
+    "update_file",
+    """
+<purpose>
+    Update the content of the file based on the user's prompt, the current file content, and the current memory content.
+</purpose>
 
-    return {"status": "file created", "file_name": response.file_name}
+<instructions>
+    <instruction>Based on the user's prompt, the current file content, and the current memory content, generate the updated content for the file.</instruction>
+    <instruction>The file-name is the name of the file to update.</instruction>
+    <instruction>The user's prompt describes the updates to make.</instruction>
+    <instruction>Consider the current memory content when generating the file updates, if relevant.</instruction>
+    <instruction>Respond exclusively with the updates to the file and nothing else; they will be used to overwrite the file entirely using f.write().</instruction>
+    <instruction>Do not include any preamble or commentary or markdown formatting, just the raw updates.</instruction>
+    <instruction>Be precise and accurate.</instruction>
+    <instruction>If code generation was requested, be sure to output runnable code, don't include any markdown formatting.</instruction>
+</instructions>
+""",
+    memory=True,
+    # The file changes with every update, so it follows memory
+    user=("file-name", "file-content", "user-prompt"),
+)
 
 
+@tool(ToolGroup.files)
 @timeit_decorator
 async def update_file(prompt: str, model: ModelName = ModelName.base_model) -> dict:
     """
@@ -367,6 +457,8 @@ async def update_file(prompt: str, model: ModelName = ModelName.base_model) -> d
         select_file_prompt,
         FileSelectionResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     # Check if a file was selected
@@ -384,43 +476,12 @@ async def update_file(prompt: str, model: ModelName = ModelName.base_model) -> d
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
     # Build the structured prompt to generate the updates
-    update_file_prompt = f"""
-<purpose>
-    Update the content of the file based on the user's prompt, the current file content, and the current memory content.
-</purpose>
-
-<instructions>
-    <instruction>Based on the user's prompt, the current file content, and the current memory content, generate the updated content for the file.</instruction>
-    <instruction>The file-name is the name of the file to update.</instruction>
-    <instruction>The user's prompt describes the updates to make.</instruction>
-    <instruction>Consider the current memory content when generating the file updates, if relevant.</instruction>
-    <instruction>Respond exclusively with the updates to the file and nothing else; they will be used to overwrite the file entirely using f.write().</instruction>
-    <instruction>Do not include any preamble or commentary or markdown formatting, just the raw updates.</instruction>
-    <instruction>Be precise and accurate.</instruction>
-    <instruction>If code generation was requested, be sure to output runnable code, don't include any markdown formatting.</instruction>
-</instructions>
-
-<file-name>
-    {selected_file}
-</file-name>
-
-<file-content>
-    {file_content}
-</file-content>
-
-{memory_content}
-
-<user-prompt>
-    {prompt}
-</user-prompt>
-"""
-
-    # Call the LLM to generate the updates using the specified model
-    file_update_response = chat_prompt(update_file_prompt, model_name_to_id[model])
+    update_file_prompt = UPDATE_FILE_PROMPT.render(
+        memory=memory_content, file_name=selected_file, file_content=file_content, user_prompt=prompt
+    )
 
-    # Apply the updates by writing the new content to the file
-    with open(file_path, "w") as f:
-        f.write(parse_markdown_backticks(file_update_response))
+    # Stream the updates from the specified model over the file as they arrive
+    await write_streamed_file(file_path, stream_chat_prompt(update_file_prompt, model_name_to_id[model]))
 
     return {
         "status": "File updated",
@@ -429,6 +490,7 @@ async def update_file(prompt: str, model: ModelName = ModelName.base_model) -> d
     }
 
 
+@tool(ToolGroup.sql)
 @timeit_decorator
 async def load_tables_into_memory() -> dict:
     # Step 1: Load sql_dialect from personalization.json
@@ -473,6 +535,29 @@ async def load_tables_into_memory() -> dict:
     }
 
 
+GENERATE_SQL_FILE_PROMPT = PromptTemplate(
+    "generate_sql_save_to_file",
+    """
+<purpose>
+    Generate an SQL query and a suitable file name based on the user's prompt, available table definitions, and current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided table definitions.</instruction>
+    <instruction>Determine a clear and descriptive file name for saving the SQL query.</instruction>
+    <instruction>Respond only with the required fields: 'file_name' and 'sql_query'.</instruction>
+    <instruction>Ensure the file_name ends with '.sql'.</instruction>
+    <instruction>Consider the current memory content when generating the SQL query, if relevant.</instruction>
+    <instruction>Ensure the SQL query is compatible with the specified sql_dialect.</instruction>
+</instructions>
+""",
+    schema=("table_definitions", "sql_dialect"),
+    memory=True,
+    user=("user_prompt",),
+)
+
+
+@tool(ToolGroup.sql)
 @timeit_decorator
 async def generate_sql_save_to_file(prompt: str) -> dict:
     # Step 1: Load sql_dialect from personalization.json
@@ -522,34 +607,12 @@ async def generate_sql_save_to_file(prompt: str) -> dict:
     # Get all memory content
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
-    prompt_structure = f"""
-<purpose>
-    Generate an SQL query and a suitable file name based on the user's prompt, available table definitions, and current memory content.
-</purpose>
-
-<instructions>
-    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided table definitions.</instruction>
-    <instruction>Determine a clear and descriptive file name for saving the SQL query.</instruction>
-    <instruction>Respond only with the required fields: 'file_name' and 'sql_query'.</instruction>
-    <instruction>Ensure the file_name ends with '.sql'.</instruction>
-    <instruction>Consider the current memory content when generating the SQL query, if relevant.</instruction>
-    <instruction>Ensure the SQL query is compatible with the specified sql_dialect.</instruction>
-</instructions>
-
-<table_definitions>
-{table_definitions}
-</table_definitions>
-
-<sql_dialect>
-{sql_dialect}
-</sql_dialect>
-
-{memory_content}
-
-<user_prompt>
-{prompt}
-</user_prompt>
-    """
+    prompt_structure = GENERATE_SQL_FILE_PROMPT.render(
+        table_definitions=table_definitions,
+        sql_dialect=sql_dialect,
+        memory=memory_content,
+        user_prompt=prompt,
+    )
 
     response =await  structured_output_prompt(prompt_structure, GenerateSQLResponse)
 
@@ -582,6 +645,29 @@ class GenerateSQLResponse(BaseModel):
     output_format: OutputFormat
 
 
+GENERATE_SQL_AND_EXECUTE_PROMPT = PromptTemplate(
+    "generate_sql_and_execute",
+    """
+<purpose>
+    Generate an SQL query, output format, and a suitable file name based on the user's prompt, available table definitions, and current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided table definitions.</instruction>
+    <instruction>Determine whether to output the results in '.csv', '.jsonl' (JSON Lines), or '.json' (JSON array) format.</instruction>
+    <instruction>Decide on a clear and descriptive file name for saving the query results, ensuring the file extension matches the output format.</instruction>
+    <instruction>Respond only with the required fields: 'file_name', 'sql_query', and 'output_format'.</instruction>
+    <instruction>Consider the current memory content when generating the SQL query, if relevant.</instruction>
+    <instruction>Ensure the SQL query is compatible with the specified sql_dialect.</instruction>
+</instructions>
+""",
+    schema=("table_definitions", "sql_dialect"),
+    memory=True,
+    user=("user_prompt",),
+)
+
+
+@tool(ToolGroup.sql, advertised=False)
 @timeit_decorator
 async def generate_sql_and_execute(prompt: str) -> dict:
     """
@@ -623,34 +709,12 @@ async def generate_sql_and_execute(prompt: str) -> dict:
     # Get all memory content
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
-    prompt_structure = f"""
-<purpose>
-    Generate an SQL query, output format, and a suitable file name based on the user's prompt, available table definitions, and current memory content.
-</purpose>
-
-<instructions>
-    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided table definitions.</instruction>
-    <instruction>Determine whether to output the results in '.csv', '.jsonl' (JSON Lines), or '.json' (JSON array) format.</instruction>
-    <instruction>Decide on a clear and descriptive file name for saving the query results, ensuring the file extension matches the output format.</instruction>
-    <instruction>Respond only with the required fields: 'file_name', 'sql_query', and 'output_format'.</instruction>
-    <instruction>Consider the current memory content when generating the SQL query, if relevant.</instruction>
-    <instruction>Ensure the SQL query is compatible with the specified sql_dialect.</instruction>
-</instructions>
-
-<table_definitions>
-{table_definitions}
-</table_definitions>
-
-<sql_dialect>
-{sql_dialect}
-</sql_dialect>
-
-{memory_content}
-
-<user_prompt>
-{prompt}
-</user_prompt>
-    """
+    prompt_structure = GENERATE_SQL_AND_EXECUTE_PROMPT.render(
+        table_definitions=table_definitions,
+        sql_dialect=sql_dialect,
+        memory=memory_content,
+        user_prompt=prompt,
+    )
 
     response = await structured_output_prompt(prompt_structure, GenerateSQLResponse)
 
@@ -686,6 +750,7 @@ async def generate_sql_and_execute(prompt: str) -> dict:
     }
 
 
+@tool(ToolGroup.core)
 @timeit_decorator
 async def shutdown() -> dict:
     """
@@ -694,6 +759,7 @@ async def shutdown() -> dict:
     print("Shutting down the program gracefully...")
     sys.exit(0)  # Exit with code 0 indicating successful termination
 
+@tool(ToolGroup.sql)
 async def run_sql_file(prompt: str) -> dict:
     """
     Executes an SQL file based on the user's prompt and saves the results to a file in the specified format.
@@ -724,6 +790,8 @@ async def run_sql_file(prompt: str) -> dict:
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -804,6 +872,8 @@ async def run_sql_file(prompt: str) -> dict:
         output_format_prompt,
         OutputFormatResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     # Step 9: Save the results to a file based on the output_format
@@ -833,6 +903,7 @@ async def run_sql_file(prompt: str) -> dict:
     }
 
 
+@tool(ToolGroup.files)
 @timeit_decorator
 async def delete_file(prompt: str, force_delete: bool = False) -> dict:
     """
@@ -869,7 +940,7 @@ async def delete_file(prompt: str, force_delete: bool = False) -> dict:
 
     # Call the LLM to select the file and determine 'force_delete'
     file_delete_response = await structured_output_prompt(
-        select_file_prompt, FileDeleteResponse
+        select_file_prompt, FileDeleteResponse, use_cache=False
     )
 
     # Check if a file was selected
@@ -897,6 +968,27 @@ async def delete_file(prompt: str, force_delete: bool = False) -> dict:
     return result
 
 
+DISCUSS_FILE_PROMPT = PromptTemplate(
+    "discuss_file",
+    """
+<purpose>
+    Discuss the content of the file based on the user's prompt and the current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, the file content, and the current memory content, provide a relevant discussion or analysis.</instruction>
+    <instruction>Be concise and focus on the aspects mentioned in the user's prompt.</instruction>
+    <instruction>Consider the current memory content when discussing the file, if relevant.</instruction>
+    <instruction>Keep responses short and concise. Keep response under 3 sentences for concise conversations.</instruction>
+</instructions>
+""",
+    # Follow-up questions about the same file share everything up to the user's prompt
+    schema=("file-content",),
+    memory=True,
+)
+
+
+@tool(ToolGroup.files)
 @timeit_decorator
 async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) -> dict:
     """
@@ -939,6 +1031,8 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
             select_file_prompt,
             FileReadResponse,
             llm_model=model_name_to_id[ModelName.fast_model],
+            cache_ttl=SELECTION_CACHE_TTL_S,
+            hedge_model=SELECTION_HEDGE_MODEL,
         )
 
         if not file_selection_response.file:
@@ -954,31 +1048,12 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
     # Build the structured prompt to discuss the file content
-    discuss_file_prompt = f"""
-<purpose>
-    Discuss the content of the file based on the user's prompt and the current memory content.
-</purpose>
-
-<instructions>
-    <instruction>Based on the user's prompt, the file content, and the current memory content, provide a relevant discussion or analysis.</instruction>
-    <instruction>Be concise and focus on the aspects mentioned in the user's prompt.</instruction>
-    <instruction>Consider the current memory content when discussing the file, if relevant.</instruction>
-    <instruction>Keep responses short and concise. Keep response under 3 sentences for concise conversations.</instruction>
-</instructions>
-
-<file-content>
-{file_content}
-</file-content>
-
-{memory_content}
-
-<user-prompt>
-{prompt}
-</user-prompt>
-    """
+    discuss_file_prompt = DISCUSS_FILE_PROMPT.render(
+        file_content=file_content, memory=memory_content, user_prompt=prompt
+    )
 
     # Call the LLM to discuss the file content
-    discussion = chat_prompt(discuss_file_prompt, model_name_to_id[model])
+    discussion = await chat_prompt(discuss_file_prompt, model_name_to_id[model])
 
     return {
         "status": "File discussed",
@@ -987,6 +1062,7 @@ async def discuss_file(prompt: str, model: ModelName = ModelName.base_model) ->
     }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def clipboard_to_memory(key: Optional[str] = None) -> dict:
     """
@@ -1010,6 +1086,7 @@ async def clipboard_to_memory(key: Optional[str] = None) -> dict:
         }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def remove_variable_from_memory(prompt: str) -> dict:
     """
@@ -1038,7 +1115,7 @@ async def remove_variable_from_memory(prompt: str) -> dict:
     """
 
     key_selection_response = await structured_output_prompt(
-        select_key_prompt, MemoryKeyResponse
+        select_key_prompt, MemoryKeyResponse, cache_ttl=SELECTION_CACHE_TTL_S, hedge_model=SELECTION_HEDGE_MODEL
     )
 
     logging.info(f"Key selection response: {key_selection_response}")
@@ -1058,6 +1135,7 @@ async def remove_variable_from_memory(prompt: str) -> dict:
         }
 
 
+@tool(ToolGroup.memory)
 @timeit_decorator
 async def read_file_into_memory(prompt: str) -> dict:
     """
@@ -1092,6 +1170,8 @@ async def read_file_into_memory(prompt: str) -> dict:
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -1121,6 +1201,7 @@ async def read_file_into_memory(prompt: str) -> dict:
         }
 
 
+@tool(ToolGroup.memory)
 async def read_dir_into_memory() -> dict:
     """
     Read all files from the scratch_pad_dir and save their content into memory.
@@ -1148,6 +1229,7 @@ async def read_dir_into_memory() -> dict:
         }
 
 
+@tool(ToolGroup.core)
 @timeit_decorator
 async def scrap_to_file_from_clipboard() -> dict:
     """
@@ -1208,6 +1290,7 @@ async def scrap_to_file_from_clipboard() -> dict:
         }
 
 
+@tool(ToolGroup.files)
 @timeit_decorator
 async def clipboard_to_file() -> dict:
     """
@@ -1267,6 +1350,45 @@ async def clipboard_to_file() -> dict:
         }
 
 
+CHECK_RUNNABLE_PROMPT = PromptTemplate(
+    "check_runnable",
+    """
+<purpose>
+    Determine if the following code is runnable.
+</purpose>
+
+<instructions>
+    <instruction>Analyze the code and determine if it can be executed without errors.</instruction>
+    <instruction>Respond with a boolean value indicating the result.</instruction>
+    <instruction>Consider the current memory content when analyzing the code.</instruction>
+</instructions>
+""",
+    schema=("code-content",),
+    memory=True,
+    user=(),
+)
+
+MAKE_RUNNABLE_PROMPT = PromptTemplate(
+    "make_runnable",
+    """
+<purpose>
+    Provide the necessary changes to make the following code runnable.
+</purpose>
+
+<instructions>
+    <instruction>Analyze the code and list the changes required to make it executable without errors.</instruction>
+    <instruction>Provide a list of change descriptions and the full updated code.</instruction>
+    <instruction>Do not include any additional commentary.</instruction>
+    <instruction>Consider the current memory content when applying changes.</instruction>
+</instructions>
+""",
+    schema=("code-content",),
+    memory=True,
+    user=(),
+)
+
+
+@tool(ToolGroup.files)
 @timeit_decorator
 async def runnable_code_check(prompt: str) -> dict:
     """
@@ -1299,6 +1421,8 @@ async def runnable_code_check(prompt: str) -> dict:
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -1319,23 +1443,7 @@ async def runnable_code_check(prompt: str) -> dict:
         return {"status": "Error", "message": f"Failed to read the file: {str(e)}"}
 
     # Step 2: Determine if the code is runnable
-    check_runnable_prompt = f"""
-<purpose>
-    Determine if the following code is runnable.
-</purpose>
-
-<instructions>
-    <instruction>Analyze the code and determine if it can be executed without errors.</instruction>
-    <instruction>Respond with a boolean value indicating the result.</instruction>
-    <instruction>Consider the current memory content when analyzing the code.</instruction>
-</instructions>
-
-<code-content>
-{code_content}
-</code-content>
-
-{memory_content}
-"""
+    check_runnable_prompt = CHECK_RUNNABLE_PROMPT.render(code_content=code_content, memory=memory_content)
 
     is_runnable_response = await structured_output_prompt(check_runnable_prompt, IsRunnable)
 
@@ -1343,27 +1451,10 @@ async def runnable_code_check(prompt: str) -> dict:
         return {"status": "success", "message": "The code is runnable."}
 
     # Step 3: If not runnable, get the necessary changes
-    make_runnable_prompt = f"""
-<purpose>
-    Provide the necessary changes to make the following code runnable.
-</purpose>
-
-<instructions>
-    <instruction>Analyze the code and list the changes required to make it executable without errors.</instruction>
-    <instruction>Provide a list of change descriptions and the full updated code.</instruction>
-    <instruction>Do not include any additional commentary.</instruction>
-    <instruction>Consider the current memory content when applying changes.</instruction>
-</instructions>
-
-<code-content>
-{code_content}
-</code-content>
-
-{memory_content}
-"""
+    make_runnable_prompt = MAKE_RUNNABLE_PROMPT.render(code_content=code_content, memory=memory_content)
 
     make_runnable_response = await structured_output_prompt(
-        make_runnable_prompt, MakeCodeRunnableResponse
+        make_runnable_prompt, MakeCodeRunnableResponse, use_cache=False
     )
 
     # Write the updated code to the file
@@ -1381,17 +1472,9 @@ async def runnable_code_check(prompt: str) -> dict:
     }
 
 
-@timeit_decorator
-async def run_python(prompt: str) -> dict:
-    """
-    Executes a Python script from the scratch_pad_dir based on the user's prompt.
-    Returns the output and a success or failure status.
+RUN_PYTHON_SELECT_PROMPT = PromptTemplate(
+    "run_python_select",
     """
-    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
-    memory_content = memory_manager.get_xml_for_prompt(["*"])
-
-    # Step 1: Select the file based on the prompt
-    select_file_prompt = f"""
 <purpose>
     Select a Python file to execute based on the user's prompt.
 </purpose>
@@ -1400,24 +1483,36 @@ async def run_python(prompt: str) -> dict:
     <instruction>Based on the user's prompt and the list of available Python files, infer which file the user wants to execute.</instruction>
     <instruction>If no file matches, return an empty string for 'file'.</instruction>
 </instructions>
+""",
+    schema=("available-files",),
+    memory=True,
+    memory_tag="memory-content",
+)
 
-<available-files>
-    {", ".join([f for f in os.listdir(scratch_pad_dir) if f.endswith('.py')])}
-</available-files>
-
-<memory-content>
-    {memory_content}
-</memory-content>
 
-<user-prompt>
-    {prompt}
-</user-prompt>
+@tool(ToolGroup.files)
+@timeit_decorator
+async def run_python(prompt: str) -> dict:
+    """
+    Executes a Python script from the scratch_pad_dir based on the user's prompt.
+    Returns the output and a success or failure status.
     """
+    scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
+    memory_content = memory_manager.get_xml_for_prompt(["*"])
+
+    # Step 1: Select the file based on the prompt
+    select_file_prompt = RUN_PYTHON_SELECT_PROMPT.render(
+        available_files=", ".join([f for f in os.listdir(scratch_pad_dir) if f.endswith('.py')]),
+        memory=memory_content,
+        user_prompt=prompt,
+    )
 
     file_selection_response = await structured_output_prompt(
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -1466,6 +1561,33 @@ async def run_python(prompt: str) -> dict:
     }
 
 
+PYTHON_CHART_PROMPT = PromptTemplate(
+    "create_python_chart",
+    """
+<purpose>
+    Generate Python code using matplotlib to create a chart of the requested chart-type based on the user's prompt, the selected CSV file, and the memory content.
+</purpose>
+
+<instructions>
+    <instruction>Use pandas to read the CSV file located at the csv-path.</instruction>
+    <instruction>Generate the Python code to create a chart of the chart-type according to the user's prompt.</instruction>
+    <instruction>The code should be complete and runnable, starting with necessary imports.</instruction>
+    <instruction>Do not include any additional commentary or markdown formatting.</instruction>
+    <instruction>Base the code off the CSV file content provided in the preview and info sections.</instruction>
+    <instruction>Consider the columns, data types, and statistics when creating the chart.</instruction>
+    <instruction>Ensure the chart is properly labeled and formatted for clarity.</instruction>
+    <instruction>Do not wrap in backticks or triple quotes. We're going to execute this code immediately so it must be executable python code.</instruction>
+    <instruction>Your code should save an image back into the scratchpad directory.</instruction>
+    <instruction>After you save the image print out the file path so we can find it.</instruction>
+</instructions>
+""",
+    schema=("csv-path", "csv-preview", "csv-info"),
+    memory=True,
+    user=("chart-type", "user-prompt"),
+)
+
+
+@tool(ToolGroup.diagrams)
 @timeit_decorator
 async def create_python_chart(prompt: str, chart_type: str) -> dict:
     scratch_pad_dir = os.getenv("SCRATCH_PAD_DIR", "./scratchpad")
@@ -1504,6 +1626,8 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
         select_file_prompt,
         FileReadResponse,
         llm_model=model_name_to_id[ModelName.fast_model],
+        cache_ttl=SELECTION_CACHE_TTL_S,
+        hedge_model=SELECTION_HEDGE_MODEL,
     )
 
     if not file_selection_response.file:
@@ -1521,6 +1645,8 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
         }
 
     # Step 2: Read and analyze the CSV file
+    import pandas as pd
+
     try:
         df = pd.read_csv(file_path)
         csv_preview = df.head(10).to_string(index=False)
@@ -1534,54 +1660,25 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
     # Step 3: Generate Python code for the chart
     memory_content = memory_manager.get_xml_for_prompt(["*"])
 
-    code_generation_prompt = f"""
-<purpose>
-    Generate Python code using matplotlib to create a {chart_type} chart based on the user's prompt, the selected CSV file, and the memory content.
-</purpose>
-
-<instructions>
-    <instruction>Use pandas to read the CSV file located at '{file_path}'.</instruction>
-    <instruction>Generate the Python code to create a {chart_type} chart according to the user's prompt.</instruction>
-    <instruction>The code should be complete and runnable, starting with necessary imports.</instruction>
-    <instruction>Do not include any additional commentary or markdown formatting.</instruction>
-    <instruction>Base the code off the CSV file content provided in the preview and info sections.</instruction>
-    <instruction>Consider the columns, data types, and statistics when creating the chart.</instruction>
-    <instruction>Ensure the chart is properly labeled and formatted for clarity.</instruction>
-    <instruction>Do not wrap in backticks or triple quotes. We're going to execute this code immediately so it must be executable python code.</instruction>
-    <instruction>Your code should save an image back into the scratchpad directory.</instruction>
-    <instruction>After you save the image print out the file path so we can find it.</instruction>
-</instructions>
-
-<csv-preview>
-{csv_preview}
-</csv-preview>
-
-<csv-info>
-{csv_info}
-</csv-info>
-
-<user-prompt>
-    {prompt}
-</user-prompt>
-
-{memory_content}
-    """
-
-    # Call the LLM to generate the Python code
-    response = await chat_prompt(
-        code_generation_prompt, model_name_to_id[ModelName.reasoning_model]
+    code_generation_prompt = PYTHON_CHART_PROMPT.render(
+        csv_path=file_path,
+        csv_preview=csv_preview,
+        csv_info=csv_info,
+        memory=memory_content,
+        chart_type=chart_type,
+        user_prompt=prompt,
     )
 
-    response = parse_markdown_backticks(response)
-
-    # Save the generated code to a file
+    # Stream the generated Python code into its file
     chart_code_file_name = (
         f"{os.path.splitext(file_selection_response.file)[0]}_{chart_type}_chart.py"
     )
     chart_code_file_path = os.path.join(scratch_pad_dir, chart_code_file_name)
 
-    with open(chart_code_file_path, "w") as f:
-        f.write(response)
+    response = await write_streamed_file(
+        chart_code_file_path,
+        stream_chat_prompt(code_generation_prompt, model_name_to_id[ModelName.reasoning_model]),
+    )
 
     # now execute the code
     output = run_uv_script(response)
@@ -1594,65 +1691,25 @@ async def create_python_chart(prompt: str, chart_type: str) -> dict:
     }
 
 
-# Map function names to their corresponding functions
-function_map = {
-    "get_current_time": get_current_time,
-    "get_random_number": get_random_number,
-    "open_browser": open_browser,
-    "create_file": create_file,
-    "update_file": update_file,
-    "delete_file": delete_file,
-    "discuss_file": discuss_file,
-    "clipboard_to_memory": clipboard_to_memory,
-    "remove_variable_from_memory": remove_variable_from_memory,
-    "read_file_into_memory": read_file_into_memory,
-    "read_dir_into_memory": read_dir_into_memory,
-    "reset_active_memory": reset_active_memory,
-    "add_to_memory": add_to_memory,
-    "scrap_to_file_from_clipboard": scrap_to_file_from_clipboard,
-    "generate_diagram": generate_diagram,
-    "runnable_code_check": runnable_code_check,
-    "run_python": run_python,
-    "ingest_file": ingest_file,
-    "ingest_memory": ingest_memory,
-    "clipboard_to_file": clipboard_to_file,
-    "load_tables_into_memory": load_tables_into_memory,
-    "generate_sql_save_to_file": generate_sql_save_to_file,
-    "generate_sql_and_execute": generate_sql_and_execute,
-    "run_sql_file": run_sql_file,
-    "create_python_chart": create_python_chart,
-    "send_email_to_recipient": send_email_to_recipient,
-    "shutdown": shutdown,
-    "find_contact_information": find_contact_information,
-}
-
-# Tools array for session initialization
-tools = [
-    build_function_descriptor(load_tables_into_memory),
-    build_function_descriptor(create_python_chart),
-    build_function_descriptor(generate_sql_save_to_file),
-    build_function_descriptor(get_current_time),
-    build_function_descriptor(reset_active_memory),
-    build_function_descriptor(get_random_number),
-    build_function_descriptor(open_browser),
-    build_function_descriptor(create_file),
-    build_function_descriptor(update_file),
-    build_function_descriptor(delete_file),
-    build_function_descriptor(discuss_file),
-    build_function_descriptor(clipboard_to_memory),
-    build_function_descriptor(remove_variable_from_memory),
-    build_function_descriptor(read_file_into_memory),
-    build_function_descriptor(add_to_memory),
-    build_function_descriptor(read_dir_into_memory),
-    build_function_descriptor(scrap_to_file_from_clipboard),
-    build_function_descriptor(generate_diagram),
-    build_function_descriptor(runnable_code_check),
-    build_function_descriptor(run_python),
-    build_function_descriptor(ingest_file),
-    build_function_descriptor(ingest_memory),
-    build_function_descriptor(clipboard_to_file),
-    build_function_descriptor(run_sql_file),
-    build_function_descriptor(send_email_to_recipient),
-    build_function_descriptor(shutdown),
-    build_function_descriptor(find_contact_information),
-]
+@tool(ToolGroup.core)
+async def switch_tool_groups(
+    enable: Annotated[Optional[List[str]], "Tool groups to turn on: files, sql, email, memory, diagrams or all"] = None,
+    disable: Annotated[Optional[List[str]], "Tool groups to turn off"] = None,
+) -> dict:
+    """
+    Changes which groups of tools are available. Turn on the group you need when the conversation
+    moves to files, sql, email, memory or diagrams, and turn off groups that are no longer needed.
+    """
+    session = active_tool_session.get()
+    if session is None:
+        return {"status": "error", "message": "No active session to change tools for."}
+    groups = session.switch(enable or [], disable or [])
+    return {"status": "success", "enabled_groups": sorted(g.value for g in groups)}
+
+
+# Tools register themselves with @tool; these are derived from the registry
+function_map = registry.function_map
+
+# Tools array for session initialization, plus the same array pre-serialized
+# for session.update. Loaded from the descriptor cache when the sources are unchanged.
+tools, tools_json = registry.payload()
\ No newline at end of file
@@ -0,0 +1,195 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Optional
+
+from cachetools import LRUCache
+from pydantic import BaseModel, Field
+
+from .logging import logger
+
+TRANSCRIPT_CACHE_ENABLED = os.getenv("TRANSCRIPT_CACHE_ENABLED", "true").lower() == "true"
+TRANSCRIPT_CACHE_FILE = os.getenv("TRANSCRIPT_CACHE_FILE", "./.transcript_cache.sqlite")
+TRANSCRIPT_CACHE_MEMORY_ENTRIES = int(os.getenv("TRANSCRIPT_CACHE_MEMORY_ENTRIES", "256"))
+TRANSCRIPT_CACHE_MAX_BYTES = int(os.getenv("TRANSCRIPT_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+class TranscriptCacheMetrics(BaseModel):
+    memory_hits: int = Field(default=0, description="Lookups answered from the in-memory LRU")
+    disk_hits: int = Field(default=0, description="Lookups answered from SQLite")
+    misses: int = Field(default=0, description="Lookups that needed inference")
+    stores: int = Field(default=0, description="Transcripts written to the cache")
+    evictions: int = Field(default=0, description="Transcripts evicted from SQLite to stay under the size limit")
+    saved_audio_s: float = Field(default=0.0, description="Seconds of audio that were not transcribed again")
+
+    @property
+    def hits(self) -> int:
+        return self.memory_hits + self.disk_hits
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def transcript_key(audio_data: bytes, sample_rate: int, config: dict[str, Any]) -> str:
+    """
+    Hash of the PCM bytes, their sample rate and everything that changes the
+    decode (model, device, quantization and decoding options).
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps({"sample_rate": sample_rate, **config}, sort_keys=True, default=str).encode())
+    digest.update(audio_data)
+    return digest.hexdigest()
+
+
+class TranscriptCache:
+    """
+    Two-level cache of Whisper results: an in-memory LRU in front of a SQLite
+    table that is trimmed, least recently used first, to ``max_bytes``.
+
+    ``lookup`` and ``store`` block on SQLite; ``get`` and ``put`` are the
+    event loop versions and only leave the loop for the disk layer.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = TRANSCRIPT_CACHE_FILE,
+        memory_entries: int = TRANSCRIPT_CACHE_MEMORY_ENTRIES,
+        max_bytes: int = TRANSCRIPT_CACHE_MAX_BYTES,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.metrics = TranscriptCacheMetrics()
+        self._memory: LRUCache = LRUCache(maxsize=max(1, memory_entries))
+        self._connection: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        # Opened on first use so importing the module never touches the disk
+        if self._connection is None and self.path:
+            try:
+                os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+                # Batch transcription workers share the file, so wait for their writes
+                connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS transcripts "
+                    "(key TEXT PRIMARY KEY, result TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)"
+                )
+                connection.execute("CREATE INDEX IF NOT EXISTS transcripts_last_used ON transcripts (last_used)")
+                connection.commit()
+                self._connection = connection
+            except sqlite3.Error as e:
+                logger.warning(f"Transcript cache {self.path} unavailable, using memory only: {e}")
+                self.path = None
+        return self._connection
+
+    def _lookup_memory(self, key: str, audio_s: float) -> Optional[dict]:
+        result = self._memory.get(key)
+        if result is not None:
+            self.metrics.memory_hits += 1
+            self.metrics.saved_audio_s += audio_s
+        return result
+
+    def _lookup_disk(self, key: str, audio_s: float) -> Optional[dict]:
+        with self._lock:
+            db = self._db()
+            row = None
+            if db is not None:
+                row = db.execute("SELECT result FROM transcripts WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    db.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (time.time(), key))
+                    db.commit()
+        if row is None:
+            self.metrics.misses += 1
+            return None
+        result = json.loads(row[0])
+        self._memory[key] = result
+        self.metrics.disk_hits += 1
+        self.metrics.saved_audio_s += audio_s
+        return result
+
+    def _store_disk(self, key: str, result: dict) -> None:
+        payload = json.dumps(result, default=float)
+        with self._lock:
+            db = self._db()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO transcripts (key, result, size, last_used) VALUES (?, ?, ?, ?)",
+                (key, payload, len(payload), time.time()),
+            )
+            self._evict(db)
+            db.commit()
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        total = db.execute("SELECT COALESCE(SUM(size), 0) FROM transcripts").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        evicted = []
+        for key, size in db.execute("SELECT key, size FROM transcripts ORDER BY last_used"):
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        db.executemany("DELETE FROM transcripts WHERE key = ?", evicted)
+        self.metrics.evictions += len(evicted)
+
+    def lookup(self, key: str, audio_s: float = 0.0) -> Optional[dict]:
+        """Cached result for ``key`` or None; ``audio_s`` is counted as saved on a hit."""
+        result = self._lookup_memory(key, audio_s)
+        return result if result is not None else self._lookup_disk(key, audio_s)
+
+    def store(self, key: str, result: dict) -> None:
+        self._memory[key] = result
+        self.metrics.stores += 1
+        self._store_disk(key, result)
+
+    async def get(self, key: str, audio_s: float = 0.0) -> Optional[dict]:
+        result = self._lookup_memory(key, audio_s)
+        if result is not None or not self.path:
+            if result is None:
+                self.metrics.misses += 1
+            return result
+        return await asyncio.to_thread(self._lookup_disk, key, audio_s)
+
+    async def put(self, key: str, result: dict) -> None:
+        self._memory[key] = result
+        self.metrics.stores += 1
+        if self.path:
+            await asyncio.to_thread(self._store_disk, key, result)
+
+    def clear(self) -> None:
+        self._memory.clear()
+        with self._lock:
+            db = self._db()
+            if db is not None:
+                db.execute("DELETE FROM transcripts")
+                db.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def log_metrics(self) -> None:
+        if not self.metrics.hits and not self.metrics.misses:
+            return
+        logger.info(
+            "📝 Transcript cache: hit rate=%.0f%% (memory=%d disk=%d miss=%d) saved=%.1fs of audio evictions=%d",
+            self.metrics.hit_rate * 100,
+            self.metrics.memory_hits,
+            self.metrics.disk_hits,
+            self.metrics.misses,
+            self.metrics.saved_audio_s,
+            self.metrics.evictions,
+        )
+
+
+transcript_cache = TranscriptCache()
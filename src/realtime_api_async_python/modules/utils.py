@@ -7,7 +7,6 @@ import asyncio
 from datetime import datetime
 from enum import Enum
 import pyaudio
-from firecrawl import FirecrawlApp
 import tempfile
 import subprocess
 import aiofiles 
@@ -40,10 +39,6 @@ model_name_to_id = {
     ModelName.fast_model: "gpt-4o-mini",
 }
 
-from .llm import get_agent
-all_agents  = {
-    get_agent(v) for _, v in model_name_to_id.items()
-}
 
 
 def timeit_decorator(func):
@@ -116,6 +111,41 @@ PREFIX_PADDING_MS = 300
 SILENCE_THRESHOLD = 0.5
 SILENCE_DURATION_MS = 700
 
+# Client-side budget for the server conversation context, see context_window.py
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "32000"))
+CONTEXT_SUMMARY_ENABLED = os.getenv("CONTEXT_SUMMARY_ENABLED", "true").lower() == "true"
+
+# Tool groups advertised at session start (see tool_registry.py); "all" or e.g. "files,sql"
+TOOL_GROUPS = os.getenv("TOOL_GROUPS", ",".join(personalization.get("tool_groups", ["all"]))).split(",")
+# Tool descriptors sent to the model: "compact" or "full" (see tool_budget.py), and the
+# token budget the advertised tool set must fit; 0 disables the budget.
+TOOL_DESCRIPTOR_MODE = os.getenv("TOOL_DESCRIPTOR_MODE", "compact")
+TOOL_TOKEN_BUDGET = int(os.getenv("TOOL_TOKEN_BUDGET", "6000"))
+
+# Local Whisper transcription (see whisper_speechtotext.py). Without WHISPER_MODEL,
+# GPUs get large-v3 and CPUs the smaller WHISPER_CPU_MODEL.
+WHISPER_MODEL = os.getenv("WHISPER_MODEL")
+WHISPER_CPU_MODEL = os.getenv("WHISPER_CPU_MODEL", "small.en")
+WHISPER_DEVICE = os.getenv("WHISPER_DEVICE")  # default: cuda if available, else cpu
+WHISPER_QUANTIZE = os.getenv("WHISPER_QUANTIZE", "true").lower() == "true"  # int8 linear layers on CPU
+WHISPER_THREADS = int(os.getenv("WHISPER_THREADS", "0"))  # torch intra-op threads, 0 = torch default
+WHISPER_INTEROP_THREADS = int(os.getenv("WHISPER_INTEROP_THREADS", "1"))
+WHISPER_PRELOAD = os.getenv("WHISPER_PRELOAD", "false").lower() == "true"
+
+# Local wake phrase gate (see wake_word.py): microphone audio stays local until the
+# phrase is heard, then WAKE_WORD_PREROLL_MS before the detection is forwarded.
+WAKE_WORD_ENABLED = os.getenv("WAKE_WORD_ENABLED", "false").lower() == "true"
+WAKE_PHRASE = os.getenv("WAKE_PHRASE", ai_assistant_name)
+WAKE_WORD_MODEL = os.getenv("WAKE_WORD_MODEL", "tiny.en")
+WAKE_WORD_MATCH = float(os.getenv("WAKE_WORD_MATCH", "0.75"))  # fuzzy match score needed, 0 to 1
+WAKE_WORD_PREROLL_MS = int(os.getenv("WAKE_WORD_PREROLL_MS", "1500"))
+WAKE_WORD_HOLD_S = float(os.getenv("WAKE_WORD_HOLD_S", "30"))  # close again after this long without activity
+
+# Idle realtime sessions (see idle_policy.py): close after this long without server
+# events and reopen on local speech; 0 (the default) keeps the session open for the whole run.
+IDLE_TIMEOUT_S = float(os.getenv("IDLE_TIMEOUT_S", "0"))
+IDLE_RESUME_PREROLL_MS = int(os.getenv("IDLE_RESUME_PREROLL_MS", "500"))
+
 
 def match_pattern(pattern: str, key: str) -> bool:
     if pattern == "*":
@@ -141,6 +171,8 @@ def scrap_url(url: str, formats: list = ["markdown", "html"]) -> dict:
     Returns:
         dict: The scrape status returned by FirecrawlApp.
     """
+    from firecrawl import FirecrawlApp
+
     api_key = os.getenv("FIRECRAWL_API_KEY")
     if not api_key:
         raise ValueError("FIRECRAWL_API_KEY environment variable not set")
@@ -193,4 +225,8 @@ def run_uv_script(python_code: str) -> str:
         # Cleanup: remove the temporary file after execution
         temp_file.close()
 def base64_encode_audio(audio_bytes):
-    return base64.b64encode(audio_bytes).decode("utf-8")
\ No newline at end of file
+    return base64.b64encode(audio_bytes).decode("utf-8")
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token) for budgeting, not billing."""
+    return (len(text) + 3) // 4 if text else 0
\ No newline at end of file
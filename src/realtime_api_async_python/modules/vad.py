@@ -0,0 +1,193 @@
+import os
+from typing import Callable, NamedTuple, Optional
+
+import numpy as np
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+# Frames quieter than this (dBFS) are never speech; louder ones are speech when
+# they also stand VAD_NOISE_MARGIN_DB above the buffer's noise floor.
+VAD_THRESHOLD_DB = float(os.getenv("VAD_THRESHOLD_DB", "-45"))
+VAD_NOISE_MARGIN_DB = float(os.getenv("VAD_NOISE_MARGIN_DB", "10"))
+VAD_FRAME_MS = 30
+VAD_MIN_SPEECH_MS = 150  # shorter bursts are clicks and bumps
+VAD_MIN_SILENCE_MS = 500  # shorter pauses stay inside the speech span
+VAD_PAD_MS = 200  # kept either side of a span so word onsets and endings survive
+# Whisper decodes 30 second windows; packing speech into chunks of at most this
+# long means each chunk costs one window.
+MAX_CHUNK_S = 30.0
+CHUNK_GAP_S = 0.3  # silence between packed spans so words of different spans do not run together
+
+
+class SpeechSpan(NamedTuple):
+    start: int  # first sample
+    end: int  # one past the last sample
+
+
+class SpeechChunk(NamedTuple):
+    audio: np.ndarray
+    # (start in the chunk, start in the original buffer, duration), all in seconds
+    pieces: list[tuple[float, float, float]]
+
+    def to_original(self, t: float, end: bool = False) -> float:
+        """
+        Map a time in the chunk to the original buffer. Times in the silence
+        between pieces go to the start of the next piece, or to the end of the
+        previous one for ``end`` timestamps.
+        """
+        previous = None
+        for chunk_start, original_start, duration in self.pieces:
+            if t < chunk_start:
+                if end and previous is not None:
+                    return previous[1] + previous[2]
+                return original_start
+            if t <= chunk_start + duration:
+                return original_start + t - chunk_start
+            previous = (chunk_start, original_start, duration)
+        return previous[1] + previous[2] if previous else t
+
+
+def vad_config() -> dict:
+    """VAD settings that change what is transcribed, for transcript cache keys."""
+    return {
+        "threshold_db": VAD_THRESHOLD_DB,
+        "noise_margin_db": VAD_NOISE_MARGIN_DB,
+        "min_speech_ms": VAD_MIN_SPEECH_MS,
+        "min_silence_ms": VAD_MIN_SILENCE_MS,
+        "pad_ms": VAD_PAD_MS,
+        "max_chunk_s": MAX_CHUNK_S,
+    }
+
+
+def frame_energy_db(audio: np.ndarray, frame: int) -> np.ndarray:
+    """RMS level in dBFS of each ``frame`` samples of int16 or [-1, 1] float audio."""
+    if len(audio) == 0:
+        return np.empty(0, dtype=np.float32)
+    samples = audio.astype(np.float32)
+    if audio.dtype == np.int16:
+        samples /= 32768.0
+    samples = np.pad(samples, (0, -len(samples) % frame))
+    rms = np.sqrt(np.mean(samples.reshape(-1, frame) ** 2, axis=1))
+    return 20 * np.log10(np.maximum(rms, 1e-10))
+
+
+def detect_speech(
+    audio: np.ndarray,
+    sample_rate: int,
+    threshold_db: float = VAD_THRESHOLD_DB,
+    noise_margin_db: float = VAD_NOISE_MARGIN_DB,
+) -> list[SpeechSpan]:
+    """Speech spans of ``audio`` found by frame energy against an adaptive threshold."""
+    frame = max(1, sample_rate * VAD_FRAME_MS // 1000)
+    energy = frame_energy_db(audio, frame)
+    if len(energy) == 0:
+        return []
+
+    # The quietest frames estimate the noise floor. When the whole buffer is
+    # speech that estimate is speech too, so never ask for more than the peak
+    # minus the margin.
+    noise_floor = float(np.percentile(energy, 10))
+    threshold = max(threshold_db, min(noise_floor + noise_margin_db, float(energy.max()) - noise_margin_db))
+    voiced = np.concatenate(([0], (energy > threshold).astype(np.int8), [0]))
+    edges = np.diff(voiced)
+    runs = zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1))
+
+    def frames(ms: int) -> int:
+        return max(1, round(ms / VAD_FRAME_MS))
+
+    merged: list[list[int]] = []
+    for start, end in runs:
+        if merged and start - merged[-1][1] < frames(VAD_MIN_SILENCE_MS):
+            merged[-1][1] = end
+        else:
+            merged.append([start, end])
+
+    spans: list[SpeechSpan] = []
+    pad = frames(VAD_PAD_MS)
+    for start, end in merged:
+        if end - start < frames(VAD_MIN_SPEECH_MS):
+            continue
+        start_sample = max(0, (start - pad) * frame)
+        end_sample = min(len(audio), (end + pad) * frame)
+        if spans and start_sample <= spans[-1].end:
+            spans[-1] = SpeechSpan(spans[-1].start, end_sample)
+        else:
+            spans.append(SpeechSpan(start_sample, end_sample))
+    return spans
+
+
+def pack_speech(
+    audio: np.ndarray,
+    spans: list[SpeechSpan],
+    sample_rate: int,
+    max_chunk_s: float = MAX_CHUNK_S,
+    gap_s: float = CHUNK_GAP_S,
+) -> list[SpeechChunk]:
+    """
+    Concatenate speech spans, separated by ``gap_s`` of silence, into chunks of
+    at most ``max_chunk_s``. A span longer than that becomes a chunk of its
+    own, which Whisper windows itself.
+    """
+    gap = np.zeros(int(gap_s * sample_rate), dtype=audio.dtype)
+    chunks: list[SpeechChunk] = []
+    parts: list[np.ndarray] = []
+    pieces: list[tuple[float, float, float]] = []
+    length = 0
+
+    def flush():
+        nonlocal parts, pieces, length
+        if parts:
+            chunks.append(SpeechChunk(np.concatenate(parts), pieces))
+        parts, pieces, length = [], [], 0
+
+    for span in spans:
+        span_length = span.end - span.start
+        if parts and (length + len(gap) + span_length) / sample_rate > max_chunk_s:
+            flush()
+        if parts:
+            parts.append(gap)
+            length += len(gap)
+        pieces.append((length / sample_rate, float(span.start / sample_rate), float(span_length / sample_rate)))
+        parts.append(audio[span.start : span.end])
+        length += span_length
+    flush()
+    return chunks
+
+
+def transcribe_speech(
+    transcribe: Callable[[np.ndarray], dict],
+    audio: np.ndarray,
+    sample_rate: int,
+    language: Optional[str] = None,
+) -> dict:
+    """
+    Run ``transcribe`` on the speech in ``audio`` only and merge the results
+    into one Whisper-style result with timestamps in the original buffer.
+    """
+    chunks = pack_speech(audio, detect_speech(audio, sample_rate), sample_rate)
+    texts, segments = [], []
+    for chunk in chunks:
+        result = transcribe(chunk.audio)
+        language = language or result.get("language")
+        text = result.get("text", "").strip()
+        if text:
+            texts.append(text)
+        for segment in result.get("segments", []):
+            mapped = {
+                **segment,
+                "id": len(segments),
+                "start": chunk.to_original(segment["start"]),
+                "end": chunk.to_original(segment["end"], end=True),
+            }
+            if segment.get("words"):
+                mapped["words"] = [
+                    {**word, "start": chunk.to_original(word["start"]), "end": chunk.to_original(word["end"], end=True)}
+                    for word in segment["words"]
+                ]
+            segments.append(mapped)
+    return {
+        "text": " ".join(texts),
+        "segments": segments,
+        "language": language,
+        "speech_s": sum(duration for chunk in chunks for _, _, duration in chunk.pieces),
+        "audio_s": len(audio) / sample_rate,
+    }
@@ -0,0 +1,182 @@
+import asyncio
+import difflib
+import re
+import time
+from typing import Callable, Optional
+
+from pydantic import BaseModel, Field
+
+from .logging import logger, log_info
+from .utils import (
+    RATE,
+    WAKE_PHRASE,
+    WAKE_WORD_HOLD_S,
+    WAKE_WORD_MATCH,
+    WAKE_WORD_MODEL,
+    WAKE_WORD_PREROLL_MS,
+)
+from .vad import detect_speech
+from .whisper_speechtotext import WHISPER_SAMPLE_RATE, WhisperModelRegistry, pcm16_to_float, whisper_registry
+
+# Audio checked for the phrase on each pass, and new audio needed before the next pass
+WAKE_WORD_WINDOW_S = 2.0
+WAKE_WORD_STEP_S = 0.5
+
+
+class WakeWordMetrics(BaseModel):
+    checks: int = Field(default=0, description="Whisper passes over a speech window")
+    detections: int = Field(default=0, description="Times the phrase opened the gate")
+    detection_latency_ms_last: float = Field(default=0.0, description="Capture of the window's last frame to detection")
+    detection_latency_ms_max: float = Field(default=0.0, description="Worst detection latency observed")
+    forwarded_bytes: int = Field(default=0, description="Audio passed on to the realtime API")
+    withheld_bytes: int = Field(default=0, description="Audio kept local while waiting for the phrase")
+
+
+def _words(text: str) -> list[str]:
+    return re.sub(r"[^\w' ]+", " ", text.lower()).split()
+
+
+def phrase_score(transcript: str, phrase: str) -> float:
+    """Best fuzzy match (0 to 1) of ``phrase`` against any run of as many words in ``transcript``."""
+    phrase_words, words = _words(phrase), _words(transcript)
+    if not phrase_words or not words:
+        return 0.0
+    target = " ".join(phrase_words)
+    size = len(phrase_words)
+    return max(
+        difflib.SequenceMatcher(None, target, " ".join(words[i : i + size])).ratio()
+        for i in range(max(1, len(words) - size + 1))
+    )
+
+
+class WakeWordGate:
+    """
+    Keeps microphone audio local until the wake phrase (the assistant's name by
+    default) is heard, then forwards it, starting ``preroll_ms`` before the
+    detection so the phrase and what follows it reach the server.
+
+    While closed, every ``WAKE_WORD_STEP_S`` of new audio the last
+    ``WAKE_WORD_WINDOW_S`` are checked: the energy VAD skips silence and a
+    small Whisper model transcribes speech, which is fuzzy-matched against the
+    phrase. The gate closes again after ``hold_s`` without conversation
+    activity (see ``touch``).
+    """
+
+    def __init__(
+        self,
+        phrase: str = WAKE_PHRASE,
+        sample_rate: int = RATE,
+        registry: WhisperModelRegistry = whisper_registry,
+        model_name: str = WAKE_WORD_MODEL,
+        preroll_ms: int = WAKE_WORD_PREROLL_MS,
+        hold_s: float = WAKE_WORD_HOLD_S,
+        threshold: float = WAKE_WORD_MATCH,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.phrase = phrase
+        self.sample_rate = sample_rate
+        self.registry = registry
+        self.model_name = model_name
+        self.hold_s = hold_s
+        self.threshold = threshold
+        self.clock = clock
+        self.metrics = WakeWordMetrics()
+        self.is_open = False
+        self._last_activity = 0.0
+        self._preroll_bytes = int(preroll_ms * sample_rate / 1000) * 2
+        self._window_bytes = int(WAKE_WORD_WINDOW_S * sample_rate) * 2
+        self._step_bytes = int(WAKE_WORD_STEP_S * sample_rate) * 2
+        self._buffer = bytearray()  # most recent audio, enough for the window and the pre-roll
+        self._new_bytes = 0
+        self._check: Optional[asyncio.Task] = None
+
+    def touch(self) -> None:
+        """Conversation activity (speech or a response) keeps the gate open."""
+        self._last_activity = self.clock()
+
+    def open(self) -> None:
+        self.is_open = True
+        self.touch()
+
+    def close(self) -> None:
+        if self.is_open:
+            logger.info(f"Wake word gate closed after {self.hold_s:.0f}s without activity")
+        self.is_open = False
+        self._buffer.clear()
+        self._new_bytes = 0
+
+    def process(self, audio_data: bytes) -> Optional[bytes]:
+        """Audio to forward for ``audio_data`` just captured, or None while waiting for the phrase."""
+        if self.is_open and self.clock() - self._last_activity > self.hold_s:
+            self.close()
+        if self.is_open:
+            self.metrics.forwarded_bytes += len(audio_data)
+            return audio_data
+
+        self._buffer += audio_data
+        del self._buffer[: max(0, len(self._buffer) - max(self._window_bytes, self._preroll_bytes))]
+        self._new_bytes += len(audio_data)
+        self.metrics.withheld_bytes += len(audio_data)
+
+        if self._check is not None and self._check.done():
+            check, self._check = self._check, None
+            detected = False
+            if not check.cancelled():
+                if check.exception() is not None:
+                    logger.warning(f"Wake word check failed: {check.exception()}")
+                else:
+                    detected = check.result()
+            if detected:
+                self.open()
+                forwarded = bytes(self._buffer[-max(self._preroll_bytes, len(audio_data)) :])
+                self._buffer.clear()
+                self.metrics.forwarded_bytes += len(forwarded)
+                self.metrics.withheld_bytes -= len(forwarded)
+                return forwarded
+
+        if self._check is None and self._new_bytes >= self._step_bytes:
+            self._new_bytes = 0
+            window = bytes(self._buffer[-self._window_bytes :])
+            self._check = asyncio.create_task(self._detect(window, self.clock()))
+        return None
+
+    async def _detect(self, window: bytes, captured_at: float) -> bool:
+        audio = pcm16_to_float(window, self.sample_rate)
+        # Most windows are silence or noise; only speech is worth a Whisper pass
+        if not detect_speech(audio, WHISPER_SAMPLE_RATE):
+            return False
+        self.metrics.checks += 1
+        result = await self.registry.transcribe(audio, self.model_name, language="en")
+        score = phrase_score(result.get("text", ""), self.phrase)
+        if score < self.threshold:
+            return False
+        latency_ms = (self.clock() - captured_at) * 1000
+        self.metrics.detections += 1
+        self.metrics.detection_latency_ms_last = latency_ms
+        self.metrics.detection_latency_ms_max = max(self.metrics.detection_latency_ms_max, latency_ms)
+        log_info(
+            f"👂 Wake phrase '{self.phrase}' heard ({score:.2f}: {result.get('text', '').strip()!r}) in {latency_ms:.0f}ms",
+            style="bold green",
+        )
+        return True
+
+    async def wait_for_check(self) -> None:
+        """Wait for the phrase check in flight, if any; for offline evaluation and tests."""
+        if self._check is not None:
+            await asyncio.wait([self._check])
+
+    def cancel(self) -> None:
+        if self._check is not None:
+            self._check.cancel()
+            self._check = None
+
+    def log_metrics(self) -> None:
+        total = self.metrics.forwarded_bytes + self.metrics.withheld_bytes
+        logger.info(
+            "👂 Wake word: detections=%d checks=%d latency last=%.0fms max=%.0fms withheld=%.0f%% of captured audio",
+            self.metrics.detections,
+            self.metrics.checks,
+            self.metrics.detection_latency_ms_last,
+            self.metrics.detection_latency_ms_max,
+            100 * self.metrics.withheld_bytes / total if total else 0.0,
+        )
@@ -1,25 +1,247 @@
 
 import asyncio 
 import logging
-from .utils import base64_encode_audio
-import whisper 
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+from pydantic import BaseModel, Field
+
+from .utils import (
+    base64_encode_audio,
+    RATE,
+    WHISPER_MODEL,
+    WHISPER_CPU_MODEL,
+    WHISPER_DEVICE,
+    WHISPER_QUANTIZE,
+    WHISPER_THREADS,
+    WHISPER_INTEROP_THREADS,
+)
 from .logging import logger, log_ws_event
-import torch
+from .transcript_cache import TRANSCRIPT_CACHE_ENABLED, transcript_cache, transcript_key
+from .vad import VAD_ENABLED, transcribe_speech, vad_config
 import numpy as np
 
-device = torch.device('cuda' if torch.cuda.is_available() else 'cpu')
+# Whisper models are trained on 16 kHz audio
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_GPU_MODEL = "large-v3"
+
 
+def resample(audio_array: np.ndarray, from_rate: int, to_rate: int = WHISPER_SAMPLE_RATE) -> np.ndarray:
+    """Linear resampling, good enough for speech recognition."""
+    if from_rate == to_rate or len(audio_array) == 0:
+        return audio_array
+    duration = len(audio_array) / from_rate
+    target_length = int(round(duration * to_rate))
+    source_times = np.arange(len(audio_array)) / from_rate
+    target_times = np.arange(target_length) / to_rate
+    return np.interp(target_times, source_times, audio_array).astype(np.float32)
 
 
-async def transcribe_audio(audio_data:bytes):
-    # Load the Whisper model
+def pcm16_to_float(audio_data: bytes, sample_rate: int = RATE) -> np.ndarray:
     audio_array = np.frombuffer(audio_data, dtype=np.int16)
 
     # Normalize the array to the range [-1, 1]
     audio_array = audio_array.astype(np.float32) / 32768.0
-    model = whisper.load_model("large-v3", device=device)
+    return resample(audio_array, sample_rate)
+
+
+class WhisperProfile(BaseModel):
+    device: str = Field(description="cuda or cpu")
+    model_name: str = Field(description="Checkpoint loaded when no model is asked for")
+    quantize: bool = Field(default=False, description="Dynamic int8 quantization of the linear layers (CPU only)")
+    intra_op_threads: int = Field(default=0, description="torch.set_num_threads, 0 keeps torch's default")
+    interop_threads: int = Field(default=0, description="torch.set_num_interop_threads, 0 keeps torch's default")
+
+    def decode_options(self) -> dict:
+        if self.device == "cuda":
+            return {"fp16": True}
+        # fp16 is unsupported on the CPU. Greedy decoding at temperature 0 avoids beam
+        # search and the temperature fallback re-decodes, which dominate CPU time.
+        return {
+            "fp16": False,
+            "beam_size": None,
+            "best_of": None,
+            "temperature": 0.0,
+            "condition_on_previous_text": False,
+        }
+
+
+def resolve_profile(device: Optional[str] = WHISPER_DEVICE, model_name: Optional[str] = WHISPER_MODEL) -> WhisperProfile:
+    """Pick the inference profile for this host from the WHISPER_* settings."""
+    if not device:
+        import torch
+
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+    if device == "cuda":
+        return WhisperProfile(device=device, model_name=model_name or WHISPER_GPU_MODEL)
+    return WhisperProfile(
+        device=device,
+        model_name=model_name or WHISPER_CPU_MODEL,
+        quantize=WHISPER_QUANTIZE,
+        intra_op_threads=WHISPER_THREADS,
+        interop_threads=WHISPER_INTEROP_THREADS,
+    )
+
+
+def quantize_linear_layers(model: Any) -> Any:
+    """Swap the model's linear layers for dynamically quantized int8 ones."""
+    import torch
+    from torch import nn
+
+    # Whisper uses its own nn.Linear subclass, which quantize_dynamic does not
+    # match; on the CPU in fp32 it behaves exactly like a plain nn.Linear.
+    for module in list(model.modules()):
+        for name, child in list(module.named_children()):
+            if isinstance(child, nn.Linear) and type(child) is not nn.Linear:
+                plain = nn.Linear(child.in_features, child.out_features, bias=child.bias is not None)
+                plain.weight = child.weight
+                plain.bias = child.bias
+                setattr(module, name, plain)
+    return torch.ao.quantization.quantize_dynamic(model, {nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+class WhisperModelRegistry:
+    """
+    Loads each Whisper model once and runs all loading and inference on a single
+    worker thread, so the event loop is never blocked and the GPU (or the CPU
+    threads torch uses) only ever serves one transcription at a time.
+    """
+
+    def __init__(self, profile: Optional[WhisperProfile] = None):
+        self._profile = profile
+        self._threads_configured = False
+        self._models: dict[str, Any] = {}
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="whisper")
+
+    @property
+    def profile(self) -> WhisperProfile:
+        # Resolving the device imports torch, so only do it on the worker thread
+        if self._profile is None:
+            self._profile = resolve_profile()
+        return self._profile
+
+    def _configure_threads(self) -> None:
+        if self._threads_configured:
+            return
+        self._threads_configured = True
+        if not (self.profile.intra_op_threads or self.profile.interop_threads):
+            return
+        import torch
+
+        if self.profile.intra_op_threads:
+            torch.set_num_threads(self.profile.intra_op_threads)
+        if self.profile.interop_threads:
+            try:
+                torch.set_num_interop_threads(self.profile.interop_threads)
+            except RuntimeError as e:
+                # Only allowed before torch runs any parallel work
+                logger.warning(f"Could not set torch inter-op threads: {e}")
+
+    def _load(self, model_name: Optional[str] = None) -> Any:
+        # Runs on the worker thread, which also serializes concurrent loads of the same model
+        model_name = model_name or self.profile.model_name
+        if model_name not in self._models:
+            # torch and whisper take seconds to import, so only pay for them on first use
+            import whisper
+
+            self._configure_threads()
+            start = time.perf_counter()
+            model = whisper.load_model(model_name, device=self.profile.device)
+            if self.profile.quantize and self.profile.device == "cpu":
+                model = quantize_linear_layers(model)
+            self._models[model_name] = model
+            logger.info(
+                f"Loaded Whisper model '{model_name}' on {self.profile.device}"
+                f"{' (int8)' if self.profile.quantize and self.profile.device == 'cpu' else ''} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+        return self._models[model_name]
+
+    def _transcribe(self, model_name: Optional[str], audio_array: np.ndarray, **options) -> dict:
+        model = self._load(model_name)
+        return model.transcribe(audio_array, **{**self.profile.decode_options(), **options})
+
+    def _transcribe_speech(self, model_name: Optional[str], audio_array: np.ndarray, **options) -> dict:
+        # Silence costs as much to decode as speech, so only the speech spans are transcribed
+        return transcribe_speech(
+            lambda chunk: self._transcribe(model_name, chunk, **options),
+            audio_array,
+            WHISPER_SAMPLE_RATE,
+            options.get("language"),
+        )
+
+    def is_loaded(self, model_name: Optional[str] = None) -> bool:
+        if model_name is None:
+            return self._profile is not None and self._profile.model_name in self._models
+        return model_name in self._models
+
+    def cache_config(self, model_name: Optional[str] = None, trim_silence: bool = False, **options) -> dict:
+        """Everything besides the audio that changes the transcript, for transcript_key."""
+        profile = self.profile
+        return {
+            "model": model_name or profile.model_name,
+            "device": profile.device,
+            "quantize": profile.quantize and profile.device == "cpu",
+            "options": {**profile.decode_options(), **options},
+            "vad": vad_config() if trim_silence else None,
+        }
+
+    async def get_profile(self) -> WhisperProfile:
+        if self._profile is not None:
+            return self._profile
+        return await asyncio.get_running_loop().run_in_executor(self._executor, lambda: self.profile)
+
+    async def get_model(self, model_name: Optional[str] = None) -> Any:
+        """Load ``model_name`` (default: the profile's model) if needed, e.g. as a background warm-up at startup."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self._load, model_name)
+
+    async def transcribe(self, audio_array: np.ndarray, model_name: Optional[str] = None, **options) -> dict:
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self._transcribe, model_name, audio_array, **options)
+        )
+
+    async def transcribe_speech(self, audio_array: np.ndarray, model_name: Optional[str] = None, **options) -> dict:
+        """Like transcribe, but silence is cut out first; segment timestamps still refer to ``audio_array``."""
+        return await asyncio.get_running_loop().run_in_executor(
+            self._executor, partial(self._transcribe_speech, model_name, audio_array, **options)
+        )
+
+
+whisper_registry = WhisperModelRegistry()
+
+
+async def transcribe_audio(
+    audio_data: bytes,
+    sample_rate: int = RATE,
+    model_name: Optional[str] = None,
+    use_cache: bool = TRANSCRIPT_CACHE_ENABLED,
+    trim_silence: bool = VAD_ENABLED,
+):
+    """
+    Transcribe PCM16 mono audio (24 kHz from the microphone by default) to English text.
+    With ``trim_silence`` only the speech found by the energy VAD is decoded.
+    Results are cached by a hash of the audio and decoding settings, so replaying
+    the same audio skips inference.
+    """
     # Transcribe the audio with the language set to English
-    result = model.transcribe(audio_array, language='en')
-    print(f"********************************************* \nTranscription: {result}")
+    options = {"language": "en"}
+    key = None
+    if use_cache:
+        await whisper_registry.get_profile()
+        key = transcript_key(audio_data, sample_rate, whisper_registry.cache_config(model_name, trim_silence, **options))
+        result = await transcript_cache.get(key, audio_s=len(audio_data) / 2 / sample_rate)
+        if result is not None:
+            logger.debug(f"Transcription (cached): {result.get('text', '')}")
+            return result
+
+    audio_array = pcm16_to_float(audio_data, sample_rate)
+    if trim_silence:
+        result = await whisper_registry.transcribe_speech(audio_array, model_name, **options)
+    else:
+        result = await whisper_registry.transcribe(audio_array, model_name, **options)
+    if key is not None:
+        await transcript_cache.put(key, result)
+    logger.debug(f"Transcription: {result.get('text', '')}")
     return result
-                
@@ -0,0 +1,93 @@
+import asyncio
+import os
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def batch_runner(tmp_path_factory):
+    """
+    Import batch_runner, which imports main; main exits when its required
+    environment variables are unset, so provide them for the import.
+    """
+    scratch = tmp_path_factory.mktemp("batch_runner")
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("OPENAI_API_KEY", os.getenv("OPENAI_API_KEY") or "sk-test")
+        mp.setenv("PERSONALIZATION_FILE", str(REPO_ROOT / "personalization.json"))
+        mp.setenv("SCRATCH_PAD_DIR", str(scratch / "scratchpad"))
+        mp.setenv("ACTIVE_MEMORY_FILE", str(scratch / "active_memory.json"))
+        yield pytest.importorskip("realtime_api_async_python.batch_runner")
+
+
+def test_load_prompt_scripts(batch_runner, tmp_path):
+    path = tmp_path / "scripts.jsonl"
+    path.write_text(
+        "# smoke tests\n"
+        '{"id": "files", "prompts": ["list files", "read notes.md"]}\n'
+        "\n"
+        "what time is it? | open the browser |  \n"
+        '{"prompts": ["hello"]}\n'
+    )
+
+    scripts = batch_runner.load_prompt_scripts(str(path))
+
+    assert [(s.script_id, s.prompts) for s in scripts] == [
+        ("files", ["list files", "read notes.md"]),
+        ("4", ["what time is it?", "open the browser"]),
+        ("5", ["hello"]),
+    ]
+
+
+class RecordingQueue:
+    def __init__(self):
+        self.events = []
+
+    def put_event(self, event):
+        self.events.append(event)
+
+
+def headless_session(batch_runner, monkeypatch):
+    """A HeadlessSession without a socket, microphone or tool registry behind it."""
+
+    async def base_handle_event(self, event, websocket):
+        pass
+
+    monkeypatch.setattr(batch_runner.OpenAIRealtimeAPI, "handle_event", base_handle_event)
+    session = batch_runner.HeadlessSession.__new__(batch_runner.HeadlessSession)
+    session.turn = batch_runner.TurnRecord(prompt="p")
+    session.turn_started = 0.0
+    session.turn_done = asyncio.Event()
+    session.send_queue = RecordingQueue()
+    return session
+
+
+async def test_function_call_response_does_not_end_the_turn(batch_runner, monkeypatch):
+    session = headless_session(batch_runner, monkeypatch)
+
+    await session.handle_event(
+        {"type": "response.done", "response": {"status": "completed", "output": [{"type": "function_call"}]}}, None
+    )
+    assert not session.turn_done.is_set()
+
+    await session.handle_event(
+        {"type": "response.done", "response": {"status": "completed", "output": [{"type": "message"}]}}, None
+    )
+    assert session.turn_done.is_set()
+    assert session.turn.responses == 2
+    assert session.turn.error is None
+
+
+async def test_turn_requests_exactly_one_response(batch_runner, monkeypatch):
+    session = headless_session(batch_runner, monkeypatch)
+    done = {"type": "response.done", "response": {"status": "completed", "output": []}}
+    turn = asyncio.create_task(session.run_turn("hello"))
+    await asyncio.sleep(0)
+    await session.handle_event(done, None)
+
+    record = await asyncio.wait_for(turn, timeout=1)
+
+    assert record.error is None
+    assert [e["type"] for e in session.send_queue.events] == ["conversation.item.create", "response.create"]
@@ -0,0 +1,130 @@
+import json
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from realtime_api_async_python.modules import batch_transcription
+from realtime_api_async_python.modules.batch_transcription import (
+    AudioJob,
+    completed_paths,
+    discover_jobs,
+    read_audio,
+    transcribe_batch,
+    truncate_partial_line,
+)
+
+
+class FakeRegistry:
+    def __init__(self):
+        self.calls = 0
+
+    def _transcribe(self, model_name, audio, **options):
+        self.calls += 1
+        return {"text": f" {len(audio)} samples", "language": options.get("language")}
+
+    _transcribe_speech = _transcribe
+
+
+def write_wav(path, seconds=1.0, rate=16000):
+    samples = np.zeros(int(seconds * rate), dtype=np.int16)
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+def test_discover_jobs_from_directory_and_manifest(tmp_path):
+    write_wav(tmp_path / "a.wav")
+    (tmp_path / "nested").mkdir()
+    (tmp_path / "nested" / "b.pcm").write_bytes(b"\x00\x00" * 100)
+    (tmp_path / "notes.txt").write_text("not audio")
+
+    jobs = discover_jobs(str(tmp_path))
+    assert [job.path for job in jobs] == [str(tmp_path / "a.wav"), str(tmp_path / "nested" / "b.pcm")]
+
+    manifest = tmp_path / "manifest.txt"
+    manifest.write_text('# recordings\na.wav\n\n{"path": "nested/b.pcm", "sample_rate": 8000}\n')
+    jobs = discover_jobs(str(manifest))
+    assert [job.path for job in jobs] == [str(tmp_path / "a.wav"), str(tmp_path / "nested" / "b.pcm")]
+    assert jobs[1].sample_rate == 8000
+
+
+def test_read_audio_uses_wav_header_and_pcm_rate(tmp_path):
+    write_wav(tmp_path / "a.wav", seconds=0.5, rate=16000)
+    (tmp_path / "b.pcm").write_bytes(b"\x00\x00" * 800)
+
+    audio, rate = read_audio(AudioJob(path=str(tmp_path / "a.wav"), sample_rate=24000))
+    assert (len(audio), rate) == (16000, 16000)
+    audio, rate = read_audio(AudioJob(path=str(tmp_path / "b.pcm"), sample_rate=8000))
+    assert (len(audio), rate) == (1600, 8000)
+
+
+def test_completed_paths_skips_errors_and_partial_lines(tmp_path):
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"path": "/a.wav", "text": "hi"}) + "\n"
+        + json.dumps({"path": "/b.wav", "error": "boom"}) + "\n"
+        + '{"path": "/c.w'
+    )
+    assert completed_paths(str(output)) == {"/a.wav"}
+
+
+async def test_transcribe_batch_resumes(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for name in ("a", "b", "c"):
+        write_wav(audio_dir / f"{name}.wav")
+    (audio_dir / "broken.wav").write_bytes(b"not a wav")
+    output = tmp_path / "out.jsonl"
+    output.write_text(json.dumps({"path": str(audio_dir / "a.wav"), "text": "done"}) + "\n")
+
+    registry = FakeRegistry()
+    monkeypatch.setattr(batch_transcription, "_worker_registry", registry)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        summary = await transcribe_batch(str(audio_dir), str(output), workers=2, executor=executor)
+
+    assert (summary.files, summary.skipped, summary.failed) == (3, 1, 1)
+    assert summary.audio_s == 2.0
+    assert summary.audio_hours_per_wall_hour > 0
+    assert registry.calls == 2
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert len(records) == 4
+    assert {r["path"] for r in records if r.get("error")} == {str(audio_dir / "broken.wav")}
+    assert completed_paths(str(output)) == {str(audio_dir / f"{name}.wav") for name in ("a", "b", "c")}
+
+
+def test_truncate_partial_line(tmp_path):
+    output = tmp_path / "out.jsonl"
+    complete = json.dumps({"path": "/a.wav", "text": "hi"}) + "\n"
+    output.write_text(complete + '{"path": "/b.w')
+
+    truncate_partial_line(str(output), chunk_size=4)
+    assert output.read_text() == complete
+    truncate_partial_line(str(output))
+    assert output.read_text() == complete
+
+    output.write_text('{"path": "/b.w')
+    truncate_partial_line(str(output))
+    assert output.read_text() == ""
+
+
+async def test_resume_after_a_partial_last_line(tmp_path, monkeypatch):
+    audio_dir = tmp_path / "audio"
+    audio_dir.mkdir()
+    for name in ("a", "b"):
+        write_wav(audio_dir / f"{name}.wav")
+    output = tmp_path / "out.jsonl"
+    output.write_text(
+        json.dumps({"path": str(audio_dir / "a.wav"), "text": "done"}) + "\n"
+        + json.dumps({"path": str(audio_dir / "b.wav"), "text": "done"})[:-10]
+    )
+
+    monkeypatch.setattr(batch_transcription, "_worker_registry", FakeRegistry())
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        summary = await transcribe_batch(str(audio_dir), str(output), workers=1, executor=executor)
+
+    assert (summary.files, summary.skipped) == (1, 1)
+    records = [json.loads(line) for line in output.read_text().splitlines()]
+    assert [r["path"] for r in records] == [str(audio_dir / "a.wav"), str(audio_dir / "b.wav")]
@@ -0,0 +1,122 @@
+from realtime_api_async_python.modules.context_window import ConversationContextManager
+
+
+def user_message(item_id: str, text: str) -> dict:
+    return {
+        "id": item_id,
+        "type": "message",
+        "role": "user",
+        "content": [{"type": "input_text", "text": text}],
+    }
+
+
+def tool_call(item_id: str, call_id: str, name: str) -> dict:
+    return {"id": item_id, "type": "function_call", "call_id": call_id, "name": name, "arguments": "{}"}
+
+
+def tool_output(item_id: str, call_id: str, output: str) -> dict:
+    return {"id": item_id, "type": "function_call_output", "call_id": call_id, "output": output}
+
+
+def test_under_budget_emits_nothing():
+    manager = ConversationContextManager(token_budget=1000, keep_recent=2)
+    manager.track(user_message("item_1", "hello"))
+    assert manager.trim_events() == []
+
+
+def test_large_tool_output_is_trimmed_with_its_call():
+    manager = ConversationContextManager(token_budget=1000, keep_recent=2, summarize=False)
+    manager.track(user_message("item_1", "hi"))
+    manager.track(tool_call("item_2", "call_1", "ingest_file"))
+    manager.track(tool_output("item_3", "call_1", "x" * 8000))
+    manager.track(user_message("item_4", "thanks"))
+    manager.track(user_message("item_5", "next question"))
+
+    events = manager.trim_events()
+
+    deleted = {e["item_id"] for e in events if e["type"] == "conversation.item.delete"}
+    assert deleted == {"item_2", "item_3"}
+    # Pending deletes no longer count towards the budget or get deleted twice
+    assert manager.trim_events() == []
+
+
+def test_tool_call_is_kept_while_its_output_is_recent():
+    manager = ConversationContextManager(token_budget=1000, keep_recent=2, summarize=False)
+    manager.track(user_message("item_1", "hi"))
+    manager.track(tool_call("item_2", "call_1", "ingest_file"))
+    manager.track(tool_output("item_3", "call_1", "x" * 8000))
+    manager.track(user_message("item_4", "thanks"))
+
+    events = manager.trim_events()
+
+    deleted = {e["item_id"] for e in events if e["type"] == "conversation.item.delete"}
+    assert deleted == {"item_1"}
+
+
+def test_summary_item_replaces_trimmed_span():
+    manager = ConversationContextManager(token_budget=1000, keep_recent=1, summarize=True)
+    manager.track(user_message("item_1", "first"))
+    manager.track(tool_call("item_2", "call_1", "ingest_memory"))
+    manager.track(tool_output("item_3", "call_1", "y" * 8000))
+    manager.track(user_message("item_4", "latest"))
+
+    events = manager.trim_events()
+
+    create = events[0]
+    assert create["type"] == "conversation.item.create"
+    assert create["previous_item_id"] == "item_1"
+    assert "ingest_memory" in create["item"]["content"][0]["text"]
+
+
+def test_recent_items_are_kept():
+    manager = ConversationContextManager(token_budget=100, keep_recent=2, summarize=False)
+    manager.track(user_message("item_1", "a" * 4000))
+    manager.track(user_message("item_2", "b" * 4000))
+
+    assert manager.trim_events() == []
+
+
+def test_observed_usage_triggers_trim_and_deleted_items_are_forgotten():
+    manager = ConversationContextManager(token_budget=1000, keep_recent=1, summarize=False)
+    manager.track(user_message("item_1", "short"))
+    manager.track(user_message("item_2", "short"))
+    manager.observe_usage({"input_tokens": 5000})
+
+    events = manager.trim_events()
+    assert {"type": "conversation.item.delete", "item_id": "item_1"} in events
+
+    manager.forget("item_1")
+    assert "item_1" not in manager.items
+
+
+def test_replay_events_recreate_the_conversation_as_text():
+    manager = ConversationContextManager(token_budget=100, keep_recent=1, summarize=False)
+    manager.track(user_message("item_1", "a" * 4000))
+    manager.track(
+        {
+            "id": "item_2",
+            "type": "message",
+            "role": "user",
+            "content": [{"type": "input_audio", "transcript": "what's in my inbox?"}],
+        }
+    )
+    manager.track(tool_call("item_3", "call_1", "read_inbox"))
+    manager.track(tool_output("item_4", "call_1", "2 new emails"))
+    manager.track(
+        {
+            "id": "item_5",
+            "type": "message",
+            "role": "assistant",
+            "content": [{"type": "audio", "transcript": "You have two new emails."}],
+        }
+    )
+    manager.trim_events()
+
+    items = [event["item"] for event in manager.replay_events()]
+
+    # item_1 is being deleted, so it is not replayed
+    assert [item["id"] for item in items] == ["item_2", "item_3", "item_4", "item_5"]
+    assert items[0]["content"] == [{"type": "input_text", "text": "what's in my inbox?"}]
+    assert items[1] == {"id": "item_3", "type": "function_call", "call_id": "call_1", "name": "read_inbox", "arguments": "{}"}
+    assert items[2]["output"] == "2 new emails"
+    assert items[3]["content"] == [{"type": "text", "text": "You have two new emails."}]
@@ -0,0 +1,56 @@
+import json
+from typing import Annotated
+
+from pydantic import BaseModel, Field
+
+from realtime_api_async_python.modules import descriptor_cache
+from realtime_api_async_python.modules.gen_descriptor import build_function_descriptor
+from realtime_api_async_python.modules.descriptor_cache import load_tool_descriptors
+
+
+class Recipient(BaseModel):
+    email: str = Field(description="Email address")
+
+
+async def notify(recipient: Annotated[Recipient, "who to notify"], message: str = "hi") -> dict:
+    """Notify a recipient."""
+    return {}
+
+
+async def ping() -> dict:
+    """Ping."""
+    return {}
+
+
+def test_memoized_descriptor_is_a_copy():
+    first = build_function_descriptor(notify)
+    first["parameters"]["properties"]["recipient"]["description"] = "changed"
+
+    assert build_function_descriptor(notify)["parameters"]["properties"]["recipient"]["description"] == "who to notify"
+
+
+def test_cache_hit_skips_introspection(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "tools.json")
+    tools, tools_json = load_tool_descriptors([notify, ping], cache_file=cache_file, enabled=True)
+    assert [t["name"] for t in tools] == ["notify", "ping"]
+    assert json.loads(tools_json) == tools
+
+    def fail(func):
+        raise AssertionError("descriptor rebuilt on a cache hit")
+
+    monkeypatch.setattr(descriptor_cache, "build_function_descriptor", fail)
+    cached_tools, cached_json = load_tool_descriptors([notify, ping], cache_file=cache_file, enabled=True)
+    assert cached_tools == tools
+    assert cached_json == tools_json
+
+
+def test_changed_fingerprint_rebuilds(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "tools.json")
+    load_tool_descriptors([notify, ping], cache_file=cache_file, enabled=True)
+
+    monkeypatch.setattr(descriptor_cache, "tools_fingerprint", lambda functions: "changed")
+    tools, _ = load_tool_descriptors([ping], cache_file=cache_file, enabled=True)
+
+    assert [t["name"] for t in tools] == ["ping"]
+    with open(cache_file) as f:
+        assert json.load(f)["fingerprint"] == "changed"
@@ -0,0 +1,104 @@
+import asyncio
+import socket
+import time
+
+from realtime_api_async_python.modules import gateway
+from realtime_api_async_python.modules.gateway import CLOSE_TRY_AGAIN_LATER, Gateway
+
+
+def healthy_gateway(workers=3, **loads) -> Gateway:
+    gw = Gateway(workers=workers)
+    for health in gw.health:
+        health.healthy = True
+        health.active_sessions = loads.get(f"w{health.index}", 0)
+    return gw
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+class StuckProcess:
+    """A worker process that never exits on its own."""
+
+    def __init__(self):
+        self.killed = False
+
+    def join(self, timeout):
+        time.sleep(timeout)
+
+    def is_alive(self):
+        return not self.killed
+
+    def kill(self):
+        self.killed = True
+
+
+class FakeClient:
+    path = "/?session=abc"
+
+    def __init__(self):
+        self.closed_with = None
+
+    async def close(self, code, reason):
+        self.closed_with = code
+
+
+def test_session_sticks_to_its_worker():
+    gw = healthy_gateway()
+    first = gw.pick_worker("abc")
+    # Other sessions now load the first worker more than the rest
+    for session in ("x", "y", "z"):
+        gw.pick_worker(session)
+
+    assert gw.pick_worker("abc") == first
+
+
+def test_new_sessions_go_to_the_least_loaded_worker():
+    gw = healthy_gateway(w0=3, w1=1, w2=2)
+
+    assert gw.pick_worker("a") == 1
+    assert gw.health[1].active_sessions == 2
+    # Counted immediately, so the next one spreads without waiting for a health check
+    assert gw.pick_worker("b") in (1, 2)
+    assert gw.pick_worker("c") != 0
+
+
+def test_unhealthy_and_draining_workers_are_skipped():
+    gw = healthy_gateway(w0=5)
+    sticky = gw.pick_worker("abc")
+    assert sticky != 0
+    gw.health[sticky].healthy = False
+    gw.health[3 - sticky].draining = True
+
+    assert gw.pick_worker("abc") == 0
+
+    gw.health[0].draining = True
+    assert gw.pick_worker("new") is None
+
+
+async def test_drain_turns_new_sessions_away():
+    gw = healthy_gateway(workers=1)
+    gw.worker_base_port = free_port()
+
+    await gw.drain()
+    client = FakeClient()
+    await gw.route(client)
+
+    assert client.closed_with == CLOSE_TRY_AGAIN_LATER
+
+
+async def test_drain_kills_workers_that_outlive_the_timeout(monkeypatch):
+    monkeypatch.setattr(gateway, "GATEWAY_DRAIN_TIMEOUT_S", 0.05)
+    gw = healthy_gateway(workers=2)
+    # Nothing listens on these ports; the drain request fails and drain carries on
+    gw.worker_base_port = free_port()
+    gw.processes = [StuckProcess(), StuckProcess()]
+
+    start = time.monotonic()
+    await asyncio.wait_for(gw.drain(), timeout=5)
+
+    assert all(process.killed for process in gw.processes)
+    assert time.monotonic() - start < 2
@@ -0,0 +1,56 @@
+import asyncio
+
+from realtime_api_async_python.modules import http_client
+from realtime_api_async_python.modules.http_client import SharedHttpClient
+
+
+async def start_keepalive_server():
+    async def handle(reader, writer):
+        while await reader.readuntil(b"\r\n\r\n"):
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok")
+            await writer.drain()
+
+    async def serve(reader, writer):
+        try:
+            await handle(reader, writer)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(serve, "127.0.0.1", 0)
+    return server, f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}"
+
+
+async def test_requests_reuse_one_pooled_connection():
+    server, url = await start_keepalive_server()
+    shared = SharedHttpClient(http2=False)
+
+    for _ in range(3):
+        assert (await shared.client.get(url)).text == "ok"
+    await shared.aclose()
+    server.close()
+
+    assert shared.metrics.requests == 3
+    assert shared.metrics.connections == 1
+    assert shared.metrics.tls_handshakes == 0
+    assert round(shared.metrics.reuse_rate, 2) == 0.67
+
+
+async def test_warm_opens_connections_before_the_first_call():
+    server, url = await start_keepalive_server()
+    shared = SharedHttpClient(http2=False, max_keepalive=4)
+
+    await shared.warm(base_url=url, connections=2)
+    assert shared.metrics.connections == 2
+    await asyncio.gather(*[shared.client.get(url) for _ in range(2)])
+    assert shared.metrics.connections == 2
+    await shared.aclose()
+    server.close()
+
+
+def test_http2_only_when_h2_is_installed(monkeypatch):
+    monkeypatch.setattr(http_client.importlib.util, "find_spec", lambda name: None)
+    assert SharedHttpClient().http2 is False
+
+    monkeypatch.setattr(http_client.importlib.util, "find_spec", lambda name: object())
+    monkeypatch.setattr(http_client, "LLM_HTTP2", False)
+    assert SharedHttpClient().http2 is False
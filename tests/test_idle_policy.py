@@ -0,0 +1,94 @@
+import asyncio
+
+import numpy as np
+
+from realtime_api_async_python.modules.idle_policy import IdlePolicy
+
+RATE = 16000
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeMic:
+    def __init__(self, chunks):
+        self.config = type("Config", (), {"rate": RATE})()
+        self.chunks = list(chunks)
+        self.is_recording = False
+
+    def start_recording(self):
+        self.is_recording = True
+
+    def get_audio_data(self):
+        return self.chunks.pop(0) if self.chunks else None
+
+
+def speech(seconds):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return b"\x00\x00" * int(seconds * RATE)
+
+
+def test_closes_only_after_timeout_and_when_not_busy():
+    clock = FakeClock()
+    policy = IdlePolicy(timeout_s=60, clock=clock)
+
+    clock.now = 59
+    assert not policy.should_close()
+    clock.now = 61
+    assert policy.should_close()
+    assert not policy.should_close(busy=True)
+    policy.touch()
+    assert not policy.should_close()
+    assert not IdlePolicy(timeout_s=0, clock=clock).should_close()
+
+
+async def test_wait_for_speech_returns_preroll_and_records_metrics():
+    clock = FakeClock()
+    policy = IdlePolicy(timeout_s=60, preroll_ms=300, clock=clock)
+    mic = FakeMic([silence(0.1)] * 5 + [None, speech(0.1), speech(0.1)])
+
+    async def advance():
+        while mic.chunks:
+            clock.now += 10
+            await asyncio.sleep(0)
+
+    advancing = asyncio.create_task(advance())
+    pending = await policy.wait_for_speech(mic, poll_s=0)
+    await advancing
+
+    assert mic.is_recording
+    # The first speech frames and up to 300ms of audio before them
+    assert speech(0.1) in pending and len(pending) <= len(silence(0.3)) + 2 * len(speech(0.1))
+    assert policy.metrics.idle_closes == 1 and policy.metrics.idle_s_total > 0
+
+    clock.now += 0.25
+    policy.resumed()
+    assert policy.metrics.resumes == 1
+    assert abs(policy.metrics.resume_latency_ms_last - 250) < 1e-6
+
+
+class OpenGate:
+    """A wake gate whose window is still open: everything passes through."""
+
+    is_open = True
+
+    def process(self, audio_data):
+        return audio_data
+
+
+async def test_speech_through_an_already_open_wake_gate_resumes():
+    policy = IdlePolicy(timeout_s=60, preroll_ms=300, clock=FakeClock())
+    mic = FakeMic([silence(0.1)] * 3 + [speech(0.1), speech(0.1)])
+
+    pending = await asyncio.wait_for(policy.wait_for_speech(mic, wake_gate=OpenGate(), poll_s=0), timeout=1)
+
+    assert speech(0.1) in pending
@@ -0,0 +1,155 @@
+import asyncio
+from types import SimpleNamespace
+
+from pydantic import BaseModel
+
+from realtime_api_async_python.modules import llm
+from realtime_api_async_python.modules.llm_cache import LLMResponseCache, normalize_prompt, response_key
+
+
+class FileReadResponse(BaseModel):
+    file: str
+
+
+class OtherResponse(BaseModel):
+    file: str
+    reason: str
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class Usage:
+    request_tokens = None
+    details = None
+
+
+class FakeAgent:
+    def __init__(self):
+        self.calls = 0
+
+    async def run(self, prompt):
+        self.calls += 1
+        return SimpleNamespace(data=FileReadResponse(file=f"answer-{self.calls}.py"), usage=Usage)
+
+
+def test_key_ignores_whitespace_but_not_model_schema_or_indentation():
+    key = response_key("gpt-4o-mini", FileReadResponse, "Select a file\n  from:  a.py  ")
+
+    assert key == response_key("gpt-4o-mini", FileReadResponse, "  Select a   file\n  from: a.py\n")
+    assert key != response_key("gpt-4o", FileReadResponse, "Select a file\n  from: a.py")
+    assert key != response_key("gpt-4o-mini", OtherResponse, "Select a file\n  from: a.py")
+    assert normalize_prompt("def f():\n    return  1") == "def f():\n    return 1"
+
+
+async def test_memory_hit_then_ttl_expiry():
+    clock = FakeClock()
+    cache = LLMResponseCache(path=None, clock=clock)
+
+    assert await cache.get("k", FileReadResponse) is None
+    await cache.put("k", FileReadResponse(file="a.py"), ttl_s=60, latency_ms=800)
+    assert await cache.get("k", FileReadResponse) == FileReadResponse(file="a.py")
+
+    clock.now += 61
+    assert await cache.get("k", FileReadResponse) is None
+    assert cache.metrics.memory_hits == 1
+    assert cache.metrics.misses == 2
+    assert cache.metrics.expired == 1
+    assert cache.metrics.by_format == {"FileReadResponse": [1, 2]}
+    assert cache.metrics.saved_ms_estimate == 400
+
+
+async def test_disk_entries_survive_a_new_instance(tmp_path):
+    path = str(tmp_path / "llm.sqlite")
+    cache = LLMResponseCache(path=path)
+    await cache.put("k", FileReadResponse(file="a.py"), ttl_s=60)
+    cache.close()
+
+    reopened = LLMResponseCache(path=path)
+    assert await reopened.get("k", FileReadResponse) == FileReadResponse(file="a.py")
+    assert await reopened.get("k", FileReadResponse) == FileReadResponse(file="a.py")
+    assert reopened.metrics.disk_hits == 1
+    assert reopened.metrics.memory_hits == 1
+    reopened.close()
+
+
+async def test_structured_output_prompt_caches_unless_bypassed(monkeypatch):
+    agent = FakeAgent()
+
+    async def fake_get_agent(response_format=None, llm_model=None):
+        return agent
+
+    monkeypatch.setattr(llm, "get_agent", fake_get_agent)
+    monkeypatch.setattr(llm, "llm_cache", LLMResponseCache(path=None))
+    monkeypatch.setattr(llm, "LLM_CACHE_ENABLED", True)
+
+    first = await llm.structured_output_prompt("pick a file", FileReadResponse)
+    second = await llm.structured_output_prompt("pick  a file", FileReadResponse)
+    fresh = await llm.structured_output_prompt("pick a file", FileReadResponse, use_cache=False)
+    unstored = await llm.structured_output_prompt("other", FileReadResponse, cache_ttl=0)
+    again = await llm.structured_output_prompt("other", FileReadResponse, cache_ttl=0)
+
+    assert first == second == FileReadResponse(file="answer-1.py")
+    assert fresh.file == "answer-2.py"
+    assert (unstored.file, again.file) == ("answer-3.py", "answer-4.py")
+    assert agent.calls == 4
+    assert llm.llm_cache.metrics.bypassed == 1
+    assert llm.llm_cache.metrics.hits == 1
+
+
+class SlowAgent:
+    def __init__(self, error=None):
+        self.calls = 0
+        self.error = error
+        self.release = asyncio.Event()
+
+    async def run(self, prompt):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return SimpleNamespace(data=f"reply to {prompt}", usage=Usage)
+
+
+def use_agent(monkeypatch, agent):
+    async def fake_get_agent(response_format=None, llm_model=None):
+        return agent
+
+    monkeypatch.setattr(llm, "get_agent", fake_get_agent)
+    monkeypatch.setattr(llm, "llm_single_flight", llm.SingleFlight())
+
+
+async def test_identical_requests_in_flight_share_one_call(monkeypatch):
+    agent = SlowAgent()
+    use_agent(monkeypatch, agent)
+
+    calls = [asyncio.create_task(llm.chat_prompt(p, "gpt-4o-mini")) for p in ("hi", "hi", " hi ", "bye")]
+    await asyncio.sleep(0)
+    agent.release.set()
+
+    assert await asyncio.gather(*calls) == ["reply to hi"] * 3 + ["reply to bye"]
+    assert agent.calls == 2
+    assert llm.llm_single_flight.metrics.coalesced == 2
+
+
+async def test_coalesced_callers_share_the_error_and_survive_a_cancelled_leader(monkeypatch):
+    agent = SlowAgent(error=RuntimeError("rate limited"))
+    use_agent(monkeypatch, agent)
+
+    leader = asyncio.create_task(llm.chat_prompt("hi", "gpt-4o-mini"))
+    followers = [asyncio.create_task(llm.chat_prompt("hi", "gpt-4o-mini")) for _ in range(2)]
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    agent.release.set()
+
+    results = await asyncio.gather(*followers, return_exceptions=True)
+    assert [str(r) for r in results] == ["rate limited", "rate limited"]
+    assert leader.cancelled()
+    assert agent.calls == 1
+    assert llm.llm_single_flight.metrics.shared_errors == 2
@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from realtime_api_async_python.modules.llm import HedgePolicy
+
+
+def models(delays, errors=()):
+    """A call that answers with its model name after that model's delay, tracking cancellations."""
+    started, cancelled = [], []
+
+    async def call(model):
+        started.append(model)
+        try:
+            await asyncio.sleep(delays[model])
+        except asyncio.CancelledError:
+            cancelled.append(model)
+            raise
+        if model in errors:
+            raise ValueError(f"{model} returned an invalid result")
+        return model
+
+    return call, started, cancelled
+
+
+async def test_fast_request_is_not_hedged():
+    policy = HedgePolicy(default_delay_s=0.05)
+    call, started, _ = models({"primary": 0, "fast": 0})
+
+    assert await policy.run("primary", call, "fast") == "primary"
+    assert started == ["primary"]
+    assert policy.metrics.fired == 0
+
+
+async def test_slow_request_is_hedged_and_the_loser_cancelled():
+    policy = HedgePolicy(default_delay_s=0.01)
+    call, started, cancelled = models({"primary": 1, "fast": 0})
+
+    assert await policy.run("primary", call, "fast") == "fast"
+    await asyncio.sleep(0)
+    assert started == ["primary", "fast"]
+    assert cancelled == ["primary"]
+    assert (policy.metrics.fired, policy.metrics.won) == (1, 1)
+
+
+async def test_failed_request_falls_back_to_the_other():
+    policy = HedgePolicy(default_delay_s=0.01)
+    call, _, _ = models({"primary": 0.02, "fast": 0.05}, errors={"primary"})
+
+    assert await policy.run("primary", call, "fast") == "fast"
+
+    call, _, _ = models({"primary": 0.02, "fast": 0.03}, errors={"primary", "fast"})
+    with pytest.raises(ValueError, match="primary"):
+        await policy.run("primary", call, "fast")
+
+
+async def test_budget_limits_hedges():
+    policy = HedgePolicy(default_delay_s=0.001, budget=0.0, burst=1.0)
+    call, _, _ = models({"primary": 0.01, "fast": 0.01})
+
+    for _ in range(3):
+        await policy.run("primary", call, "fast")
+
+    assert (policy.metrics.calls, policy.metrics.fired, policy.metrics.denied) == (3, 1, 2)
+
+
+def test_delay_follows_the_latency_percentile_once_there_are_enough_samples():
+    policy = HedgePolicy(percentile=0.9, default_delay_s=2.0, min_samples=10)
+    for latency in range(1, 10):
+        policy.record("gpt-4o-mini", latency / 10)
+    assert policy.delay_s("gpt-4o-mini") == 2.0
+
+    policy.record("gpt-4o-mini", 1.0)
+    assert policy.delay_s("gpt-4o-mini") == 1.0
+    assert policy.delay_s("gpt-4o") == 2.0
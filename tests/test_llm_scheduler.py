@@ -0,0 +1,86 @@
+import asyncio
+import time
+
+from realtime_api_async_python.modules.llm_scheduler import LLMScheduler, Priority, llm_priority, parse_reset
+
+
+def test_parse_reset():
+    assert parse_reset("1s") == 1
+    assert parse_reset("6m0s") == 360
+    assert parse_reset("20ms") == 0.02
+    assert parse_reset("1h2m3.5s") == 3723.5
+
+
+async def test_interactive_calls_go_before_queued_background_work():
+    scheduler = LLMScheduler(max_concurrency=1)
+    release = asyncio.Event()
+    order = []
+
+    async def call(name, priority=None):
+        async with scheduler.slot("gpt-4o", 100, priority):
+            order.append(name)
+            await release.wait()
+
+    async def background(name):
+        # Priority is taken from the calling task's context, as HeadlessSession sets it
+        llm_priority.set(Priority.background)
+        await call(name)
+
+    first = asyncio.create_task(call("running"))
+    await asyncio.sleep(0)
+    queued = [asyncio.create_task(background("batch")), asyncio.create_task(call("tool"))]
+    await asyncio.sleep(0)
+    assert scheduler.queued == 2
+    release.set()
+    await asyncio.gather(first, *queued)
+
+    assert order == ["running", "tool", "batch"]
+    assert scheduler.metrics.granted == {"interactive": 2, "background": 1}
+    assert scheduler.metrics.wait_ms_total["background"] > 0
+
+
+async def test_exhausted_bucket_holds_calls_until_reset():
+    scheduler = LLMScheduler()
+    scheduler.observe_headers(
+        "gpt-4o",
+        {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-remaining-requests": "0",
+            "x-ratelimit-reset-requests": "50ms",
+        },
+    )
+
+    start = time.perf_counter()
+    async with scheduler.slot("gpt-4o", 100):
+        waited = time.perf_counter() - start
+    async with scheduler.slot("gpt-4o-mini", 100):
+        pass
+
+    assert waited >= 0.04
+    assert scheduler.metrics.rate_limited == 1
+    assert scheduler.metrics.wait_ms_max >= 40
+
+
+async def test_token_limits_and_cancelled_waiters():
+    scheduler = LLMScheduler()
+    scheduler.observe_headers(
+        "gpt-4o",
+        {
+            "x-ratelimit-limit-requests": "100",
+            "x-ratelimit-remaining-requests": "99",
+            "x-ratelimit-reset-requests": "1s",
+            "x-ratelimit-limit-tokens": "10000",
+            "x-ratelimit-remaining-tokens": "50",
+            "x-ratelimit-reset-tokens": "30s",
+        },
+    )
+
+    waiting = asyncio.create_task(scheduler.slot("gpt-4o", 500).__aenter__())
+    await asyncio.sleep(0.01)
+    assert scheduler.queued == 1 and not waiting.done()
+
+    waiting.cancel()
+    await asyncio.gather(waiting, return_exceptions=True)
+    assert scheduler.queued == 0
+    async with scheduler.slot("gpt-4o", 10):
+        pass
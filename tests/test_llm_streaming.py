@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+import pytest
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+from realtime_api_async_python.modules import llm
+from realtime_api_async_python.modules.llm import MarkdownFenceStripper, parse_markdown_backticks
+
+RESPONSES = [
+    "```python\nprint('hi')\n```\n",
+    "plain code\n    x = 1\n\n",
+    "Here you go:\n```js\nconst a = `x`;\n```\nAnything else?",
+    "```md\n# Title\n```py\ncode\n```\nmore\n```\n",
+    "``` no newline",
+    "",
+]
+
+
+def stream(text, size):
+    fence = MarkdownFenceStripper()
+    out = "".join(fence.feed(text[i : i + size]) for i in range(0, len(text), size))
+    return out + fence.finish()
+
+
+@pytest.mark.parametrize("text", RESPONSES)
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 1000])
+def test_fence_stripper_matches_parse_markdown_backticks(text, size):
+    assert stream(text, size) == parse_markdown_backticks(text)
+
+
+def test_fence_stripper_emits_before_the_response_ends():
+    fence = MarkdownFenceStripper()
+    assert fence.feed("```python\nimport os\n") == "import os"
+    assert fence.feed("print(1)\n``") == "\nprint(1)"
+    assert fence.feed("`\n") == ""
+    assert fence.finish() == ""
+
+
+class Reply(BaseModel):
+    file_name: str
+    file_content: str
+
+
+class FakeStream:
+    """Replays partial tool call arguments the way StreamedRunResult does."""
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    async def stream_text(self, delta, debounce_by):
+        for chunk in self.chunks:
+            yield chunk
+
+    async def stream_structured(self, debounce_by):
+        args = ""
+        for i, chunk in enumerate(self.chunks):
+            args += chunk
+            yield args, i == len(self.chunks) - 1
+
+    async def validate_structured_result(self, message, allow_partial):
+        return TypeAdapter(Reply).validate_json(
+            message, experimental_allow_partial="trailing-strings" if allow_partial else "off"
+        )
+
+    def usage(self):
+        return SimpleNamespace(request_tokens=None, details=None)
+
+
+class FakeAgent:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    @asynccontextmanager
+    async def run_stream(self, prompt):
+        yield FakeStream(self.chunks)
+
+
+def use_agent(monkeypatch, chunks):
+    async def fake_get_agent(response_format=None, llm_model=None):
+        return FakeAgent(chunks)
+
+    monkeypatch.setattr(llm, "get_agent", fake_get_agent)
+
+
+async def test_stream_chat_prompt_yields_deltas(monkeypatch):
+    use_agent(monkeypatch, ["Hel", "lo"])
+
+    assert [d async for d in llm.stream_chat_prompt("hi", "gpt-4o-mini")] == ["Hel", "lo"]
+
+
+async def test_partial_objects_start_once_required_fields_are_present(monkeypatch):
+    use_agent(monkeypatch, ['{"file_na', 'me": "a.py", "file_content": "x = ', '1\\n', '"}'])
+
+    partials = [r async for r in llm.stream_structured_output_prompt("write", Reply)]
+
+    assert [p.file_content for p in partials] == ["x = ", "x = 1\n", "x = 1\n"]
+    assert partials[-1] == Reply(file_name="a.py", file_content="x = 1\n")
+
+
+async def test_incomplete_final_object_still_fails(monkeypatch):
+    use_agent(monkeypatch, ['{"file_content": "x"}'])
+
+    with pytest.raises(ValidationError):
+        [r async for r in llm.stream_structured_output_prompt("write", Reply)]
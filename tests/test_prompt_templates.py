@@ -0,0 +1,106 @@
+import re
+from types import SimpleNamespace
+
+import pytest
+
+from realtime_api_async_python.modules.prompt_templates import PromptCacheStats, PromptTemplate
+
+TEMPLATE = PromptTemplate(
+    "sql",
+    """
+    <purpose>
+        Write SQL.
+    </purpose>
+    """,
+    schema=("table_definitions",),
+    memory=True,
+    user=("file-name", "user_prompt"),
+)
+
+
+def test_sections_render_in_tier_order_after_the_static_prefix():
+    prompt = TEMPLATE.render(
+        user_prompt="count users", file_name="q.sql", memory="<memory><a>1</a></memory>", table_definitions="users(id)"
+    )
+
+    assert prompt.template == "sql"
+    assert prompt.startswith("<purpose>\n    Write SQL.\n</purpose>\n")
+    # Tags are kept exactly as declared; keywords spell hyphens as underscores
+    positions = [prompt.index(s) for s in ("<table_definitions>", "<memory>", "<file-name>", "<user_prompt>")]
+    assert positions == sorted(positions)
+    assert "<user_prompt>\ncount users\n</user_prompt>" in prompt
+
+
+def test_calls_differing_only_in_memory_and_input_share_the_prefix_and_schema():
+    first = TEMPLATE.render(table_definitions="users(id)", memory="<memory><a>1</a></memory>", file_name="a", user_prompt="x")
+    second = TEMPLATE.render(table_definitions="users(id)", memory="", file_name="b", user_prompt="y")
+
+    shared = first.index("<memory>")
+    assert first[:shared] == second[:shared]
+    # Empty sections are left out rather than rendered as empty tags
+    assert "<memory>" not in second
+
+
+def test_render_rejects_missing_and_unknown_sections():
+    with pytest.raises(ValueError, match="missing.*memory.*unknown.*extra"):
+        TEMPLATE.render(table_definitions="", file_name="", user_prompt="", extra="")
+
+
+def test_cached_token_ratio_per_template():
+    stats = PromptCacheStats()
+    prompt = TEMPLATE.render(table_definitions="t", memory="", file_name="f", user_prompt="p")
+
+    stats.observe(prompt, SimpleNamespace(request_tokens=2000, details={"cached_tokens": 1536}))
+    stats.observe(prompt, SimpleNamespace(request_tokens=2000, details=None))
+    stats.observe("plain prompt", SimpleNamespace(request_tokens=500, details={"cached_tokens": 0}))
+    # Models that report no usage (e.g. the scripted backend) are not counted
+    stats.observe(prompt, SimpleNamespace(request_tokens=None, details=None))
+
+    assert stats.metrics.calls == {"sql": 2, "untemplated": 1}
+    assert stats.metrics.cached_ratio("sql") == pytest.approx(1536 / 4000)
+    assert stats.metrics.cached_ratio() == pytest.approx(1536 / 4500)
+
+
+# generate_sql_and_execute's prompt before it moved to a template
+PRE_TEMPLATE_SQL_PROMPT = """
+<purpose>
+    Generate an SQL query, output format, and a suitable file name based on the user's prompt, available table definitions, and current memory content.
+</purpose>
+
+<instructions>
+    <instruction>Based on the user's prompt, create an appropriate SQL query using the provided table definitions.</instruction>
+</instructions>
+
+<table_definitions>
+{table_definitions}
+</table_definitions>
+
+<sql_dialect>
+{sql_dialect}
+</sql_dialect>
+
+{memory_content}
+
+<user_prompt>
+{prompt}
+</user_prompt>
+"""
+
+
+def tags(prompt: str) -> set[str]:
+    return set(re.findall(r"</?([\w-]+)>", prompt))
+
+
+def test_sql_prompt_keeps_its_original_tags():
+    from realtime_api_async_python.modules.tools import GENERATE_SQL_AND_EXECUTE_PROMPT
+
+    values = dict(table_definitions="users(id)", sql_dialect="sqlite", memory="<memory><k>v</k></memory>")
+    rendered = GENERATE_SQL_AND_EXECUTE_PROMPT.render(user_prompt="count users", **values)
+    before = PRE_TEMPLATE_SQL_PROMPT.format(
+        table_definitions=values["table_definitions"],
+        sql_dialect=values["sql_dialect"],
+        memory_content=values["memory"],
+        prompt="count users",
+    )
+
+    assert tags(rendered) == tags(before)
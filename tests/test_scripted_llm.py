@@ -0,0 +1,61 @@
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from realtime_api_async_python.modules import llm
+from realtime_api_async_python.modules.scripted_llm import ScriptedLLM, sample_from_schema
+from realtime_api_async_python.modules.utils import ModelName
+
+
+class FileReadResponse(BaseModel):
+    file: str
+    model: ModelName = ModelName.base_model
+
+
+class MakeCodeRunnableResponse(BaseModel):
+    changes_described: List[str]
+    full_updated_code: str
+    note: Optional[str] = None
+
+
+def test_sample_from_schema_is_valid():
+    for model in (FileReadResponse, MakeCodeRunnableResponse):
+        sample = sample_from_schema(model.model_json_schema())
+        assert model.model_validate(sample)
+    assert sample_from_schema(FileReadResponse.model_json_schema()) == {"file": ""}
+
+
+def use_scripted(monkeypatch, scripted):
+    monkeypatch.setattr(llm, "LLM_BACKEND", "scripted")
+    monkeypatch.setattr("realtime_api_async_python.modules.scripted_llm.scripted_llm", scripted)
+    monkeypatch.setattr(llm, "LLM_CACHE_ENABLED", False)
+    llm.get_agent.cache_clear()
+
+
+async def test_get_agent_uses_canned_answers(monkeypatch):
+    scripted = ScriptedLLM(
+        {"FileReadResponse": lambda prompt: {"file": prompt.split()[-1]}, "text": "print('hi')"}
+    )
+    use_scripted(monkeypatch, scripted)
+
+    selection = await llm.structured_output_prompt("open notes.txt", FileReadResponse)
+    reply = await llm.chat_prompt("write code", "gpt-4o-mini")
+    fallback = await llm.structured_output_prompt("fix it", MakeCodeRunnableResponse)
+
+    assert selection == FileReadResponse(file="notes.txt")
+    assert reply == "print('hi')"
+    assert fallback == MakeCodeRunnableResponse(changes_described=[], full_updated_code="")
+    assert [name for name, _ in scripted.calls] == ["FileReadResponse", "text", "MakeCodeRunnableResponse"]
+    llm.get_agent.cache_clear()
+
+
+async def test_streams_arrive_in_chunks(monkeypatch):
+    scripted = ScriptedLLM({"text": "x" * 10, "FileReadResponse": {"file": "a" * 30}}, chunk_chars=4)
+    use_scripted(monkeypatch, scripted)
+
+    deltas = [d async for d in llm.stream_chat_prompt("go", "gpt-4o-mini", debounce_s=None)]
+    partials = [p async for p in llm.stream_structured_output_prompt("go", FileReadResponse, debounce_s=None)]
+
+    assert "".join(deltas) == "x" * 10 and len(deltas) > 1
+    assert len(partials) > 1 and partials[-1].file == "a" * 30
+    llm.get_agent.cache_clear()
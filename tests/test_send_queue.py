@@ -0,0 +1,80 @@
+import asyncio
+import base64
+import json
+
+import pytest
+
+from realtime_api_async_python.modules.send_queue import (
+    EventPriority,
+    OutgoingEventQueue,
+)
+
+
+class RecordingWebsocket:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, message):
+        self.sent.append(json.loads(message))
+
+
+async def drain(queue: OutgoingEventQueue) -> list[dict]:
+    websocket = RecordingWebsocket()
+    queue.close()
+    await asyncio.wait_for(queue.run(websocket), timeout=1)
+    return websocket.sent
+
+
+async def test_control_events_preempt_audio():
+    queue = OutgoingEventQueue()
+    queue.put_audio(b"\x01\x00")
+    queue.put_event({"type": "conversation.item.create"})
+    queue.put_event({"type": "response.create"})
+
+    sent = await drain(queue)
+
+    assert [event["type"] for event in sent] == [
+        "conversation.item.create",
+        "response.create",
+        "input_audio_buffer.append",
+    ]
+
+
+async def test_pending_audio_frames_are_coalesced():
+    queue = OutgoingEventQueue()
+    queue.put_audio(b"\x01\x00")
+    queue.put_audio(b"\x02\x00")
+    queue.put_audio(b"\x03\x00")
+
+    sent = await drain(queue)
+
+    assert len(sent) == 1
+    assert base64.b64decode(sent[0]["audio"]) == b"\x01\x00\x02\x00\x03\x00"
+    assert queue.metrics.coalesced == 2
+    assert queue.metrics.max_depth == 3
+
+
+async def test_commit_stays_behind_queued_audio():
+    queue = OutgoingEventQueue()
+    queue.put_audio(b"\x01\x00")
+    queue.put_event({"type": "input_audio_buffer.commit"}, EventPriority.AUDIO)
+    queue.put_audio(b"\x02\x00")
+
+    sent = await drain(queue)
+
+    assert [event["type"] for event in sent] == [
+        "input_audio_buffer.append",
+        "input_audio_buffer.commit",
+        "input_audio_buffer.append",
+    ]
+
+
+async def test_coalescing_respects_size_cap():
+    queue = OutgoingEventQueue(max_coalesced_audio_bytes=4)
+    for _ in range(3):
+        queue.put_audio(b"\x00\x00")
+
+    sent = await drain(queue)
+
+    assert len(sent) == 2
+    assert queue.metrics.sent == 2
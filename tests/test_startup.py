@@ -0,0 +1,43 @@
+import asyncio
+
+from realtime_api_async_python.modules.startup import StartupOrchestrator
+
+
+async def test_ready_waits_for_running_warmup():
+    orchestrator = StartupOrchestrator()
+    release = asyncio.Event()
+    orchestrator.register_warmup("slow", release.wait)
+    orchestrator.start()
+
+    waiter = asyncio.create_task(orchestrator.ready("slow"))
+    await asyncio.sleep(0)
+    assert not waiter.done()
+
+    release.set()
+    await asyncio.wait_for(waiter, timeout=1)
+    assert orchestrator.status["slow"].state == "done"
+
+
+async def test_ready_returns_for_unknown_warmup():
+    await asyncio.wait_for(StartupOrchestrator().ready("missing"), timeout=1)
+
+
+async def test_failed_warmup_is_reported_and_restarted():
+    orchestrator = StartupOrchestrator()
+    calls = []
+
+    async def flaky():
+        calls.append(1)
+        if len(calls) == 1:
+            raise RuntimeError("no token")
+
+    orchestrator.register_warmup("credentials", flaky)
+    orchestrator.start()
+    await orchestrator.ready("credentials")
+    assert orchestrator.status["credentials"].state == "failed"
+    assert orchestrator.status["credentials"].error == "no token"
+
+    orchestrator.start()
+    await orchestrator.ready("credentials")
+    assert orchestrator.status["credentials"].state == "done"
+    assert len(calls) == 2
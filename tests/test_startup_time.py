@@ -0,0 +1,48 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from realtime_api_async_python.modules.startup_profile import (
+    HEAVY_MODULES,
+    STARTUP_TIME_BUDGET_S,
+    parse_importtime,
+    profile_imports,
+)
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_parse_importtime_skips_header():
+    stderr = (
+        "import time: self [us] | cumulative | imported package\n"
+        "import time:       120 |        120 |   _io\n"
+        "import time:      3000 |      45000 | realtime_api_async_python.main\n"
+    )
+    timings = parse_importtime(stderr)
+    assert [t.module for t in timings] == ["_io", "realtime_api_async_python.main"]
+    assert timings[1].cumulative_us == 45000
+
+
+@pytest.fixture
+def cold_start_env(tmp_path):
+    env = dict(os.environ)
+    env.setdefault("OPENAI_API_KEY", "sk-test")
+    env["PERSONALIZATION_FILE"] = str(REPO_ROOT / "personalization.json")
+    env["SCRATCH_PAD_DIR"] = str(tmp_path / "scratchpad")
+    env["ACTIVE_MEMORY_FILE"] = str(tmp_path / "active_memory.json")
+    return env
+
+
+def test_cold_start_is_within_budget(cold_start_env, tmp_path):
+    profile = profile_imports(env=cold_start_env, cwd=str(tmp_path))
+
+    assert profile.wall_time_s < STARTUP_TIME_BUDGET_S, [
+        f"{t.module}: {t.cumulative_us / 1000:.0f}ms" for t in profile.top(10)
+    ]
+
+
+def test_heavy_dependencies_are_not_imported_at_startup(cold_start_env, tmp_path):
+    profile = profile_imports(env=cold_start_env, cwd=str(tmp_path))
+
+    assert [name for name in HEAVY_MODULES if profile.loaded(name)] == []
@@ -0,0 +1,86 @@
+import asyncio
+from types import SimpleNamespace
+
+from realtime_api_async_python.modules.streaming_transcriber import StreamingTranscriber, agreed_prefix
+
+RATE = 16000
+ONE_SECOND = b"\x00\x00" * RATE
+
+
+class FakeMic:
+    def __init__(self):
+        self.config = SimpleNamespace(rate=RATE)
+        self.listeners = []
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        self.listeners.remove(listener)
+
+    def feed(self, frame):
+        for listener in self.listeners:
+            listener(frame)
+
+
+class ScriptedRegistry:
+    """Returns one canned decode per call, like successive Whisper passes over a growing window."""
+
+    def __init__(self, texts):
+        self.texts = list(texts)
+        self.calls = []
+
+    async def transcribe(self, audio, model_name=None, **options):
+        self.calls.append((len(audio), options))
+        text = self.texts.pop(0)
+        return {"text": text, "segments": [{"start": 0.0, "end": len(audio) / RATE, "text": text}]}
+
+
+def test_agreed_prefix_ignores_case_and_punctuation():
+    assert agreed_prefix(["Hello,", "world"], ["hello", "world.", "again"]) == 2
+    assert agreed_prefix(["hello", "there"], ["hello", "world"]) == 1
+
+
+async def collect(transcriber, mic, frames):
+    hypotheses = []
+
+    async def consume():
+        async for hypothesis in transcriber.hypotheses():
+            hypotheses.append(hypothesis)
+
+    task = asyncio.create_task(consume())
+    await asyncio.sleep(0)
+    for frame in frames:
+        mic.feed(frame)
+        await asyncio.sleep(0.01)
+    transcriber.close()
+    await asyncio.wait_for(task, timeout=1)
+    return hypotheses
+
+
+async def test_committed_prefix_grows_and_final_is_emitted():
+    mic = FakeMic()
+    registry = ScriptedRegistry(["hello", "hello world", "Hello world, how", "Hello world, how are you?"])
+    transcriber = StreamingTranscriber(mic, registry=registry, step_s=1.0, finalize_after_s=5)
+
+    hypotheses = await collect(transcriber, mic, [ONE_SECOND] * 3)
+
+    assert [h.committed for h in hypotheses[:3]] == ["", "hello", "hello world,"]
+    assert hypotheses[1].text == "hello world"
+    assert hypotheses[-1].is_final
+    assert hypotheses[-1].text == "hello world, how are you?"
+    assert mic.listeners == []
+
+
+async def test_window_slides_at_committed_segment_boundary():
+    mic = FakeMic()
+    registry = ScriptedRegistry(["one two", "one two", "three", "three four"])
+    transcriber = StreamingTranscriber(mic, registry=registry, window_s=1.5, step_s=1.0, finalize_after_s=5)
+
+    hypotheses = await collect(transcriber, mic, [ONE_SECOND] * 3)
+
+    # The second decode commits "one two" and fills the window, so its audio is dropped
+    assert hypotheses[1].committed == "one two"
+    assert registry.calls[2][0] == RATE
+    assert registry.calls[2][1]["initial_prompt"] == "one two"
+    assert hypotheses[-1].text == "one two three four"
@@ -0,0 +1,66 @@
+from typing import Annotated
+
+import pytest
+from pydantic import BaseModel, Field
+
+from realtime_api_async_python.modules.gen_descriptor import build_function_descriptor
+from realtime_api_async_python.modules.tool_budget import (
+    CompactLevel,
+    compact_descriptors,
+    descriptor_tokens,
+    fit_to_budget,
+)
+
+
+class Letter(BaseModel):
+    recipient: str = Field(description="Email address of the recipient")
+    body: str
+
+
+class SendResult(BaseModel):
+    sent: bool = Field(description="Whether the letter was sent")
+
+
+async def send_letter(prompt: Annotated[str, "What to send"], letter: Letter) -> SendResult:
+    """Sends a letter. Looks the recipient up first if needed."""
+
+
+async def draft_letter(letter: Letter) -> SendResult:
+    """Drafts a letter without sending it."""
+
+
+@pytest.fixture
+def descriptors():
+    return [build_function_descriptor(send_letter), build_function_descriptor(draft_letter)]
+
+
+def test_compact_drops_return_schema_and_filler(descriptors):
+    compact = compact_descriptors(descriptors, CompactLevel.COMPACT)
+
+    assert "Returns:" in descriptors[0]["description"]
+    assert compact[0]["description"] == "Sends a letter. Looks the recipient up first if needed."
+    body = compact[0]["parameters"]["properties"]["letter"]["properties"]["body"]
+    assert "description" not in body
+
+
+def test_repeated_sub_schema_is_described_once(descriptors):
+    compact = compact_descriptors(descriptors, CompactLevel.COMPACT)
+
+    repeated = compact[1]["parameters"]["properties"]["letter"]
+    assert repeated["description"] == "Same fields as send_letter.letter"
+    assert "description" not in repeated["properties"]["recipient"]
+    assert repeated["required"] == ["recipient", "body"]
+
+
+def test_budget_steps_up_compaction(descriptors):
+    compact_tokens = sum(descriptor_tokens(d) for d in compact_descriptors(descriptors, CompactLevel.COMPACT))
+
+    tools, level = fit_to_budget(descriptors, budget=compact_tokens - 1)
+
+    assert level > CompactLevel.COMPACT
+    assert sum(descriptor_tokens(d) for d in tools) <= compact_tokens - 1
+
+
+def test_budget_that_cannot_be_met_raises(descriptors):
+    with pytest.raises(ValueError):
+        fit_to_budget(descriptors, budget=10)
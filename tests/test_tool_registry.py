@@ -0,0 +1,75 @@
+import json
+
+from realtime_api_async_python.modules.tool_budget import CompactLevel, compact_descriptors
+from realtime_api_async_python.modules.tool_registry import ToolGroup, ToolRegistry, ToolSession
+
+
+def make_registry() -> ToolRegistry:
+    registry = ToolRegistry(cache_enabled=False)
+
+    @registry.tool(ToolGroup.core)
+    async def get_time() -> dict:
+        """Get the time."""
+        return {}
+
+    @registry.tool(ToolGroup.sql)
+    async def run_query(prompt: str) -> dict:
+        """Run a query."""
+        return {}
+
+    @registry.tool(ToolGroup.sql, advertised=False)
+    async def run_query_now(prompt: str) -> dict:
+        """Run a query now."""
+        return {}
+
+    @registry.tool(ToolGroup.email)
+    async def send_mail(prompt: str) -> dict:
+        """Send mail."""
+        return {}
+
+    return registry
+
+
+def test_function_map_includes_unadvertised_tools():
+    registry = make_registry()
+    assert set(registry.function_map) == {"get_time", "run_query", "run_query_now", "send_mail"}
+
+
+def test_payload_filters_by_group_and_keeps_core():
+    registry = make_registry()
+
+    tools, tools_json = registry.payload(["sql"])
+
+    assert [t["name"] for t in tools] == ["get_time", "run_query"]
+    assert json.loads(tools_json) == tools
+    assert [t["name"] for t in registry.payload(None)[0]] == ["get_time", "run_query", "send_mail"]
+    assert registry.payload({ToolGroup.sql})[0] == tools
+
+
+def test_payload_over_budget_falls_back_to_minimal_descriptors():
+    registry = make_registry()
+    registry.token_budget = 1
+
+    tools, _ = registry.payload(None)
+
+    assert [t["name"] for t in tools] == ["get_time", "run_query", "send_mail"]
+    assert tools == compact_descriptors(registry.full_descriptors(None), CompactLevel.MINIMAL)
+
+
+def test_unknown_groups_are_ignored():
+    registry = make_registry()
+    assert [t["name"] for t in registry.payload(["nope"])[0]] == ["get_time"]
+
+
+def test_switch_notifies_only_on_change():
+    changes = []
+    session = ToolSession(["core"], on_change=changes.append)
+
+    session.switch(enable=["email"])
+    session.switch(enable=["email"])
+    session.switch(disable=["email"])
+
+    assert changes == [
+        frozenset({ToolGroup.core, ToolGroup.email}),
+        frozenset({ToolGroup.core}),
+    ]
@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+
+from realtime_api_async_python.modules import whisper_speechtotext
+from realtime_api_async_python.modules.transcript_cache import TranscriptCache, transcript_key
+from realtime_api_async_python.modules.whisper_speechtotext import (
+    WhisperModelRegistry,
+    WhisperProfile,
+    transcribe_audio,
+)
+
+
+class FakeModel:
+    device = SimpleNamespace(type="cpu")
+
+    def __init__(self):
+        self.calls = 0
+
+    def transcribe(self, audio, **options):
+        self.calls += 1
+        return {"text": "hello", "segments": [{"start": 0.0, "end": 1.0, "text": "hello"}]}
+
+
+class FakeRegistry(WhisperModelRegistry):
+    def __init__(self):
+        super().__init__(profile=WhisperProfile(device="cpu", model_name="tiny"))
+        self.model = FakeModel()
+
+    def _load(self, model_name=None):
+        return self.model
+
+
+def test_key_depends_on_audio_and_config():
+    config = {"model": "tiny", "options": {"language": "en"}}
+    key = transcript_key(b"\x01\x00" * 10, 16000, config)
+
+    assert key == transcript_key(b"\x01\x00" * 10, 16000, dict(config))
+    assert key != transcript_key(b"\x02\x00" * 10, 16000, config)
+    assert key != transcript_key(b"\x01\x00" * 10, 24000, config)
+    assert key != transcript_key(b"\x01\x00" * 10, 16000, {**config, "model": "base"})
+
+
+async def test_memory_and_disk_layers(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    cache = TranscriptCache(path, memory_entries=1)
+    assert await cache.get("a", audio_s=2.0) is None
+    await cache.put("a", {"text": "first"})
+    await cache.put("b", {"text": "second"})
+
+    # "a" was pushed out of the one-entry LRU but is still on disk
+    assert await cache.get("b", audio_s=2.0) == {"text": "second"}
+    assert await cache.get("a", audio_s=2.0) == {"text": "first"}
+    assert (cache.metrics.memory_hits, cache.metrics.disk_hits, cache.metrics.misses) == (1, 1, 1)
+    assert cache.metrics.saved_audio_s == 4.0
+    cache.close()
+
+    reopened = TranscriptCache(path)
+    assert reopened.lookup("b") == {"text": "second"}
+    assert reopened.metrics.hit_rate == 1.0
+    reopened.close()
+
+
+def test_disk_layer_evicts_least_recently_used(tmp_path):
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite"), memory_entries=1, max_bytes=70)
+    cache.store("a", {"text": "a" * 20})
+    cache.store("b", {"text": "b" * 20})
+    assert cache.lookup("a") is not None  # "a" is now more recently used than "b"
+    cache.store("c", {"text": "c" * 20})
+
+    assert cache.metrics.evictions == 1
+    cache._memory.clear()
+    assert cache.lookup("b") is None
+    assert cache.lookup("a") is not None
+    assert cache.lookup("c") is not None
+    cache.close()
+
+
+async def test_transcribe_audio_skips_inference_for_repeated_audio(tmp_path, monkeypatch):
+    registry = FakeRegistry()
+    cache = TranscriptCache(str(tmp_path / "cache.sqlite"))
+    monkeypatch.setattr(whisper_speechtotext, "whisper_registry", registry)
+    monkeypatch.setattr(whisper_speechtotext, "transcript_cache", cache)
+    audio = b"\x10\x00" * 16000
+
+    first = await transcribe_audio(audio, sample_rate=16000, trim_silence=False)
+    second = await transcribe_audio(audio, sample_rate=16000, trim_silence=False)
+    await transcribe_audio(audio, sample_rate=16000, use_cache=False, trim_silence=False)
+
+    assert first == second
+    assert registry.model.calls == 2
+    assert cache.metrics.hits == 1
+    cache.close()
@@ -0,0 +1,87 @@
+import numpy as np
+
+from realtime_api_async_python.modules.vad import (
+    CHUNK_GAP_S,
+    SpeechSpan,
+    detect_speech,
+    pack_speech,
+    transcribe_speech,
+)
+
+RATE = 16000
+
+
+def tone(seconds, amplitude=0.3):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (amplitude * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16)
+
+
+def quiet(seconds):
+    rng = np.random.default_rng(0)
+    return (rng.normal(0, 0.001, int(seconds * RATE)) * 32767).astype(np.int16)
+
+
+def test_detects_speech_with_padding_and_drops_clicks():
+    audio = np.concatenate([quiet(2), tone(1), quiet(0.2), tone(1), quiet(2), tone(0.05), quiet(2)])
+    spans = detect_speech(audio, RATE)
+
+    # The short pause stays inside one span and the 50ms click is dropped
+    assert len(spans) == 1
+    start, end = spans[0].start / RATE, spans[0].end / RATE
+    assert 1.7 < start < 2.0
+    assert 4.2 < end < 4.5
+
+
+def test_all_speech_is_one_span_and_silence_is_none():
+    assert detect_speech(tone(3), RATE) == [SpeechSpan(0, 3 * RATE)]
+    assert detect_speech(np.zeros(RATE * 3, dtype=np.int16), RATE) == []
+
+
+def test_pack_speech_respects_chunk_length_and_maps_times():
+    audio = np.zeros(RATE * 100, dtype=np.int16)
+    spans = [SpeechSpan(10 * RATE, 20 * RATE), SpeechSpan(40 * RATE, 50 * RATE), SpeechSpan(60 * RATE, 75 * RATE)]
+    chunks = pack_speech(audio, spans, RATE, max_chunk_s=30, gap_s=0.5)
+
+    assert [len(chunk.audio) / RATE for chunk in chunks] == [20.5, 15.0]
+    first = chunks[0]
+    assert first.to_original(5.0) == 15.0
+    assert first.to_original(12.0) == 41.5
+    # Inside the gap: starts move forward, ends move back
+    assert first.to_original(10.2) == 40.0
+    assert first.to_original(10.2, end=True) == 20.0
+    assert chunks[1].to_original(3.0) == 63.0
+
+
+def test_transcribe_speech_maps_segments_to_the_original_buffer():
+    audio = np.concatenate([quiet(5), tone(2), quiet(10), tone(2), quiet(5)]).astype(np.float32) / 32768
+    calls = []
+
+    def transcribe(chunk):
+        calls.append(len(chunk) / RATE)
+        return {
+            "text": " one two",
+            "language": "en",
+            "segments": [{"id": 0, "start": 0.3, "end": 2.0, "text": " one"}, {"id": 1, "start": 3.0, "end": 4.3, "text": " two"}],
+        }
+
+    result = transcribe_speech(transcribe, audio, RATE)
+
+    # Both speech spans are decoded together in one chunk of well under the 24s buffer
+    assert len(calls) == 1 and calls[0] < 5.5
+    assert result["text"] == "one two"
+    assert result["speech_s"] < 5.5 and result["audio_s"] == 24.0
+    first_span, second_span = detect_speech(audio, RATE)
+    first_length = (first_span.end - first_span.start) / RATE
+    first, second = result["segments"]
+    assert abs(first["start"] - (first_span.start / RATE + 0.3)) < 1e-6
+    assert abs(first["end"] - (first_span.start / RATE + 2.0)) < 1e-6
+    assert abs(second["start"] - (second_span.start / RATE + 3.0 - first_length - CHUNK_GAP_S)) < 1e-6
+    assert 4.5 < first["start"] < 5.3 and 16.5 < second["start"] < 17.5
+
+
+def test_transcribe_speech_skips_inference_for_silence():
+    calls = []
+    result = transcribe_speech(calls.append, np.zeros(RATE * 5, dtype=np.float32), RATE, "en")
+
+    assert calls == []
+    assert result["text"] == "" and result["segments"] == [] and result["language"] == "en"
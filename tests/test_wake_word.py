@@ -0,0 +1,89 @@
+import numpy as np
+
+from realtime_api_async_python.modules.wake_word import WakeWordGate, phrase_score
+
+RATE = 16000
+FRAME = RATE // 10  # 100ms, as send_audio_loop delivers it
+
+
+class ScriptedRegistry:
+    def __init__(self, text):
+        self.text = text
+        self.calls = 0
+
+    async def transcribe(self, audio, model_name=None, **options):
+        self.calls += 1
+        return {"text": self.text}
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def speech(seconds):
+    t = np.arange(int(seconds * RATE)) / RATE
+    return (0.3 * np.sin(2 * np.pi * 220 * t) * 32767).astype(np.int16).tobytes()
+
+
+def silence(seconds):
+    return b"\x00\x00" * int(seconds * RATE)
+
+
+async def feed(gate, audio):
+    forwarded = []
+    for i in range(0, len(audio), FRAME * 2):
+        out = gate.process(audio[i : i + FRAME * 2])
+        if out:
+            forwarded.append(out)
+        await gate.wait_for_check()
+    return b"".join(forwarded)
+
+
+def test_phrase_score_is_fuzzy():
+    assert phrase_score("Hey Ada, what's the time?", "Ada") == 1.0
+    assert phrase_score("Hey Aida what's the time", "Ada") >= 0.75
+    assert phrase_score("Open the pod bay doors", "Ada Lovelace") < 0.75
+    assert phrase_score("", "Ada") == 0.0
+
+
+async def test_silence_never_reaches_whisper():
+    registry = ScriptedRegistry("Ada")
+    gate = WakeWordGate("Ada", RATE, registry, preroll_ms=500)
+
+    assert await feed(gate, silence(3)) == b""
+    assert registry.calls == 0
+    assert not gate.is_open
+    assert gate.metrics.withheld_bytes == len(silence(3))
+
+
+async def test_other_speech_keeps_the_gate_closed():
+    registry = ScriptedRegistry("what is the weather like")
+    gate = WakeWordGate("Ada", RATE, registry)
+
+    assert await feed(gate, speech(2)) == b""
+    assert registry.calls > 0
+    assert not gate.is_open
+
+
+async def test_phrase_opens_gate_with_preroll_and_closes_after_hold():
+    clock = FakeClock()
+    gate = WakeWordGate("Ada", RATE, ScriptedRegistry("Ada, what's next?"), preroll_ms=500, hold_s=10, clock=clock)
+
+    forwarded = await feed(gate, speech(1))
+    assert gate.is_open
+    # Half a second of pre-roll, then the frames after detection as they come
+    assert len(forwarded) == len(speech(0.5)) + len(speech(0.4))
+    assert gate.metrics.detections == 1
+
+    clock.now = 5
+    assert gate.process(silence(0.1)) == silence(0.1)
+    gate.touch()
+    clock.now = 14
+    assert gate.is_open and gate.process(silence(0.1))
+    clock.now = 30
+    assert gate.process(silence(0.1)) is None
+    assert not gate.is_open
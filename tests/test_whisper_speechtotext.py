@@ -0,0 +1,68 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import numpy as np
+
+from realtime_api_async_python.modules.whisper_speechtotext import (
+    WhisperModelRegistry,
+    WhisperProfile,
+    pcm16_to_float,
+    resample,
+    resolve_profile,
+)
+
+
+class FakeModel:
+    device = SimpleNamespace(type="cpu")
+
+    def __init__(self):
+        self.threads = []
+
+    def transcribe(self, audio, **options):
+        self.threads.append(threading.current_thread().name)
+        return {"text": "hello", "options": options, "samples": len(audio)}
+
+
+class CountingRegistry(WhisperModelRegistry):
+    def __init__(self):
+        super().__init__(profile=WhisperProfile(device="cpu", model_name="tiny"))
+        self.loads = 0
+
+    def _load(self, model_name=None):
+        model_name = model_name or self.profile.model_name
+        if model_name not in self._models:
+            self.loads += 1
+            self._models[model_name] = FakeModel()
+        return self._models[model_name]
+
+
+def test_resample_24k_to_16k():
+    audio = np.zeros(24000, dtype=np.float32)
+    assert len(resample(audio, 24000)) == 16000
+    assert len(pcm16_to_float(b"\x00\x00" * 2400, 24000)) == 1600
+
+
+async def test_model_is_loaded_once_and_runs_off_the_event_loop():
+    registry = CountingRegistry()
+    audio = np.zeros(16000, dtype=np.float32)
+
+    results = await asyncio.gather(*[registry.transcribe(audio, language="en") for _ in range(3)])
+
+    assert registry.loads == 1
+    assert all(r["text"] == "hello" for r in results)
+    # CPU profile decodes greedily in fp32 unless the caller overrides it
+    assert results[0]["options"]["fp16"] is False
+    assert results[0]["options"]["beam_size"] is None
+    assert results[0]["options"]["language"] == "en"
+    model = registry._models["tiny"]
+    assert all(name.startswith("whisper") for name in model.threads)
+
+
+def test_cpu_profile_uses_small_quantized_model_and_fp32():
+    profile = resolve_profile(device="cpu", model_name=None)
+
+    assert profile.model_name != "large-v3"
+    assert profile.quantize is True
+    assert profile.decode_options()["fp16"] is False
+    assert resolve_profile(device="cuda", model_name=None).decode_options() == {"fp16": True}